@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+from itertools import islice
+import json
+from pathlib import Path
+import platform
+import resource
+import sys
+from time import perf_counter
+from typing import Callable
+
+import numpy as np
+
+from convolve.config import load_settings
+from convolve.embeddings import HF_MODEL_NAME, EmbeddingBackend
+from convolve.ingest import load_seed_schemes
+from convolve.synthetic import synthetic_households, synthetic_schemes
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+REPORT_DIR = PROJECT_ROOT / ".cache" / "bench"
+REFERENCE = "sentence-transformers"
+# Minimum per-text cosine similarity to the sentence-transformers vectors; see
+# docs/adr/0008-onnx-embedding-backend.md.
+TOLERANCES = {"onnx": 0.999, "onnx-int8": 0.98}
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as handle:
+            pages = int(handle.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        # ru_maxrss is a high-water mark in KiB on Linux and bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def backend_factories(threads: int) -> dict[str, Callable[[], EmbeddingBackend]]:
+    settings = load_settings()
+
+    def sentence_transformers() -> EmbeddingBackend:
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        return HuggingFaceEmbeddings(model_name=HF_MODEL_NAME)
+
+    def onnx(quantized: bool) -> Callable[[], EmbeddingBackend]:
+        def build() -> EmbeddingBackend:
+            from convolve.onnx_embeddings import OnnxEmbeddings, onnx_threads
+
+            return OnnxEmbeddings(
+                settings.onnx_model_dir,
+                quantized=quantized,
+                threads=onnx_threads(threads, 1),
+            )
+
+        return build
+
+    return {REFERENCE: sentence_transformers, "onnx": onnx(False), "onnx-int8": onnx(True)}
+
+
+def sample_texts(count: int) -> tuple[list[str], list[str]]:
+    documents = [scheme.description for scheme in load_seed_schemes()]
+    extra = islice(synthetic_schemes(count), max(count - len(documents), 0))
+    documents += [scheme.description for scheme in extra]
+    queries = [signals.summary_text() for signals in synthetic_households(count)]
+    return documents[:count], queries
+
+
+def run_backend(
+    name: str,
+    build: Callable[[], EmbeddingBackend],
+    queries: list[str],
+    documents: list[str],
+    batch_size: int,
+) -> tuple[dict[str, object], np.ndarray]:
+    rss_before = rss_mb()
+    started = perf_counter()
+    backend = build()
+    backend.embed_query("warm up")
+    load_seconds = perf_counter() - started
+
+    latencies = []
+    query_vectors = []
+    for query in queries:
+        query_started = perf_counter()
+        query_vectors.append(backend.embed_query(query))
+        latencies.append((perf_counter() - query_started) * 1000)
+
+    document_vectors = []
+    started = perf_counter()
+    for start in range(0, len(documents), batch_size):
+        document_vectors.extend(backend.embed_documents(documents[start : start + batch_size]))
+    batch_seconds = perf_counter() - started
+
+    values = np.array(latencies)
+    summary = {
+        "backend": name,
+        "load_seconds": round(load_seconds, 2),
+        "rss_growth_mb": round(rss_mb() - rss_before, 1),
+        "query_p50_ms": round(float(np.percentile(values, 50)), 3),
+        "query_p95_ms": round(float(np.percentile(values, 95)), 3),
+        "query_p99_ms": round(float(np.percentile(values, 99)), 3),
+        "batch_texts_per_second": round(len(documents) / batch_seconds, 1) if batch_seconds else 0.0,
+    }
+    # Agreement covers both paths: single queries and padded, length-sorted batches.
+    return summary, np.asarray(query_vectors + document_vectors, dtype=np.float32)
+
+
+def cosine_agreement(vectors: np.ndarray, reference: np.ndarray) -> dict[str, float]:
+    left = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    right = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cosine = (left * right).sum(axis=1)
+    return {
+        "cosine_min": round(float(cosine.min()), 5),
+        "cosine_p1": round(float(np.percentile(cosine, 1)), 5),
+        "cosine_mean": round(float(cosine.mean()), 5),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare embedding backends on per-query latency, batch throughput, RSS and cosine agreement."
+    )
+    parser.add_argument("--backends", default="sentence-transformers,onnx,onnx-int8")
+    parser.add_argument("--queries", type=int, default=200, help="single-query calls per backend")
+    parser.add_argument("--documents", type=int, default=512, help="texts embedded in batches per backend")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0, help="ONNX intra-op threads; 0 uses every core")
+    parser.add_argument("--output", type=Path, help="default .cache/bench/embeddings-<time>.json")
+    args = parser.parse_args()
+
+    factories = backend_factories(args.threads)
+    names = [name.strip() for name in args.backends.split(",") if name.strip()]
+    unknown = [name for name in names if name not in factories]
+    if unknown:
+        parser.error(f"unknown backends {', '.join(unknown)}; expected {', '.join(factories)}")
+    # The reference runs first so the others can be checked against its vectors.
+    names.sort(key=lambda name: name != REFERENCE)
+    documents, queries = sample_texts(max(args.queries, args.documents))
+    queries = queries[: args.queries]
+    documents = documents[: args.documents]
+
+    results = []
+    reference = None
+    failures = []
+    for name in names:
+        summary, vectors = run_backend(name, factories[name], queries, documents, args.batch_size)
+        if name == REFERENCE:
+            reference = vectors
+        elif reference is not None:
+            summary.update(cosine_agreement(vectors, reference))
+            summary["tolerance"] = TOLERANCES[name]
+            if summary["cosine_min"] < TOLERANCES[name]:
+                failures.append(name)
+        results.append(summary)
+        agreement = ""
+        if "cosine_min" in summary:
+            agreement = f"  cos min {summary['cosine_min']:.4f} mean {summary['cosine_mean']:.4f}"
+        print(
+            f"{name:<22} load {summary['load_seconds']:>6.2f}s  rss +{summary['rss_growth_mb']:>6.1f} MB  "
+            f"query p50 {summary['query_p50_ms']:>7.2f} ms  p95 {summary['query_p95_ms']:>7.2f} ms  "
+            f"batch {summary['batch_texts_per_second']:>8.1f} texts/s{agreement}"
+        )
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "queries": len(queries),
+            "documents": len(documents),
+            "batch_size": args.batch_size,
+            "threads": args.threads,
+        },
+        "results": results,
+    }
+    stamp = f"{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+    output = args.output or REPORT_DIR / f"embeddings-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"report written to {output}")
+    if failures:
+        print(f"below cosine tolerance: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from itertools import islice
+import json
+from pathlib import Path
+import platform
+import resource
+import sys
+from time import perf_counter
+from typing import Callable
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+from convolve.config import load_settings
+from convolve.eligibility_index import EligibilityIndex
+from convolve.embeddings import EmbeddingService
+from convolve.ingest import build_sparse_text
+from convolve.memory import MemoryService, RecallPolicy
+from convolve.qdrant_client import QdrantCollections, QdrantService, VectorConfig, scheme_point_id
+from convolve.schemas import EligibilitySignals, Scheme
+from convolve.sparse import SparseEncoder
+from convolve.synthetic import (
+    random_unit_vectors,
+    synthetic_case_memories,
+    synthetic_households,
+    synthetic_schemes,
+)
+from regressions import Metric, flag_regressions
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+REPORT_DIR = PROJECT_ROOT / ".cache" / "bench"
+BENCH_COLLECTIONS = QdrantCollections(
+    schemes="bench_gov_schemes",
+    memories="bench_case_memory",
+    metadata="bench_metadata",
+)
+
+
+@dataclass(frozen=True)
+class LatencySummary:
+    queries: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_hits: float
+    mean_candidates: float
+
+
+@dataclass(frozen=True)
+class QueryFilters:
+    state: str | None = None
+    housing: str | None = None
+    caste: str | None = None
+    land_acres: float | None = None
+    point_ids: list[str] | None = None
+
+
+def unfiltered(signals: EligibilitySignals, index: EligibilityIndex) -> QueryFilters:
+    return QueryFilters()
+
+
+def state_only(signals: EligibilitySignals, index: EligibilityIndex) -> QueryFilters:
+    return QueryFilters(state=signals.state)
+
+
+def state_housing(signals: EligibilitySignals, index: EligibilityIndex) -> QueryFilters:
+    return QueryFilters(state=signals.state, housing="kutcha")
+
+
+def strict_fields(signals: EligibilitySignals, index: EligibilityIndex) -> QueryFilters:
+    return QueryFilters(state=signals.state, housing="kutcha", caste=signals.caste, land_acres=10.0)
+
+
+def eligible_ids(signals: EligibilitySignals, index: EligibilityIndex) -> QueryFilters:
+    return QueryFilters(point_ids=index.eligible_point_ids(signals))
+
+
+# Ordered from the broadest to the most selective filter.
+TIERS: dict[str, Callable[[EligibilitySignals, EligibilityIndex], QueryFilters]] = {
+    "unfiltered": unfiltered,
+    "state": state_only,
+    "state_housing": state_housing,
+    "strict_fields": strict_fields,
+    "eligible_ids": eligible_ids,
+}
+
+
+class DenseVectors:
+    def __init__(self, mode: str, dimension: int, seed: int) -> None:
+        self._embedder = EmbeddingService(load_settings()) if mode == "model" else None
+        self._rng = np.random.default_rng(seed)
+        self.dimension = self._embedder.embedding_dimension() if self._embedder else dimension
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        if self._embedder is not None:
+            return self._embedder.embed_documents(texts)
+        return random_unit_vectors(len(texts), self.dimension, self._rng).tolist()
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as handle:
+            pages = int(handle.read().split()[1])
+        return pages * resource.getpagesize() / 2**20
+    except OSError:
+        # ru_maxrss is a high-water mark in KiB on Linux and bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def summarize(latencies: list[float], hits: list[int], candidates: list[int]) -> LatencySummary:
+    values = np.array(latencies) * 1000
+    return LatencySummary(
+        queries=len(latencies),
+        mean_ms=round(float(values.mean()), 3),
+        p50_ms=round(float(np.percentile(values, 50)), 3),
+        p95_ms=round(float(np.percentile(values, 95)), 3),
+        p99_ms=round(float(np.percentile(values, 99)), 3),
+        mean_hits=round(float(np.mean(hits)), 2),
+        mean_candidates=round(float(np.mean(candidates)), 2) if candidates else 0.0,
+    )
+
+
+def connect(url: str) -> QdrantClient:
+    return QdrantClient(":memory:") if url == ":memory:" else QdrantClient(url=url, timeout=120)
+
+
+def reset_collections(client: QdrantClient) -> None:
+    for name in (BENCH_COLLECTIONS.schemes, BENCH_COLLECTIONS.memories, BENCH_COLLECTIONS.metadata):
+        if client.collection_exists(name):
+            client.delete_collection(name)
+
+
+def run_size(args: argparse.Namespace, size: int, dense: DenseVectors) -> dict[str, object]:
+    client = connect(args.url)
+    reset_collections(client)
+    encoder = SparseEncoder()
+    service = QdrantService(client, sparse_encoder=encoder, collections=BENCH_COLLECTIONS)
+    service.create_collections(VectorConfig(size=dense.dimension), VectorConfig(size=dense.dimension))
+    rss_before = rss_mb()
+
+    payloads: list[dict[str, object]] = []
+    point_ids: list[str] = []
+    upload_seconds = 0.0
+    started = perf_counter()
+    schemes = synthetic_schemes(size, seed=args.seed)
+    while batch := list(islice(schemes, args.batch_size)):
+        dense_vectors = dense.embed([scheme.description for scheme in batch])
+        sparse_vectors = encoder.encode_batch(build_sparse_text(scheme) for scheme in batch)
+        upload_started = perf_counter()
+        service.upload_schemes(batch, dense_vectors, sparse_vectors, batch_size=args.batch_size)
+        upload_seconds += perf_counter() - upload_started
+        payloads.extend(scheme_payload(scheme) for scheme in batch)
+        point_ids.extend(scheme_point_id(scheme.scheme_id) for scheme in batch)
+    ingest_seconds = perf_counter() - started
+    rss_after_schemes = rss_mb()
+
+    memory_count = int(size * args.memory_ratio)
+    memories_started = perf_counter()
+    memories = synthetic_case_memories(memory_count, seed=args.seed, scheme_ids=point_ids[:1000])
+    while batch_memories := list(islice(memories, args.batch_size)):
+        vectors = dense.embed([memory.summary_text() for memory in batch_memories])
+        service.upload_case_memories(batch_memories, vectors, batch_size=args.batch_size)
+    memory_seconds = perf_counter() - memories_started
+    rss_after_memories = rss_mb()
+
+    index = EligibilityIndex("bench", point_ids, payloads)
+    households = list(synthetic_households(args.queries, seed=args.seed + 1))
+    query_texts = [household.intent or household.summary_text() for household in households]
+    query_vectors = dense.embed(query_texts)
+    sparse_queries = encoder.encode_batch(query_texts)
+
+    search: dict[str, dict[str, object]] = {}
+    for tier, build_filters in TIERS.items():
+        latencies: list[float] = []
+        hits: list[int] = []
+        candidates: list[int] = []
+        for household, query_vector, sparse_vector in zip(
+            households, query_vectors, sparse_queries, strict=True
+        ):
+            filters = build_filters(household, index)
+            if filters.point_ids is not None:
+                candidates.append(len(filters.point_ids))
+            query_started = perf_counter()
+            results = service.search_schemes(
+                query_vector=query_vector,
+                sparse_vector=sparse_vector,
+                state=filters.state,
+                housing=filters.housing,
+                caste=filters.caste,
+                land_acres=filters.land_acres,
+                limit=args.limit,
+                point_ids=filters.point_ids,
+            )
+            latencies.append(perf_counter() - query_started)
+            hits.append(len(results))
+        search[tier] = asdict(summarize(latencies, hits, candidates))
+
+    memory = MemoryService(
+        service,
+        embedder=None,
+        recall=RecallPolicy(candidates=args.recall_candidates, scoring=args.recall_scoring),
+    )
+    memory_latencies: list[float] = []
+    memory_hits: list[int] = []
+    for query_vector in query_vectors:
+        query_started = perf_counter()
+        recalled = memory.recall_cases("", limit=args.limit, query_vector=query_vector)
+        memory_latencies.append(perf_counter() - query_started)
+        memory_hits.append(len(recalled))
+
+    if not args.keep:
+        reset_collections(client)
+    client.close()
+    return {
+        "points": size,
+        "memories": memory_count,
+        "ingest": {
+            "seconds": round(ingest_seconds, 3),
+            "points_per_second": round(size / ingest_seconds, 1) if ingest_seconds else 0.0,
+            "upload_seconds": round(upload_seconds, 3),
+            "upload_points_per_second": round(size / upload_seconds, 1) if upload_seconds else 0.0,
+            "memory_seconds": round(memory_seconds, 3),
+            "memories_per_second": round(memory_count / memory_seconds, 1) if memory_seconds else 0.0,
+        },
+        "rss_mb": {
+            "before": round(rss_before, 1),
+            "after_schemes": round(rss_after_schemes, 1),
+            "after_memories": round(rss_after_memories, 1),
+            "growth": round(rss_after_memories - rss_before, 1),
+        },
+        "search_schemes": search,
+        "search_case_memory": asdict(summarize(memory_latencies, memory_hits, [])),
+    }
+
+
+def scheme_payload(scheme: Scheme) -> dict[str, object]:
+    return {"states": scheme.states, "eligibility_rules": scheme.eligibility_rules}
+
+
+def compare(report: dict[str, object], baseline: dict[str, object], tolerance: float) -> int:
+    previous = {run["points"]: run for run in baseline["runs"]}
+    regressions = 0
+    for run in report["runs"]:
+        before = previous.get(run["points"])
+        if before is None:
+            continue
+        metrics = [
+            Metric("ingest points/s", before["ingest"]["points_per_second"], run["ingest"]["points_per_second"], True)
+        ]
+        for tier, summary in run["search_schemes"].items():
+            if tier in before["search_schemes"]:
+                metrics.append(Metric(f"{tier} p95 ms", before["search_schemes"][tier]["p95_ms"], summary["p95_ms"]))
+        metrics.append(
+            Metric("memory p95 ms", before["search_case_memory"]["p95_ms"], run["search_case_memory"]["p95_ms"])
+        )
+        metrics.append(Metric("rss growth MB", before["rss_mb"]["growth"], run["rss_mb"]["growth"]))
+        print(f"\n{run['points']:,} points vs baseline")
+        regressions += flag_regressions(metrics, tolerance)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark scheme and case-memory retrieval on synthetic data."
+    )
+    parser.add_argument(
+        "--sizes", default="1000,10000", help="comma-separated catalog sizes, up to 1000000"
+    )
+    parser.add_argument(
+        "--url", default=":memory:", help="':memory:' or a local Qdrant such as http://localhost:6333"
+    )
+    parser.add_argument("--queries", type=int, default=200, help="queries per filter tier")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--memory-ratio", type=float, default=0.1, help="case memories per scheme point")
+    parser.add_argument("--recall-candidates", type=int, default=50, help="case memories over-fetched for decay")
+    parser.add_argument(
+        "--recall-scoring",
+        choices=["server", "client"],
+        default="server",
+        help="recency decay as a Qdrant score formula or a NumPy rerank",
+    )
+    parser.add_argument(
+        "--dense",
+        choices=["random", "model"],
+        default="random",
+        help="random unit vectors or the configured embedder",
+    )
+    parser.add_argument("--dimension", type=int, default=384, help="dense size for --dense random")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="default .cache/bench/retrieval-<time>.json")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    parser.add_argument("--keep", action="store_true", help="leave the bench collections in place")
+    args = parser.parse_args()
+
+    dense = DenseVectors(args.dense, args.dimension, args.seed)
+    report: dict[str, object] = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.url,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "queries": args.queries,
+            "limit": args.limit,
+            "batch_size": args.batch_size,
+            "memory_ratio": args.memory_ratio,
+            "dense": args.dense,
+            "dimension": dense.dimension,
+            "seed": args.seed,
+        },
+        "runs": [],
+    }
+    for size in (int(value) for value in args.sizes.split(",") if value.strip()):
+        print(f"benchmarking {size:,} points against {args.url}")
+        run = run_size(args, size, dense)
+        report["runs"].append(run)
+        ingest = run["ingest"]
+        print(f"  ingest {ingest['points_per_second']:,.0f} points/s, rss +{run['rss_mb']['growth']} MB")
+        for tier, summary in run["search_schemes"].items():
+            print(
+                f"  {tier:<14} p50 {summary['p50_ms']:.2f} ms  p95 {summary['p95_ms']:.2f} ms  "
+                f"p99 {summary['p99_ms']:.2f} ms"
+            )
+        memory_summary = run["search_case_memory"]
+        print(f"  {'case_memory':<14} p50 {memory_summary['p50_ms']:.2f} ms  p95 {memory_summary['p95_ms']:.2f} ms")
+
+    stamp = f"{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+    output = args.output or REPORT_DIR / f"retrieval-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"report written to {output}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
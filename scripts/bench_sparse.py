@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+import random
+from time import perf_counter
+
+from convolve.ingest import build_sparse_text, load_seed_schemes
+from convolve.sparse import SparseEncoder, stable_hash, tokenize
+
+
+def legacy_encode(encoder: SparseEncoder, text: str) -> tuple[list[int], list[float]]:
+    tokens = tokenize(text)
+    if not tokens:
+        return [], []
+    hashed_counts: Counter[int] = Counter()
+    for token in tokens:
+        hashed_counts[stable_hash(token) % encoder.vocab_size] += 1
+    most_common = hashed_counts.most_common(encoder.max_terms)
+    max_count = most_common[0][1]
+    return [index for index, _ in most_common], [count / max_count for _, count in most_common]
+
+
+def synthetic_corpus(size: int, seed: int = 7) -> list[str]:
+    base = [build_sparse_text(scheme) for scheme in load_seed_schemes()]
+    vocabulary = sorted({token for text in base for token in tokenize(text)})
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(vocabulary, k=rng.randint(20, 200))) for _ in range(size)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the sparse encoder against the legacy path.")
+    parser.add_argument("--texts", type=int, default=20_000)
+    parser.add_argument("--processes", type=int, default=0)
+    args = parser.parse_args()
+
+    encoder = SparseEncoder()
+    corpus = synthetic_corpus(args.texts)
+
+    start = perf_counter()
+    legacy = [legacy_encode(encoder, text) for text in corpus]
+    legacy_seconds = perf_counter() - start
+
+    start = perf_counter()
+    batched = encoder.encode_batch(corpus, processes=args.processes or None)
+    batched_seconds = perf_counter() - start
+
+    mismatches = sum(
+        1
+        for (indices, values), vector in zip(legacy, batched, strict=True)
+        if indices != vector.indices or values != vector.values
+    )
+    print(f"texts: {len(corpus)}")
+    print(f"legacy encode: {legacy_seconds:.3f}s ({len(corpus) / legacy_seconds:,.0f} texts/s)")
+    print(f"encode_batch:  {batched_seconds:.3f}s ({len(corpus) / batched_seconds:,.0f} texts/s)")
+    print(f"speedup: {legacy_seconds / batched_seconds:.2f}x")
+    print(f"mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
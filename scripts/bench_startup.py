@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import re
+import socket
+import subprocess
+import sys
+from time import perf_counter, sleep
+
+import httpx
+
+from regressions import Metric, flag_regressions
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+REPORT_DIR = PROJECT_ROOT / ".cache" / "bench"
+# Modules that must stay out of `import convolve.api`; each is loaded on first use instead.
+FORBIDDEN = ("torch", "sentence_transformers", "langchain_huggingface", "langchain_openai", "openai", "PIL")
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+SAMPLE_REQUEST = {
+    "state": "Maharashtra",
+    "caste": "SC",
+    "land_acres": 1.5,
+    "annual_income": 90000,
+    "housing_type": "kutcha",
+    "intent": "housing support for a small farmer",
+}
+
+
+def child_env() -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT / "src"), env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_import(module: str) -> dict[str, object]:
+    env = child_env()
+    # convolve.api validates Qdrant settings at import time but never dials out until start-up.
+    env.setdefault("QDRANT_URL", ":memory:")
+    env.setdefault("QDRANT_API_KEY", "bench")
+    code = f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))"
+    started = perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    wall_ms = (perf_counter() - started) * 1000
+    cumulative: dict[str, int] = {}
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        cumulative_us, depth, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        cumulative[name] = cumulative_us
+        if depth == 1:
+            total_us += cumulative_us
+    loaded = set(json.loads(completed.stdout.strip().splitlines()[-1]))
+    top_level = {name: us for name, us in cumulative.items() if "." not in name}
+    return {
+        "module": module,
+        "import_ms": round(total_us / 1000, 1),
+        "process_ms": round(wall_ms, 1),
+        "modules_loaded": len(loaded),
+        "forbidden_loaded": [name for name in FORBIDDEN if name in loaded],
+        "top_packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:15]
+        },
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(client: httpx.Client, path: str, deadline: float) -> float:
+    while perf_counter() < deadline:
+        try:
+            if client.get(path).status_code == 200:
+                return perf_counter()
+        except httpx.TransportError:
+            pass
+        sleep(0.05)
+    raise TimeoutError(f"{path} did not return 200 in time")
+
+
+def measure_serve(timeout: float) -> dict[str, object]:
+    port = free_port()
+    started = perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "convolve.api:app", "--port", str(port), "--log-level", "warning"],
+        env=child_env(),
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            deadline = started + timeout
+            health = wait_for(client, "/health", deadline)
+            ready = wait_for(client, "/ready", deadline)
+            checks = client.get("/ready").json().get("checks", {})
+            request_started = perf_counter()
+            response = client.post("/analyze", json=SAMPLE_REQUEST)
+            response.raise_for_status()
+            first_request_ms = (perf_counter() - request_started) * 1000
+            request_started = perf_counter()
+            client.post("/analyze", json={**SAMPLE_REQUEST, "land_acres": 2.5}).raise_for_status()
+            second_request_ms = (perf_counter() - request_started) * 1000
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return {
+        "time_to_health_ms": round((health - started) * 1000, 1),
+        "time_to_ready_ms": round((ready - started) * 1000, 1),
+        "first_request_ms": round(first_request_ms, 1),
+        "second_request_ms": round(second_request_ms, 1),
+        "checks": checks,
+    }
+
+
+def compare(report: dict[str, object], baseline: dict[str, object], tolerance: float) -> int:
+    metrics = [Metric("import ms", baseline["import"]["import_ms"], report["import"]["import_ms"])]
+    if "serve" in report and "serve" in baseline:
+        for key in ("time_to_ready_ms", "first_request_ms"):
+            metrics.append(Metric(key.replace("_", " "), baseline["serve"][key], report["serve"][key]))
+    print("\nvs baseline")
+    return flag_regressions(metrics, tolerance)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure API import time and, with --serve, time to /health, /ready and the first request."
+    )
+    parser.add_argument("--module", default="convolve.api")
+    parser.add_argument("--runs", type=int, default=3, help="import measurements; the fastest is kept")
+    parser.add_argument("--import-budget-ms", type=float, default=1500.0, help="fail above this import time")
+    parser.add_argument("--serve", action="store_true", help="start uvicorn against the configured Qdrant")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for /ready")
+    parser.add_argument("--output", type=Path, help="default .cache/bench/startup-<time>.json")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    # The first run warms the bytecode cache, so the fastest of a few runs is the stable number.
+    imports = [measure_import(args.module) for _ in range(max(args.runs, 1))]
+    measured = min(imports, key=lambda run: run["import_ms"])
+    print(
+        f"import {args.module}: {measured['import_ms']:.0f} ms "
+        f"({measured['modules_loaded']} modules, process {measured['process_ms']:.0f} ms)"
+    )
+    for name, elapsed in list(measured["top_packages_ms"].items())[:8]:
+        print(f"  {name:<28} {elapsed:>8.1f} ms")
+    report: dict[str, object] = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"module": args.module, "runs": len(imports), "import_budget_ms": args.import_budget_ms},
+        "import": measured,
+    }
+    if args.serve:
+        serve = measure_serve(args.timeout)
+        report["serve"] = serve
+        print(
+            f"health {serve['time_to_health_ms']:.0f} ms  ready {serve['time_to_ready_ms']:.0f} ms  "
+            f"first request {serve['first_request_ms']:.0f} ms  second {serve['second_request_ms']:.0f} ms"
+        )
+
+    stamp = f"{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+    output = args.output or REPORT_DIR / f"startup-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"report written to {output}")
+
+    failures = []
+    if measured["forbidden_loaded"]:
+        failures.append(f"heavy modules imported eagerly: {', '.join(measured['forbidden_loaded'])}")
+    if measured["import_ms"] > args.import_budget_ms:
+        failures.append(f"import took {measured['import_ms']:.0f} ms, budget {args.import_budget_ms:.0f} ms")
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if compare(report, baseline, args.tolerance):
+            failures.append("regressed against baseline")
+    for failure in failures:
+        print(failure)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
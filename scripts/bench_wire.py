@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timezone
+from itertools import islice
+import json
+import os
+from pathlib import Path
+import platform
+import socket
+import sys
+import threading
+from time import perf_counter
+from urllib.parse import urlsplit
+
+import numpy as np
+from qdrant_client import QdrantClient
+
+from convolve.config import DEFAULT_MEMORY_PAYLOAD_EXCLUDE, DEFAULT_SCHEME_PAYLOAD_FIELDS
+from convolve.ingest import build_sparse_text
+from convolve.memory import MemoryService, RecallPolicy
+from convolve.qdrant_client import (
+    FULL_PAYLOAD,
+    PayloadFields,
+    PayloadProjections,
+    QdrantCollections,
+    QdrantService,
+    VectorConfig,
+    scheme_point_id,
+)
+from convolve.sparse import SparseEncoder
+from convolve.synthetic import (
+    random_unit_vectors,
+    synthetic_case_memories,
+    synthetic_households,
+    synthetic_schemes,
+)
+from regressions import Metric, flag_regressions
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+REPORT_DIR = PROJECT_ROOT / ".cache" / "bench"
+BENCH_COLLECTIONS = QdrantCollections(
+    schemes="bench_wire_gov_schemes",
+    memories="bench_wire_case_memory",
+    metadata="bench_wire_metadata",
+)
+LEAN = PayloadProjections(
+    schemes=PayloadFields(include=DEFAULT_SCHEME_PAYLOAD_FIELDS),
+    memories=PayloadFields(exclude=DEFAULT_MEMORY_PAYLOAD_EXCLUDE),
+)
+# rest-full is the path before payload projection and gRPC; the others are compared against it.
+VARIANTS = {
+    "rest-full": (False, None),
+    "rest-lean": (False, LEAN),
+    "grpc-full": (True, None),
+    "grpc-lean": (True, LEAN),
+}
+
+
+class ByteCountingProxy:
+    # Forwards raw TCP, so REST and gRPC are counted the same way: every byte either client
+    # writes to or reads from Qdrant, headers and framing included.
+    def __init__(self, target_host: str, target_port: int) -> None:
+        self._target = (target_host, target_port)
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.port = self._server.getsockname()[1]
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.received = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.sent = 0
+            self.received = 0
+
+    def close(self) -> None:
+        self._server.close()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            upstream = socket.create_connection(self._target)
+            threading.Thread(target=self._pipe, args=(client, upstream, "sent"), daemon=True).start()
+            threading.Thread(target=self._pipe, args=(upstream, client, "received"), daemon=True).start()
+
+    def _pipe(self, source: socket.socket, target: socket.socket, counter: str) -> None:
+        try:
+            while data := source.recv(65_536):
+                target.sendall(data)
+                with self._lock:
+                    setattr(self, counter, getattr(self, counter) + len(data))
+        except OSError:
+            pass
+        finally:
+            for sock in (source, target):
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+
+def seed_collections(args: argparse.Namespace, rng: np.random.Generator) -> list[str]:
+    client = QdrantClient(url=args.url, api_key=args.api_key, timeout=120)
+    encoder = SparseEncoder()
+    service = QdrantService(client, sparse_encoder=encoder, collections=BENCH_COLLECTIONS)
+    reset_collections(client)
+    service.create_collections(VectorConfig(size=args.dimension), VectorConfig(size=args.dimension))
+    point_ids: list[str] = []
+    schemes = synthetic_schemes(args.schemes, seed=args.seed)
+    while batch := list(islice(schemes, 512)):
+        dense = random_unit_vectors(len(batch), args.dimension, rng).tolist()
+        sparse = encoder.encode_batch(build_sparse_text(scheme) for scheme in batch)
+        service.upload_schemes(batch, dense, sparse, batch_size=512)
+        point_ids.extend(scheme_point_id(scheme.scheme_id) for scheme in batch)
+    memories = synthetic_case_memories(args.memories, seed=args.seed, scheme_ids=point_ids[:1000])
+    while batch_memories := list(islice(memories, 512)):
+        vectors = random_unit_vectors(len(batch_memories), args.dimension, rng).tolist()
+        service.upload_case_memories(batch_memories, vectors, batch_size=512)
+    client.close()
+    return point_ids
+
+
+def reset_collections(client: QdrantClient) -> None:
+    for name in (BENCH_COLLECTIONS.schemes, BENCH_COLLECTIONS.memories, BENCH_COLLECTIONS.metadata):
+        if client.collection_exists(name):
+            client.delete_collection(name)
+
+
+def summarize(latencies: list[float], wire_bytes: int, hits: int) -> dict[str, float]:
+    values = np.array(latencies) * 1000
+    return {
+        "queries": len(latencies),
+        "bytes_per_query": round(wire_bytes / len(latencies), 1),
+        "hits_per_query": round(hits / len(latencies), 2),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+    }
+
+
+def run_variant(
+    args: argparse.Namespace,
+    proxies: tuple[ByteCountingProxy, ByteCountingProxy],
+    prefer_grpc: bool,
+    projections: PayloadProjections | None,
+    queries: list[tuple[list[float], object, str | None]],
+) -> dict[str, dict[str, float]]:
+    rest, grpc = proxies
+    client = QdrantClient(
+        host="127.0.0.1",
+        port=rest.port,
+        grpc_port=grpc.port,
+        prefer_grpc=prefer_grpc,
+        api_key=args.api_key,
+        https=False,
+        timeout=120,
+    )
+    service = QdrantService(client, collections=BENCH_COLLECTIONS, projections=projections)
+    memory = MemoryService(
+        service,
+        embedder=None,
+        recall=RecallPolicy(candidates=args.recall_candidates, scoring=args.recall_scoring),
+    )
+
+    def search_schemes(vector: list[float], sparse: object, state: str | None) -> int:
+        return len(
+            service.search_schemes(
+                query_vector=vector,
+                sparse_vector=sparse,
+                state=state,
+                housing=None,
+                caste=None,
+                land_acres=None,
+                limit=args.limit,
+            )
+        )
+
+    def recall(vector: list[float], sparse: object, state: str | None) -> int:
+        if projections is None and args.recall_scoring == "client":
+            # Before projection the whole over-fetched pool shipped its full payload.
+            pool = max(args.recall_candidates, args.limit)
+            return len(service.search_case_memory(vector, limit=args.limit, candidates=pool, payload=FULL_PAYLOAD))
+        return len(memory.recall_cases("", limit=args.limit, query_vector=vector))
+
+    results: dict[str, dict[str, float]] = {}
+    for kind, search in (("schemes", search_schemes), ("memories", recall)):
+        # Connection set-up and the gRPC channel handshake are not part of the steady state.
+        for vector, sparse, state in queries[: args.warm_up]:
+            search(vector, sparse, state)
+        rest.reset()
+        grpc.reset()
+        latencies: list[float] = []
+        hits = 0
+        for vector, sparse, state in queries:
+            started = perf_counter()
+            hits += search(vector, sparse, state)
+            latencies.append(perf_counter() - started)
+        wire = rest.sent + rest.received + grpc.sent + grpc.received
+        results[kind] = summarize(latencies, wire, hits)
+    client.close()
+    return results
+
+
+def compare(report: dict[str, object], baseline: dict[str, object], tolerance: float) -> int:
+    metrics = [
+        Metric(f"{variant} {kind} {key.replace('_', ' ')}", baseline["variants"][variant][kind][key], summary[key])
+        for variant, kinds in report["variants"].items()
+        if variant in baseline["variants"]
+        for kind, summary in kinds.items()
+        for key in ("bytes_per_query", "p95_ms")
+    ]
+    print("\nvs baseline")
+    return flag_regressions(metrics, tolerance, width=36)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare bytes on the wire and latency of scheme and memory search over REST and gRPC, "
+        "with full and projected payloads."
+    )
+    parser.add_argument("--url", default="http://localhost:6333", help="plain-HTTP Qdrant REST endpoint")
+    parser.add_argument("--grpc-port", type=int, default=6334)
+    parser.add_argument("--api-key", default=os.getenv("QDRANT_API_KEY"))
+    parser.add_argument("--schemes", type=int, default=5_000)
+    parser.add_argument("--memories", type=int, default=5_000)
+    parser.add_argument("--queries", type=int, default=200, help="queries per variant and search")
+    parser.add_argument("--warm-up", type=int, default=10, help="untimed queries before counting")
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--recall-candidates", type=int, default=50, help="case memories over-fetched for decay")
+    parser.add_argument("--recall-scoring", choices=["server", "client"], default="client")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, help="default .cache/bench/wire-<time>.json")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative growth")
+    parser.add_argument("--keep", action="store_true", help="leave the bench collections in place")
+    args = parser.parse_args()
+
+    target = urlsplit(args.url)
+    if target.scheme != "http" or not target.hostname:
+        parser.error("--url must be a plain-HTTP Qdrant endpoint; the byte counter cannot see inside TLS")
+    rng = np.random.default_rng(args.seed)
+    print(f"seeding {args.schemes:,} schemes and {args.memories:,} case memories in {args.url}")
+    seed_collections(args, rng)
+
+    encoder = SparseEncoder()
+    households = list(synthetic_households(args.queries, seed=args.seed + 1))
+    texts = [household.intent or household.summary_text() for household in households]
+    queries = list(
+        zip(
+            random_unit_vectors(len(texts), args.dimension, rng).tolist(),
+            encoder.encode_batch(texts),
+            [household.state for household in households],
+            strict=True,
+        )
+    )
+    proxies = (
+        ByteCountingProxy(target.hostname, target.port or 6333),
+        ByteCountingProxy(target.hostname, args.grpc_port),
+    )
+    report: dict[str, object] = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.url,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "schemes": args.schemes,
+            "memories": args.memories,
+            "queries": args.queries,
+            "limit": args.limit,
+            "recall_candidates": args.recall_candidates,
+            "recall_scoring": args.recall_scoring,
+            "dimension": args.dimension,
+            "scheme_payload_fields": list(DEFAULT_SCHEME_PAYLOAD_FIELDS),
+            "memory_payload_exclude": list(DEFAULT_MEMORY_PAYLOAD_EXCLUDE),
+        },
+        "variants": {},
+    }
+    try:
+        for name, (prefer_grpc, projections) in VARIANTS.items():
+            report["variants"][name] = run_variant(args, proxies, prefer_grpc, projections, queries)
+    finally:
+        for proxy in proxies:
+            proxy.close()
+        if not args.keep:
+            client = QdrantClient(url=args.url, api_key=args.api_key, timeout=120)
+            reset_collections(client)
+            client.close()
+
+    reference = report["variants"]["rest-full"]
+    for name, kinds in report["variants"].items():
+        for kind, summary in kinds.items():
+            saved = 1 - summary["bytes_per_query"] / reference[kind]["bytes_per_query"]
+            print(
+                f"  {name:<10} {kind:<9} {summary['bytes_per_query']:>10,.0f} B/query ({saved:+.0%} saved)  "
+                f"p50 {summary['p50_ms']:.2f} ms  p95 {summary['p95_ms']:.2f} ms"
+            )
+
+    stamp = f"{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+    output = args.output or REPORT_DIR / f"wire-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"report written to {output}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+from statistics import median
+import sys
+from time import perf_counter
+
+from convolve.catalog import CatalogWatcher
+from convolve.config import load_settings
+from convolve.ingest import load_seed_schemes
+from convolve.qdrant_client import SchemeQuery
+from convolve.replica import SchemeReplica
+from convolve.services import build_services
+
+
+STATES = [None, "Bihar", "Rajasthan", "Kerala"]
+HOUSING = [None, "kutcha", "pucca"]
+CASTES = [None, "SC"]
+LAND = [None, 2.0, 10.0]
+
+
+async def compare(limit: int) -> int:
+    services = build_services(load_settings())
+    try:
+        watcher = CatalogWatcher(services.async_qdrant, with_vectors=True)
+        replica = SchemeReplica.from_snapshot(await watcher.snapshot())
+        texts = [scheme.description for scheme in load_seed_schemes()] + ["help for poor farmers"]
+        vectors = await services.embedder.aembed_documents(texts)
+        sparse_vectors = services.async_qdrant.build_sparse_queries(texts)
+
+        mismatches = 0
+        reordered = 0
+        checked = 0
+        qdrant_ms: list[float] = []
+        replica_ms: list[float] = []
+        for (text, vector, sparse), (state, housing, caste, land) in itertools.product(
+            zip(texts, vectors, sparse_vectors, strict=True),
+            itertools.product(STATES, HOUSING, CASTES, LAND),
+        ):
+            query = SchemeQuery(vector, sparse, state, housing, caste, land, limit)
+            started = perf_counter()
+            expected = await services.async_qdrant.search_schemes_batch([query])
+            qdrant_ms.append((perf_counter() - started) * 1000)
+            started = perf_counter()
+            actual = replica.search(query)
+            replica_ms.append((perf_counter() - started) * 1000)
+            checked += 1
+            expected_ids = [str(point.id) for point in expected[0]]
+            actual_ids = [str(point.id) for point in actual]
+            if expected_ids == actual_ids:
+                continue
+            # Equal-score candidates come back in engine-specific order, which shifts RRF ranks;
+            # a tie at a prefetch cutoff can also swap which candidate makes the list.
+            if set(expected_ids) == set(actual_ids):
+                reordered += 1
+            else:
+                mismatches += 1
+                print(f"mismatch for {text[:40]!r} {state=} {housing=} {caste=} {land=}")
+                print(f"  qdrant:  {expected_ids}")
+                print(f"  replica: {actual_ids}")
+    finally:
+        await services.aclose()
+
+    print(f"replica version {replica.version}, {len(replica)} points")
+    print(f"queries checked: {checked}, reordered: {reordered}, mismatches: {mismatches}")
+    print(f"median latency: qdrant {median(qdrant_ms):.2f} ms, replica {median(replica_ms):.3f} ms")
+    return 1 if mismatches else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the in-process scheme replica against Qdrant.")
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(compare(args.limit)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import replace
+from datetime import timedelta
+import json
+
+from convolve.compaction import CaseMemoryCompactor, CompactionReport, report_dict
+from convolve.config import load_settings
+from convolve.services import build_compaction_policy, build_services
+
+
+async def compact(args: argparse.Namespace) -> CompactionReport:
+    settings = load_settings()
+    policy = build_compaction_policy(settings)
+    policy = replace(
+        policy,
+        similarity_threshold=args.similarity if args.similarity is not None else policy.similarity_threshold,
+        min_draft_age=timedelta(hours=args.min_age_hours),
+        page_size=args.page_size,
+    )
+    if args.draft_ttl_days is not None:
+        policy = replace(policy, draft_ttl=timedelta(days=args.draft_ttl_days) if args.draft_ttl_days > 0 else None)
+    if args.stale_drafts is not None:
+        policy = replace(policy, stale_draft_action=args.stale_drafts)
+    services = build_services(settings, timeout=120)
+    try:
+        compactor = CaseMemoryCompactor(services.async_qdrant, policy)
+        return await compactor.run(dry_run=args.dry_run, full=args.full, max_pages=args.max_pages)
+    finally:
+        await services.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Merge near-duplicate draft case memories and archive or delete stale drafts."
+    )
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--full", action="store_true", help="ignore the checkpoint and rescan every draft")
+    parser.add_argument("--similarity", type=float, help="default MEMORY_DEDUP_THRESHOLD")
+    parser.add_argument("--draft-ttl-days", type=float, help="default MEMORY_DRAFT_TTL_DAYS; 0 disables expiry")
+    parser.add_argument("--stale-drafts", choices=["archive", "delete", "keep"], help="default MEMORY_STALE_DRAFT_ACTION")
+    parser.add_argument("--min-age-hours", type=float, default=24.0, help="leave younger drafts alone")
+    parser.add_argument("--page-size", type=int, default=256)
+    parser.add_argument("--max-pages", type=int, help="per-phase page budget; the next run resumes")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(compact(args))
+    if args.json:
+        print(json.dumps(report_dict(report), indent=2))
+        return
+    verb = "would merge" if report.dry_run else "merged"
+    print(
+        f"scanned {report.scanned} drafts in {report.pages} pages: {verb} {report.merged} into "
+        f"{report.survivors} cases, {report.expired} stale drafts, {report.elapsed_ms:.0f} ms"
+    )
+    if report.watermark:
+        print(f"next incremental run starts at drafts created after {report.watermark}")
+
+
+if __name__ == "__main__":
+    main()
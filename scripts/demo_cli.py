@@ -4,6 +4,7 @@ import json
 
 from convolve.chains import run_retrieval_pipeline
 from convolve.config import load_settings
+from convolve.services import build_services
 from convolve.vision import fallback_signals
 
 
@@ -15,5 +16,9 @@ if __name__ == "__main__":
     signals.land_acres = 2.0
     signals.intent = "support for distressed farmers"
 
-    result = run_retrieval_pipeline(settings, signals, query_intent=signals.intent)
+    services = build_services(settings)
+    try:
+        result = run_retrieval_pipeline(services, signals, query_intent=signals.intent)
+    finally:
+        services.close()
     print(json.dumps([ex for ex in result.explanations], indent=2))
\ No newline at end of file
@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from convolve.onnx_embeddings import main
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,7 @@
 from __future__ import annotations
 
-from convolve.config import load_settings
-from convolve.ingest import ingest_schemes
+from convolve.ingest import main
 
 
 if __name__ == "__main__":
-    ingest_schemes(load_settings())
\ No newline at end of file
+    main()
@@ -0,0 +1,714 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+from collections import Counter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from functools import lru_cache
+import hashlib
+import io
+import json
+import math
+import os
+from pathlib import Path
+import platform
+import random
+import sys
+from time import perf_counter, sleep
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Iterator
+
+import httpx
+import numpy as np
+from PIL import Image
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models as qdrant_models
+
+from convolve.config import Settings, load_settings
+from convolve.embeddings import EmbeddingService, normalize_query
+from convolve.ingest import build_sparse_text, catalog_version, load_seed_schemes
+from convolve.qdrant_client import VectorConfig, scheme_content_hash
+from convolve.services import ServiceContainer, build_services
+from convolve.synthetic import synthetic_case_memories, synthetic_schemes
+from convolve.traffic import RecordedRequest, read_traffic, synthesize_traffic, write_traffic
+from convolve.vision import VisionService, fallback_signals
+from regressions import Metric, flag_regressions
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+REPORT_DIR = PROJECT_ROOT / ".cache" / "loadgen"
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+PERCENTILE_LADDER = (50.0, 75.0, 90.0, 95.0, 99.0, 99.9, 99.99, 100.0)
+# Extra cost of each additional row in a stubbed embedding batch, relative to one query.
+BATCH_ROW_COST = 0.02
+
+
+class LatencyHistogram:
+    # Log-spaced buckets with ~1% relative error, the same trade-off HdrHistogram makes at two
+    # significant digits, so millions of samples fit in a few hundred counters.
+    def __init__(self, precision: float = 0.01) -> None:
+        self._log_base = math.log1p(precision)
+        self._counts: Counter[int] = Counter()
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    def record(self, value_ms: float) -> None:
+        value_us = max(value_ms * 1000, 1.0)
+        self._counts[int(math.log(value_us) / self._log_base)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.min_ms = min(self.min_ms, value_ms)
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def merge(self, other: LatencyHistogram) -> None:
+        self._counts.update(other._counts)
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, percentile: float) -> float:
+        if not self.count:
+            return 0.0
+        target = max(math.ceil(self.count * percentile / 100), 1)
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= target:
+                return min(math.exp((index + 1) * self._log_base) / 1000, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> dict[str, float]:
+        summary = {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms, 3) if self.count else 0.0,
+        }
+        for percentile in PERCENTILES:
+            summary[f"p{percentile:g}_ms".replace(".", "")] = round(self.percentile(percentile), 3)
+        summary["max_ms"] = round(self.max_ms, 3)
+        return summary
+
+    def distribution(self) -> list[dict[str, float]]:
+        return [
+            {"percentile": percentile, "value_ms": round(self.percentile(percentile), 3)}
+            for percentile in PERCENTILE_LADDER
+        ]
+
+
+class EndpointStats:
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()
+        self.statuses: Counter[str] = Counter()
+        self.errors = 0
+        self.skipped = 0
+
+    def record(self, status: int | None, latency_ms: float) -> None:
+        self.latency.record(latency_ms)
+        self.statuses[str(status) if status is not None else "transport_error"] += 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def merge(self, other: EndpointStats) -> None:
+        self.latency.merge(other.latency)
+        self.statuses.update(other.statuses)
+        self.errors += other.errors
+        self.skipped += other.skipped
+
+    def report(self, elapsed_seconds: float) -> dict[str, Any]:
+        completed = self.latency.count
+        return {
+            "requests": completed,
+            "throughput_rps": round(completed / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+            "error_rate": round(self.errors / completed, 4) if completed else 0.0,
+            "skipped": self.skipped,
+            "statuses": dict(sorted(self.statuses.items())),
+            "latency": self.latency.summary(),
+            "histogram": self.latency.distribution(),
+        }
+
+
+class LoadRun:
+    def __init__(self, images: list[str], timeout_seconds: float) -> None:
+        self.endpoints: dict[str, EndpointStats] = {}
+        self._images = images
+        self._timeout = timeout_seconds
+        self._memory_ids: dict[int, asyncio.Future[str | None]] = {}
+
+    def stats(self, endpoint: str) -> EndpointStats:
+        return self.endpoints.setdefault(endpoint, EndpointStats())
+
+    def expect(self, index: int, record: RecordedRequest) -> None:
+        if record.path == "/analyze":
+            self._memory_ids[index] = asyncio.get_running_loop().create_future()
+
+    async def send(
+        self,
+        client: httpx.AsyncClient,
+        index: int,
+        record: RecordedRequest,
+        scheduled: float | None = None,
+    ) -> None:
+        # Open-loop latency counts from the scheduled send time, so client-side queueing during
+        # a stall shows up instead of being hidden (coordinated omission).
+        started = perf_counter() if scheduled is None else scheduled
+        path = record.path
+        if record.case_ref is not None:
+            # A memory update needs the case its analysis created, so it waits for that reply.
+            case_id = await self._case_id(record.case_ref)
+            if case_id is None:
+                self.stats(record.endpoint).skipped += 1
+                return
+            path = f"/memory/{case_id}"
+            started = max(started, perf_counter())
+        body = self._body(index, record)
+        status: int | None = None
+        memory_id: str | None = None
+        try:
+            response = await client.request(record.method, path, json=body, timeout=self._timeout)
+            status = response.status_code
+            if record.path == "/analyze" and status == 200:
+                memory_id = response.json().get("memory_id")
+        except httpx.HTTPError:
+            status = None
+        finally:
+            future = self._memory_ids.get(index)
+            if future is not None and not future.done():
+                future.set_result(memory_id)
+        self.stats(record.endpoint).record(status, (perf_counter() - started) * 1000)
+
+    async def _case_id(self, index: int) -> str | None:
+        future = self._memory_ids.get(index)
+        if future is None:
+            return None
+        return await future
+
+    def _body(self, index: int, record: RecordedRequest) -> dict[str, Any] | None:
+        if not record.body:
+            return record.body
+        body = dict(record.body)
+        if body.pop("image_redacted", False):
+            body["image_base64"] = self._images[index % len(self._images)]
+        return body
+
+
+@dataclass(frozen=True)
+class StepResult:
+    offered_rps: float
+    achieved_rps: float
+    p99_ms: float
+    error_rate: float
+    saturated: bool
+    endpoints: dict[str, Any]
+
+
+class HashingEmbeddings:
+    def __init__(self, dimension: int, latency_ms: float) -> None:
+        self._dimension = dimension
+        self._latency = latency_ms / 1000
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        # A batched forward pass costs about one single-text call plus a little per extra row.
+        if self._latency and texts:
+            sleep(self._latency * (1 + BATCH_ROW_COST * (len(texts) - 1)))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        # Runs on the embedding executor thread, where a real model would hold the worker.
+        if self._latency:
+            sleep(self._latency)
+        return self._vector(text)
+
+    def _vector(self, text: str) -> list[float]:
+        tokens = normalize_query(text).split() or [""]
+        vector = np.sum([self._token_vector(token) for token in tokens], axis=0)
+        return (vector / (np.linalg.norm(vector) or 1.0)).tolist()
+
+    @lru_cache(maxsize=65_536)
+    def _token_vector(self, token: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+        return np.random.default_rng(seed).standard_normal(self._dimension, dtype=np.float32)
+
+
+class StubEmbeddingService(EmbeddingService):
+    def __init__(self, settings: Settings, dimension: int, latency_ms: float) -> None:
+        super().__init__(settings)
+        self._stub = HashingEmbeddings(dimension, latency_ms)
+
+    def model_name(self) -> str:
+        return "stub-hashing"
+
+    def _get_backend(self) -> HashingEmbeddings:
+        return self._stub
+
+
+class StubResponses:
+    def __init__(self, latency_ms: float) -> None:
+        self._latency = latency_ms / 1000
+
+    async def create(self, **request: Any) -> SimpleNamespace:
+        await asyncio.sleep(self._latency)
+        return SimpleNamespace(output_text=fallback_signals().model_dump_json())
+
+
+class StubVisionClient:
+    def __init__(self, latency_ms: float) -> None:
+        self.responses = StubResponses(latency_ms)
+
+
+def stub_settings(settings: Settings) -> Settings:
+    return replace(
+        settings,
+        openai_api_key=None,
+        qdrant_url=":memory:",
+        # A spawned worker process would load the real model instead of the stub.
+        embedding_batch_process=False,
+        qdrant_api_key="stub",
+        embedding_backend="stub",
+        document_cache_path=None,
+        traffic_record_path=None,
+    )
+
+
+def build_stub_services(args: argparse.Namespace) -> ServiceContainer:
+    settings = stub_settings(load_settings())
+    client = QdrantClient(":memory:")
+    async_client = AsyncQdrantClient(":memory:")
+    vision_client = StubVisionClient(args.stub_vision_ms)
+    services = build_services(
+        settings,
+        write_behind=True,
+        client=client,
+        async_client=async_client,
+        embedder=StubEmbeddingService(settings, args.dimension, args.stub_embed_ms),
+        # Image decoding, downscaling and the perceptual-hash cache stay real; only the model call is stubbed.
+        vision=VisionService(settings, client=vision_client, async_client=vision_client),
+    )
+    seed_stub_catalog(services, args.schemes, args.memories, args.seed)
+    return services
+
+
+def seed_stub_catalog(services: ServiceContainer, scheme_count: int, memory_count: int, seed: int) -> None:
+    schemes = load_seed_schemes() + list(synthetic_schemes(scheme_count, seed=seed))
+    dense = services.embedder.embed_documents([scheme.description for scheme in schemes])
+    sparse = services.sparse_encoder.encode_batch(build_sparse_text(scheme) for scheme in schemes)
+    model = services.embedder.model_name()
+    hashes = [scheme_content_hash(scheme, model) for scheme in schemes]
+    vector = VectorConfig(size=len(dense[0]))
+    services.qdrant.create_collections(scheme_vector=vector, memory_vector=vector)
+    services.qdrant.upload_schemes(schemes, dense, sparse, content_hashes=hashes)
+    services.qdrant.write_catalog_version(
+        catalog_version({scheme.scheme_id: content_hash for scheme, content_hash in zip(schemes, hashes)}),
+        len(schemes),
+    )
+    if memory_count:
+        memories = list(
+            synthetic_case_memories(memory_count, seed=seed, scheme_ids=[scheme.scheme_id for scheme in schemes])
+        )
+        vectors = services.embedder.embed_documents([memory.signals.summary_text() for memory in memories])
+        services.qdrant.upload_case_memories(memories, vectors)
+
+
+async def mirror_collections(client: QdrantClient, async_client: AsyncQdrantClient) -> None:
+    # The sync and async in-memory clients keep separate stores, so the seeded catalog is copied.
+    for collection in client.get_collections().collections:
+        info = client.get_collection(collection.name)
+        await async_client.create_collection(
+            collection_name=collection.name,
+            vectors_config=info.config.params.vectors,
+            sparse_vectors_config=info.config.params.sparse_vectors,
+        )
+        offset: qdrant_models.ExtendedPointId | None = None
+        while True:
+            points, offset = client.scroll(
+                collection.name, limit=1_000, offset=offset, with_vectors=True
+            )
+            if points:
+                await async_client.upsert(
+                    collection.name,
+                    points=[
+                        qdrant_models.PointStruct(id=point.id, vector=point.vector or {}, payload=point.payload)
+                        for point in points
+                    ],
+                )
+            if offset is None:
+                break
+
+
+@asynccontextmanager
+async def open_target(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits) as client:
+            yield client
+        return
+
+    if args.stub:
+        # convolve.api validates Qdrant settings at import time; stub mode never dials out.
+        os.environ.setdefault("QDRANT_URL", ":memory:")
+        os.environ.setdefault("QDRANT_API_KEY", "stub")
+    from convolve import api
+
+    if args.stub:
+        services = build_stub_services(args)
+        await mirror_collections(services.client, services.async_client)
+    else:
+        services = build_services(api.settings, write_behind=True)
+    # ASGITransport does not run the lifespan, so the services are wired up here instead.
+    await services.start()
+    api.app.state.services = services
+    try:
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadgen", limits=limits) as client:
+            yield client
+    finally:
+        await services.aclose()
+
+
+def placeholder_images(count: int, seed: int) -> list[str]:
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        pixels = rng.integers(0, 256, size=(960, 1280, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format="JPEG", quality=85)
+        images.append(base64.b64encode(buffer.getvalue()).decode("ascii"))
+    return images
+
+
+def arrival_offsets(records: list[RecordedRequest], arrivals: str, rate: float, rng: random.Random) -> Iterator[float]:
+    if arrivals == "recorded":
+        base = records[0].offset_ms if records else 0.0
+        for record in records:
+            yield (record.offset_ms - base) / 1000 / rate
+        return
+    offset = 0.0
+    for _ in records:
+        yield offset
+        offset += rng.expovariate(rate) if arrivals == "poisson" else 1 / rate
+
+
+async def run_open_loop(
+    client: httpx.AsyncClient,
+    run: LoadRun,
+    records: list[RecordedRequest],
+    arrivals: str,
+    rate: float,
+    max_in_flight: int,
+    rng: random.Random,
+) -> tuple[float, float]:
+    gate = asyncio.Semaphore(max_in_flight)
+    tasks: list[asyncio.Task[None]] = []
+
+    async def fire(index: int, record: RecordedRequest, scheduled: float) -> None:
+        async with gate:
+            await run.send(client, index, record, scheduled)
+
+    for index, record in enumerate(records):
+        run.expect(index, record)
+    started = perf_counter()
+    offset = 0.0
+    for index, (record, offset) in enumerate(zip(records, arrival_offsets(records, arrivals, rate, rng))):
+        scheduled = started + offset
+        delay = scheduled - perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(index, record, scheduled)))
+    await asyncio.gather(*tasks)
+    return perf_counter() - started, offset
+
+
+async def run_closed_loop(
+    client: httpx.AsyncClient,
+    run: LoadRun,
+    records: list[RecordedRequest],
+    concurrency: int,
+) -> float:
+    pending = iter(enumerate(records))
+    for index, record in enumerate(records):
+        run.expect(index, record)
+
+    async def worker() -> None:
+        for index, record in pending:
+            await run.send(client, index, record)
+
+    started = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    return perf_counter() - started
+
+
+async def run_steps(
+    client: httpx.AsyncClient,
+    images: list[str],
+    records: list[RecordedRequest],
+    args: argparse.Namespace,
+    rng: random.Random,
+) -> tuple[list[StepResult], dict[str, EndpointStats], float]:
+    steps: list[StepResult] = []
+    totals: dict[str, EndpointStats] = {}
+    elapsed_total = 0.0
+    cursor = 0
+    # Recorded gaps cannot be rescaled to an absolute rate, so steps fall back to Poisson arrivals.
+    arrivals = "poisson" if args.arrivals == "recorded" else args.arrivals
+    for rate in parse_floats(args.rates):
+        count = max(int(rate * args.step_seconds), 1)
+        batch = window(records, cursor, count)
+        cursor += count
+        run = LoadRun(images, args.timeout)
+        elapsed, span = await run_open_loop(client, run, batch, arrivals, rate, args.max_in_flight, rng)
+        elapsed_total += elapsed
+        step = summarize_step(rate, run, len(batch), span, elapsed, args.slo_ms)
+        steps.append(step)
+        for endpoint, stats in run.endpoints.items():
+            totals.setdefault(endpoint, EndpointStats()).merge(stats)
+        flag = "  SATURATED" if step.saturated else ""
+        print(
+            f"  offered {rate:>8.1f} rps  achieved {step.achieved_rps:>8.1f} rps  "
+            f"p99 {step.p99_ms:>9.2f} ms  errors {step.error_rate:.2%}{flag}"
+        )
+        if step.saturated and not args.keep_stepping:
+            break
+    return steps, totals, elapsed_total
+
+
+def summarize_step(
+    rate: float, run: LoadRun, issued: int, span: float, elapsed: float, slo_ms: float
+) -> StepResult:
+    overall = EndpointStats()
+    for stats in run.endpoints.values():
+        overall.merge(stats)
+    completed = overall.latency.count
+    achieved = completed / elapsed if elapsed else 0.0
+    # Compare against the arrivals actually drawn; a short Poisson step rarely lands on the nominal rate.
+    offered = issued / span if span else rate
+    error_rate = overall.errors / completed if completed else 0.0
+    p99 = overall.latency.percentile(99)
+    return StepResult(
+        offered_rps=rate,
+        achieved_rps=round(achieved, 2),
+        p99_ms=round(p99, 3),
+        error_rate=round(error_rate, 4),
+        saturated=achieved < 0.9 * offered or p99 > slo_ms or error_rate > 0.01,
+        endpoints={
+            endpoint: {
+                "p99_ms": round(stats.latency.percentile(99), 3),
+                "error_rate": round(stats.errors / stats.latency.count, 4) if stats.latency.count else 0.0,
+                "throughput_rps": round(stats.latency.count / elapsed, 2) if elapsed else 0.0,
+            }
+            for endpoint, stats in run.endpoints.items()
+        },
+    )
+
+
+def saturation_points(steps: list[StepResult], slo_ms: float) -> dict[str, Any]:
+    points: dict[str, Any] = {
+        "overall": {
+            "max_sustained_rps": max((step.offered_rps for step in steps if not step.saturated), default=None),
+            "saturated_at_rps": next((step.offered_rps for step in steps if step.saturated), None),
+        }
+    }
+    endpoints = sorted({endpoint for step in steps for endpoint in step.endpoints})
+    for endpoint in endpoints:
+        breached = [
+            step.offered_rps
+            for step in steps
+            if endpoint in step.endpoints
+            and (step.endpoints[endpoint]["p99_ms"] > slo_ms or step.endpoints[endpoint]["error_rate"] > 0.01)
+        ]
+        points[endpoint] = {"slo_breached_at_rps": min(breached, default=None)}
+    return points
+
+
+def load_records(args: argparse.Namespace) -> list[RecordedRequest]:
+    if args.traffic is not None:
+        records = read_traffic(args.traffic)
+    else:
+        records = synthesize_traffic(
+            args.requests,
+            seed=args.seed,
+            memory_update_ratio=args.memory_update_ratio,
+            vision_ratio=args.vision_ratio,
+        )
+        if args.save_traffic is not None:
+            write_traffic(args.save_traffic, records)
+    if args.requests and len(records) > args.requests:
+        records = window(records, 0, args.requests)
+    return records
+
+
+def window(records: list[RecordedRequest], start: int, count: int) -> list[RecordedRequest]:
+    # Slices wrap around the traffic; memory updates are re-pointed at their analysis inside the
+    # slice and dropped when it fell outside.
+    positions: dict[int, int] = {}
+    sliced: list[RecordedRequest] = []
+    for offset in range(count):
+        source = (start + offset) % len(records)
+        record = records[source]
+        if record.case_ref is not None:
+            if record.case_ref not in positions:
+                continue
+            record = replace(record, case_ref=positions[record.case_ref])
+        if record.path == "/analyze":
+            positions[source] = len(sliced)
+        sliced.append(record)
+    return sliced
+
+
+def parse_floats(value: str) -> list[float]:
+    return [float(item) for item in value.split(",") if item.strip()]
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> int:
+    regressions = 0
+    print("\nvs baseline")
+    for endpoint, stats in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if before is None:
+            continue
+        metrics = [
+            Metric(f"{endpoint} p99 ms", before["latency"]["p99_ms"], stats["latency"]["p99_ms"]),
+            Metric(f"{endpoint} p50 ms", before["latency"]["p50_ms"], stats["latency"]["p50_ms"]),
+        ]
+        if report["config"]["mode"] == "closed":
+            metrics.append(Metric(f"{endpoint} rps", before["throughput_rps"], stats["throughput_rps"], True))
+        regressions += flag_regressions(metrics, tolerance, width=36)
+        if stats["error_rate"] > before["error_rate"] + 0.01:
+            regressions += 1
+            print(f"  {endpoint} error rate {before['error_rate']:.2%} -> {stats['error_rate']:.2%}  REGRESSION")
+    return regressions
+
+
+def print_endpoints(endpoints: dict[str, Any]) -> None:
+    for endpoint, stats in endpoints.items():
+        latency = stats["latency"]
+        print(
+            f"  {endpoint:<26} {stats['requests']:>7} req  {stats['throughput_rps']:>8.1f} rps  "
+            f"err {stats['error_rate']:.2%}  p50 {latency['p50_ms']:.2f}  p90 {latency['p90_ms']:.2f}  "
+            f"p99 {latency['p99_ms']:.2f}  p99.9 {latency['p999_ms']:.2f}  max {latency['max_ms']:.2f} ms"
+        )
+
+
+async def generate(args: argparse.Namespace) -> dict[str, Any]:
+    records = load_records(args)
+    if not records:
+        raise ValueError("No traffic to replay")
+    rng = random.Random(args.seed)
+    images = placeholder_images(args.images, args.seed) if any(
+        record.body and record.body.get("image_redacted") for record in records
+    ) else [""]
+    report: dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.base_url or ("convolve.api:app (stubbed backends)" if args.stub else "convolve.api:app"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "mode": args.mode,
+            "traffic": str(args.traffic) if args.traffic else "synthetic",
+            "requests": len(records),
+            "arrivals": args.arrivals,
+            "rate": args.rate,
+            "rates": args.rates,
+            "step_seconds": args.step_seconds,
+            "concurrency": args.concurrency,
+            "max_in_flight": args.max_in_flight,
+            "slo_ms": args.slo_ms,
+            "stub_embed_ms": args.stub_embed_ms if args.stub else None,
+            "stub_vision_ms": args.stub_vision_ms if args.stub else None,
+            "seed": args.seed,
+        },
+    }
+    async with open_target(args) as client:
+        if args.warmup:
+            await run_closed_loop(client, LoadRun(images, args.timeout), window(records, 0, args.warmup), 4)
+        print(f"replaying {len(records)} requests ({args.mode}) against {report['target']}")
+        if args.mode == "step":
+            steps, endpoints, elapsed = await run_steps(client, images, records, args, rng)
+            report["steps"] = [step.__dict__ for step in steps]
+            report["saturation"] = saturation_points(steps, args.slo_ms)
+        else:
+            run = LoadRun(images, args.timeout)
+            if args.mode == "open":
+                elapsed, _ = await run_open_loop(
+                    client, run, records, args.arrivals, args.rate, args.max_in_flight, rng
+                )
+            else:
+                elapsed = await run_closed_loop(client, run, records, args.concurrency)
+            endpoints = run.endpoints
+        if not args.base_url:
+            response = await client.get("/stats")
+            report["service_stats"] = response.json() if response.status_code == 200 else None
+
+    overall = EndpointStats()
+    for stats in endpoints.values():
+        overall.merge(stats)
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["overall"] = overall.report(elapsed)
+    report["endpoints"] = {endpoint: stats.report(elapsed) for endpoint, stats in sorted(endpoints.items())}
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay recorded or synthetic /analyze and /memory traffic against the API."
+    )
+    parser.add_argument("--traffic", type=Path, help="JSONL recorded with TRAFFIC_RECORD_PATH (default: synthetic)")
+    parser.add_argument("--save-traffic", type=Path, help="write the synthetic traffic to this JSONL file")
+    parser.add_argument("--requests", type=int, default=1000, help="synthetic requests, or a cap on recorded ones")
+    parser.add_argument("--memory-update-ratio", type=float, default=0.2)
+    parser.add_argument("--vision-ratio", type=float, default=0.1)
+    parser.add_argument("--mode", choices=["open", "closed", "step"], default="open")
+    parser.add_argument("--arrivals", choices=["poisson", "constant", "recorded"], default="poisson")
+    parser.add_argument("--rate", type=float, default=20.0, help="open loop: requests/s, or speed-up for recorded")
+    parser.add_argument("--concurrency", type=int, default=8, help="closed loop: requests in flight")
+    parser.add_argument("--rates", default="5,10,20,40,80,160", help="step mode: offered rates in requests/s")
+    parser.add_argument("--step-seconds", type=float, default=10.0)
+    parser.add_argument("--keep-stepping", action="store_true", help="run every step even after saturation")
+    parser.add_argument("--slo-ms", type=float, default=500.0, help="p99 budget used to call saturation")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--warmup", type=int, default=20, help="requests sent before measuring")
+    parser.add_argument("--base-url", help="replay against a running server instead of convolve.api:app in-process")
+    parser.add_argument("--stub", action="store_true", help="in-memory Qdrant plus stubbed embedding and vision")
+    parser.add_argument("--stub-embed-ms", type=float, default=15.0, help="simulated query-embedding time")
+    parser.add_argument("--stub-vision-ms", type=float, default=800.0, help="simulated vision-model time")
+    parser.add_argument("--schemes", type=int, default=1000, help="stub mode: synthetic schemes added to the seed")
+    parser.add_argument("--memories", type=int, default=1000, help="stub mode: synthetic case memories")
+    parser.add_argument("--dimension", type=int, default=384, help="stub mode: embedding size")
+    parser.add_argument("--images", type=int, default=8, help="distinct placeholder photos for redacted images")
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--output", type=Path, help="default .cache/loadgen/loadgen-<time>.json")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args()
+    if args.base_url and args.stub:
+        parser.error("--stub only applies to the in-process app")
+
+    report = asyncio.run(generate(args))
+    print(
+        f"{report['overall']['requests']} requests in {report['elapsed_seconds']}s, "
+        f"{report['overall']['throughput_rps']} rps, errors {report['overall']['error_rate']:.2%}"
+    )
+    print_endpoints(report["endpoints"])
+    if "saturation" in report:
+        overall = report["saturation"]["overall"]
+        print(f"  max sustained {overall['max_sustained_rps']} rps, saturated at {overall['saturated_at_rps']} rps")
+
+    stamp = f"{datetime.now(timezone.utc):%Y%m%d%H%M%S}"
+    output = args.output or REPORT_DIR / f"loadgen-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"report written to {output}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
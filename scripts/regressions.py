@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import NamedTuple, Sequence
+
+
+class Metric(NamedTuple):
+    label: str
+    old: float
+    new: float
+    higher_is_better: bool = False
+
+
+def flag_regressions(metrics: Sequence[Metric], tolerance: float, width: int = 24) -> int:
+    # Shared by the benchmark scripts' --baseline checks: prints old -> new per metric and counts
+    # the ones that moved the wrong way by more than the tolerance. A fixed label width keeps the
+    # columns aligned across calls.
+    regressions = 0
+    for label, old, new, higher_is_better in metrics:
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher_is_better else change
+        flag = "  REGRESSION" if worse > tolerance else ""
+        regressions += bool(flag)
+        print(f"  {label:<{width}} {old:>12,.3f} -> {new:>12,.3f} ({change:+.1%}){flag}")
+    return regressions
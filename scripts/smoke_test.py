@@ -1,5 +1,6 @@
 from convolve.chains import run_retrieval_pipeline
 from convolve.config import load_settings
+from convolve.services import build_services
 from convolve.vision import fallback_signals
 
 
@@ -11,7 +12,11 @@ def main() -> None:
     signals.land_acres = 2.0
     signals.intent = "support for distressed farmers"
 
-    result = run_retrieval_pipeline(settings, signals, query_intent=signals.intent)
+    services = build_services(settings)
+    try:
+        result = run_retrieval_pipeline(services, signals, query_intent=signals.intent)
+    finally:
+        services.close()
     print(f"Matches: {len(result.explanations)}")
     if result.explanations:
         print(f"Top scheme: {result.explanations[0]['scheme_name']}")
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import replace
+from statistics import mean, median
+from time import perf_counter
+from typing import Any
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qdrant_models
+
+from convolve.collection_profiles import COLLECTION_PROFILES, CollectionProfile
+from convolve.config import load_settings
+from convolve.qdrant_client import DENSE_VECTOR_NAME, QdrantCollections
+from convolve.services import build_services
+
+
+EXACT_SEARCH = qdrant_models.SearchParams(
+    exact=True,
+    quantization=qdrant_models.QuantizationSearchParams(ignore=True),
+)
+
+
+def vector_params(info: qdrant_models.CollectionInfo, vector_name: str) -> qdrant_models.VectorParams:
+    vectors = info.config.params.vectors
+    return vectors[vector_name] if isinstance(vectors, dict) else vectors
+
+
+def describe(client: QdrantClient, collection_name: str, vector_name: str) -> dict[str, Any]:
+    info = client.get_collection(collection_name)
+    params = vector_params(info, vector_name)
+    quantization = params.quantization_config or info.config.quantization_config
+    hnsw = params.hnsw_config or info.config.hnsw_config
+    return {
+        "status": str(info.status),
+        "points": info.points_count or 0,
+        "indexed_vectors": info.indexed_vectors_count or 0,
+        "segments": info.segments_count,
+        "dimension": params.size,
+        "vectors_on_disk": bool(params.on_disk),
+        "payload_on_disk": bool(info.config.params.on_disk_payload),
+        "quantization": type(quantization).__name__ if quantization is not None else "none",
+        "hnsw": f"m={hnsw.m} ef_construct={hnsw.ef_construct} on_disk={bool(hnsw.on_disk)}",
+    }
+
+
+def measure_recall(
+    client: QdrantClient,
+    collection_name: str,
+    vector_name: str,
+    profile: CollectionProfile,
+    samples: int,
+    limit: int,
+) -> dict[str, float]:
+    points, _ = client.scroll(
+        collection_name,
+        limit=samples,
+        with_payload=False,
+        with_vectors=[vector_name] if vector_name else True,
+    )
+    recalls: list[float] = []
+    exact_ms: list[float] = []
+    tuned_ms: list[float] = []
+    for point in points:
+        vector = point.vector[vector_name] if vector_name else point.vector
+        started = perf_counter()
+        exact = client.query_points(
+            collection_name, query=vector, using=vector_name or None, limit=limit, search_params=EXACT_SEARCH
+        ).points
+        exact_ms.append((perf_counter() - started) * 1000)
+        started = perf_counter()
+        tuned = client.query_points(
+            collection_name, query=vector, using=vector_name or None, limit=limit, search_params=profile.search_params()
+        ).points
+        tuned_ms.append((perf_counter() - started) * 1000)
+        expected = {point.id for point in exact}
+        if expected:
+            recalls.append(len(expected & {point.id for point in tuned}) / len(expected))
+    return {
+        "queries": len(recalls),
+        "recall": round(mean(recalls), 4) if recalls else 0.0,
+        "exact_p50_ms": round(median(exact_ms), 3) if exact_ms else 0.0,
+        "profile_p50_ms": round(median(tuned_ms), 3) if tuned_ms else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Inspect, apply and check Qdrant collection profiles (quantization, on-disk, HNSW)."
+    )
+    parser.add_argument("--schemes-profile", choices=sorted(COLLECTION_PROFILES), help="default SCHEME_COLLECTION_PROFILE")
+    parser.add_argument("--memories-profile", choices=sorted(COLLECTION_PROFILES), help="default MEMORY_COLLECTION_PROFILE")
+    parser.add_argument("--apply", action="store_true", help="update the live collections in place")
+    parser.add_argument("--recall-samples", type=int, default=0, help="stored vectors to query for recall@limit")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    settings = load_settings()
+    settings = replace(
+        settings,
+        scheme_collection_profile=args.schemes_profile or settings.scheme_collection_profile,
+        memory_collection_profile=args.memories_profile or settings.memory_collection_profile,
+    )
+    services = build_services(settings, timeout=120)
+    try:
+        collections = QdrantCollections()
+        targets = [
+            (
+                services.qdrant.schemes_alias_target() or collections.schemes,
+                DENSE_VECTOR_NAME,
+                settings.scheme_collection_profile,
+            ),
+            (collections.memories, "", settings.memory_collection_profile),
+        ]
+        if args.apply:
+            services.qdrant.apply_collection_profiles()
+            print(
+                f"applied {settings.scheme_collection_profile!r} to schemes and "
+                f"{settings.memory_collection_profile!r} to case memories; Qdrant re-optimizes in the background"
+            )
+        for collection_name, vector_name, profile_name in targets:
+            if not services.client.collection_exists(collection_name):
+                print(f"{collection_name}: missing")
+                continue
+            current = describe(services.client, collection_name, vector_name)
+            print(f"\n{collection_name} (profile {profile_name})")
+            for key, value in current.items():
+                print(f"  {key:<16} {value}")
+            print("  estimated RAM for vectors + graph by profile:")
+            for name, profile in COLLECTION_PROFILES.items():
+                ram_mb = profile.estimated_ram_bytes(current["points"], current["dimension"]) / 2**20
+                print(f"    {name:<10} {ram_mb:>10,.1f} MB")
+            if args.recall_samples:
+                profile = COLLECTION_PROFILES[profile_name]
+                recall = measure_recall(
+                    services.client, collection_name, vector_name, profile, args.recall_samples, args.limit
+                )
+                print(
+                    f"  recall@{args.limit} {recall['recall']:.3f} over {recall['queries']} queries, "
+                    f"p50 {recall['profile_p50_ms']:.2f} ms vs exact {recall['exact_p50_ms']:.2f} ms"
+                )
+    finally:
+        services.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,67 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from datetime import datetime, timezone
-from typing import Any, Literal
+from typing import Any, AsyncIterator, Literal
 from time import perf_counter
+from uuid import UUID
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel, Field
-from qdrant_client import QdrantClient
 
-from convolve.chains import run_retrieval_pipeline
+from convolve.chains import RetrievalResult, arun_retrieval_batch, arun_retrieval_pipeline
 from convolve.config import load_settings, require_qdrant_settings
-from convolve.embeddings import EmbeddingService
-from convolve.qdrant_client import QdrantService
+from convolve.embedding_batcher import EmbeddingQueueFull
+from convolve.imaging import InvalidImageError
+from convolve.metrics import CONTENT_TYPE, METRICS, MetricsMiddleware, metric_family, stage_span
+from convolve.qdrant_client import PayloadFields
 from convolve.schemas import EligibilitySignals
-from convolve.vision import VisionService, fallback_signals
+from convolve.services import ServiceContainer, build_services
+from convolve.traffic import TrafficRecorder
+from convolve.vision import fallback_signals
 
 
-app = FastAPI(title="Yojana-Drishti API")
 settings = load_settings()
 require_qdrant_settings(settings)
+METRICS.enabled = settings.metrics_enabled
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    services = build_services(settings, write_behind=True, compaction=True, readiness=True)
+    await services.start()
+    app.state.services = services
+    try:
+        yield
+    finally:
+        await services.aclose()
+
+
+app = FastAPI(title="Yojana-Drishti API", lifespan=lifespan)
+if settings.traffic_record_path:
+    app.add_middleware(TrafficRecorder, path=settings.traffic_record_path)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
+
+def get_services(request: Request) -> ServiceContainer:
+    return request.app.state.services
+
+
+@app.exception_handler(EmbeddingQueueFull)
+async def embedding_overloaded(request: Request, exc: EmbeddingQueueFull) -> JSONResponse:
+    return JSONResponse({"detail": str(exc)}, status_code=503, headers={"Retry-After": "1"})
 
 
 class AnalyzeRequest(BaseModel):
     state: str | None = None
     caste: str | None = None
     land_acres: float | None = None
+    annual_income: float | None = Field(default=None, ge=0)
     housing_type: str | None = None
     assets: list[str] = Field(default_factory=list)
     demographics: list[str] = Field(default_factory=list)
@@ -39,6 +75,22 @@ class AnalyzeResponse(BaseModel):
     explanations: list[dict[str, Any]]
     memories: list[dict[str, Any]]
     memory_id: str
+    timings_ms: dict[str, float] = Field(default_factory=dict)
+    near_misses: list[dict[str, Any]] = Field(default_factory=list)
+
+
+class AnalyzeBatchRequest(BaseModel):
+    items: list[AnalyzeRequest] = Field(min_length=1, max_length=64)
+
+
+class AnalyzeBatchItem(BaseModel):
+    index: int
+    result: AnalyzeResponse | None = None
+    error: str | None = None
+
+
+class AnalyzeBatchResponse(BaseModel):
+    items: list[AnalyzeBatchItem]
 
 
 class MemoryUpdateRequest(BaseModel):
@@ -72,52 +124,123 @@ class FilterStressResponse(BaseModel):
 
 @app.get("/health")
 async def health_check() -> dict[str, str]:
+    # Liveness only; /ready reports whether the model and collections are warmed up.
     return {"status": "ok"}
 
 
-@app.post("/analyze", response_model=AnalyzeResponse)
-async def analyze(request: AnalyzeRequest) -> AnalyzeResponse:
-    if request.use_vision and request.image_base64:
-        if not settings.openai_api_key:
-            raise HTTPException(status_code=400, detail="OPENAI_API_KEY is required for vision")
-        try:
-            payload = request.image_base64
-            if "," in payload:
-                payload = payload.split(",", 1)[1]
-            image_bytes = base64.b64decode(payload, validate=True)
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail="image_base64 must be valid base64") from exc
-        vision = VisionService(settings)
-        hints = {
-            "state": request.state,
-            "caste": request.caste,
-            "land_acres": request.land_acres,
+@app.get("/ready")
+async def readiness_check(services: ServiceContainer = Depends(get_services)) -> JSONResponse:
+    if services.readiness is None:
+        return JSONResponse({"status": "ready", "checks": {}})
+    snapshot = await services.readiness.check()
+    body = {
+        "status": "ready" if snapshot.ready else "starting",
+        "warm_up_ms": snapshot.warm_up_ms,
+        "checks": {
+            name: asdict(result) if result is not None else None for name, result in snapshot.checks.items()
+        },
+    }
+    return JSONResponse(body, status_code=200 if snapshot.ready else 503)
+
+
+@app.get("/stats")
+async def service_stats(services: ServiceContainer = Depends(get_services)) -> dict[str, Any]:
+    embedding_cache = services.embedder.cache_stats()
+    stats: dict[str, Any] = {
+        "embedding_cache": {
+            **asdict(embedding_cache),
+            "hit_rate": round(embedding_cache.hit_rate, 4),
+        },
+    }
+    if services.vision is not None:
+        vision_cache = services.vision.cache_stats()
+        stats["vision_cache"] = {
+            **asdict(vision_cache),
+            "hit_rate": round(vision_cache.hit_rate, 4),
         }
-        signals = vision.extract_signals(image_bytes, hints=hints)
-    else:
-        signals = fallback_signals()
+    embedding_batcher = services.embedder.batcher_stats()
+    if embedding_batcher is not None:
+        stats["embedding_batcher"] = asdict(embedding_batcher)
+    if services.memory_writer is not None:
+        stats["memory_writer"] = asdict(services.memory_writer.stats())
+    if services.scheme_search is not None:
+        stats["scheme_search"] = asdict(services.scheme_search.stats())
+    if services.result_cache is not None:
+        result_cache = services.result_cache.stats()
+        stats["result_cache"] = {
+            **asdict(result_cache),
+            "hit_rate": round(result_cache.hit_rate, 4),
+        }
+    return stats
 
-    signals.state = request.state or signals.state
-    signals.caste = request.caste or signals.caste
-    signals.land_acres = request.land_acres
-    if request.housing_type and request.housing_type != "unknown":
-        signals.housing_type = request.housing_type
-    signals.assets = request.assets
-    signals.demographics = request.demographics
-    signals.intent = request.intent
 
-    result = run_retrieval_pipeline(settings, signals, query_intent=request.intent or "")
-    memories = [memory.payload or {} for memory in result.memories]
-    return AnalyzeResponse(
-        signals=signals,
-        explanations=result.explanations,
-        memories=memories,
-        memory_id=result.memory_id,
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(services: ServiceContainer = Depends(get_services)) -> PlainTextResponse:
+    if not METRICS.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(METRICS.render(service_metrics(services)), media_type=CONTENT_TYPE)
+
+
+@app.post("/analyze", response_model=AnalyzeResponse)
+async def analyze(
+    request: AnalyzeRequest,
+    services: ServiceContainer = Depends(get_services),
+) -> AnalyzeResponse:
+    signals = await resolve_signals(request, services)
+    result = await arun_retrieval_pipeline(services, signals, query_intent=request.intent or "")
+    return build_analyze_response(result)
+
+
+@app.post("/analyze/batch", response_model=AnalyzeBatchResponse)
+async def analyze_batch(
+    request: AnalyzeBatchRequest,
+    services: ServiceContainer = Depends(get_services),
+) -> AnalyzeBatchResponse:
+    resolved = await asyncio.gather(
+        *(resolve_signals(item, services) for item in request.items),
+        return_exceptions=True,
     )
+    results: list[AnalyzeBatchItem] = [
+        AnalyzeBatchItem(index=index, error=batch_error(outcome))
+        if isinstance(outcome, BaseException)
+        else AnalyzeBatchItem(index=index)
+        for index, outcome in enumerate(resolved)
+    ]
+    pending = [
+        (index, outcome, request.items[index].intent or "")
+        for index, outcome in enumerate(resolved)
+        if not isinstance(outcome, BaseException)
+    ]
+    if pending:
+        try:
+            retrievals = await arun_retrieval_batch(
+                services,
+                [(signals, query_intent) for _, signals, query_intent in pending],
+            )
+        except Exception as exc:
+            for index, _, _ in pending:
+                results[index].error = batch_error(exc)
+        else:
+            for (index, _, _), retrieval in zip(pending, retrievals, strict=True):
+                results[index].result = build_analyze_response(retrieval)
+    return AnalyzeBatchResponse(items=results)
+
+
+@app.get("/schemes/{point_id}")
+async def scheme_detail(point_id: UUID, services: ServiceContainer = Depends(get_services)) -> dict[str, Any]:
+    # Search results carry a projected payload; clients fetch the full record only for a scheme they show.
+    payloads = await services.async_qdrant.scheme_payloads([str(point_id)])
+    if str(point_id) not in payloads:
+        raise HTTPException(status_code=404, detail="Scheme not found")
+    return payloads[str(point_id)]
 
 
 @app.post("/memory/{case_id}")
-async def update_memory(case_id: str, update: MemoryUpdateRequest) -> dict[str, str]:
+async def update_memory(
+    case_id: str,
+    update: MemoryUpdateRequest,
+    services: ServiceContainer = Depends(get_services),
+) -> dict[str, str]:
     updates: dict[str, object] = {"updated_at": update_timestamp()}
     if update.status is not None:
         updates["status"] = update.status
@@ -131,16 +254,17 @@ async def update_memory(case_id: str, update: MemoryUpdateRequest) -> dict[str,
     if len(updates) == 1:
         raise HTTPException(status_code=400, detail="Provide at least one field to update")
 
-    client = QdrantClient(url=settings.qdrant_url, api_key=settings.qdrant_api_key)
-    qdrant = QdrantService(client)
-    qdrant.update_case_memory(case_id, updates)
+    with stage_span("update_memory"):
+        await services.async_memory.update_case(case_id, updates)
     return {"status": "updated"}
 
 
 @app.post("/demo/filter-stress", response_model=FilterStressResponse)
-async def filter_stress(request: FilterStressRequest) -> FilterStressResponse:
-    client = QdrantClient(url=settings.qdrant_url, api_key=settings.qdrant_api_key)
-    qdrant = QdrantService(client)
+async def filter_stress(
+    request: FilterStressRequest,
+    services: ServiceContainer = Depends(get_services),
+) -> FilterStressResponse:
+    qdrant = services.async_qdrant
 
     scenario_inputs = [
         {
@@ -168,12 +292,12 @@ async def filter_stress(request: FilterStressRequest) -> FilterStressResponse:
 
     scenarios: list[FilterStressScenario] = []
     query_text = request.query_text
-    query_vector = EmbeddingService(settings).embed_query(query_text)
+    query_vector = await services.embedder.aembed_query(query_text)
     sparse_vector = qdrant.build_sparse_query(query_text)
 
     for scenario in scenario_inputs:
         start = perf_counter()
-        points = qdrant.search_schemes(
+        points = await qdrant.search_schemes(
             query_vector=query_vector,
             sparse_vector=sparse_vector,
             state=scenario["state"],
@@ -181,6 +305,7 @@ async def filter_stress(request: FilterStressRequest) -> FilterStressResponse:
             caste=scenario["caste"],
             land_acres=scenario["land_acres"],
             limit=request.limit,
+            payload=PayloadFields(include=("scheme_id",)),
         )
         elapsed_ms = (perf_counter() - start) * 1000
         scheme_ids = [str(point.payload.get("scheme_id")) for point in points if point.payload]
@@ -203,5 +328,117 @@ async def filter_stress(request: FilterStressRequest) -> FilterStressResponse:
     return FilterStressResponse(query_text=query_text, scenarios=scenarios)
 
 
+async def resolve_signals(request: AnalyzeRequest, services: ServiceContainer) -> EligibilitySignals:
+    if request.use_vision and request.image_base64:
+        if services.vision is None:
+            raise HTTPException(status_code=400, detail="Vision requires VISION_ENABLED and OPENAI_API_KEY")
+        try:
+            payload = request.image_base64
+            if "," in payload:
+                payload = payload.split(",", 1)[1]
+            image_bytes = base64.b64decode(payload, validate=True)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="image_base64 must be valid base64") from exc
+        hints = {
+            "state": request.state,
+            "caste": request.caste,
+            "land_acres": request.land_acres,
+        }
+        try:
+            with stage_span("vision"):
+                signals = await services.vision.aextract_signals(image_bytes, hints=hints)
+        except InvalidImageError as exc:
+            raise HTTPException(status_code=400, detail="image_base64 must be a JPEG, PNG or WebP image") from exc
+    else:
+        signals = fallback_signals()
+
+    signals.state = request.state or signals.state
+    signals.caste = request.caste or signals.caste
+    signals.land_acres = request.land_acres
+    signals.annual_income = request.annual_income
+    if request.housing_type and request.housing_type != "unknown":
+        signals.housing_type = request.housing_type
+    signals.assets = request.assets
+    signals.demographics = request.demographics
+    signals.intent = request.intent
+    return signals
+
+
+def service_metrics(services: ServiceContainer) -> list[str]:
+    caches = {"embedding": services.embedder.cache_stats()}
+    if services.vision is not None:
+        caches["vision"] = services.vision.cache_stats()
+    if services.result_cache is not None:
+        caches["result"] = services.result_cache.stats()
+    lines: list[str] = []
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+        name = f"convolve_cache_{field}" + ("_total" if kind == "counter" else "")
+        samples = [({"cache": cache}, getattr(stats, field)) for cache, stats in caches.items()]
+        lines.extend(metric_family(name, kind, f"Cache {field} by cache.", samples))
+    batcher = services.embedder.batcher_stats()
+    if batcher is not None:
+        for name, kind, help_text, value in (
+            ("queue_depth", "gauge", "Texts waiting for an embedding batch.", batcher.queue_depth),
+            ("batches_total", "counter", "Embedding forward passes run by the batcher.", batcher.batches),
+            ("texts_total", "counter", "Distinct texts embedded by the batcher.", batcher.texts),
+            ("rejected_total", "counter", "Texts rejected because the embedding queue was full.", batcher.rejected),
+        ):
+            lines.extend(metric_family(f"convolve_embedding_batcher_{name}", kind, help_text, [({}, value)]))
+    if services.memory_writer is not None:
+        writer = services.memory_writer.stats()
+        for name, kind, help_text, value in (
+            ("queue_depth", "gauge", "Case memories waiting to be flushed.", writer.queue_depth),
+            ("written_total", "counter", "Case memories flushed to Qdrant.", writer.written),
+            ("retries_total", "counter", "Flush attempts retried after a Qdrant error.", writer.retries),
+            ("dropped_total", "counter", "Case memories dropped after exhausting retries.", writer.dropped),
+        ):
+            lines.extend(metric_family(f"convolve_memory_writer_{name}", kind, help_text, [({}, value)]))
+    if services.scheme_search is not None:
+        search = services.scheme_search.stats()
+        lines.extend(
+            metric_family(
+                "convolve_scheme_search_queries_total",
+                "counter",
+                "Scheme queries by backend.",
+                [({"backend": "replica"}, search.replica_queries), ({"backend": "qdrant"}, search.qdrant_queries)],
+            )
+        )
+        lines.extend(
+            metric_family(
+                "convolve_scheme_search_fallbacks_total",
+                "counter",
+                "Scheme searches served by the replica after Qdrant failed or timed out.",
+                [({}, search.fallbacks)],
+            )
+        )
+    if services.compaction is not None and services.compaction.last_report is not None:
+        report = services.compaction.last_report
+        for name, help_text, value in (
+            ("merged", "Draft case memories merged by the last compaction run.", report.merged),
+            ("expired", "Stale drafts archived or deleted by the last compaction run.", report.expired),
+            ("duration_seconds", "Duration of the last compaction run.", report.elapsed_ms / 1000),
+        ):
+            lines.extend(metric_family(f"convolve_memory_compaction_last_{name}", "gauge", help_text, [({}, value)]))
+    return lines
+
+
+def build_analyze_response(result: RetrievalResult) -> AnalyzeResponse:
+    memories = [memory.payload or {} for memory in result.memories]
+    return AnalyzeResponse(
+        signals=result.signals,
+        explanations=result.explanations,
+        memories=memories,
+        memory_id=result.memory_id,
+        timings_ms=result.timings_ms,
+        near_misses=result.near_misses,
+    )
+
+
+def batch_error(exc: BaseException) -> str:
+    if isinstance(exc, HTTPException):
+        return str(exc.detail)
+    return f"{type(exc).__name__}: {exc}"
+
+
 def update_timestamp() -> str:
     return datetime.now(timezone.utc).isoformat()
\ No newline at end of file
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from time import monotonic
+from typing import Any, Callable, TypeVar
+import uuid
+
+from qdrant_client.http import models as qdrant_models
+
+from convolve.qdrant_client import AsyncQdrantService
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: str
+    records: list[qdrant_models.Record]
+
+    @property
+    def point_ids(self) -> list[str]:
+        return [str(record.id) for record in self.records]
+
+    @property
+    def payloads(self) -> list[dict[str, Any]]:
+        return [record.payload or {} for record in self.records]
+
+
+class CatalogWatcher:
+    def __init__(
+        self,
+        qdrant: AsyncQdrantService,
+        refresh_interval_seconds: float = 30.0,
+        with_vectors: bool = False,
+    ) -> None:
+        self._qdrant = qdrant
+        self._refresh_interval = refresh_interval_seconds
+        self._with_vectors = with_vectors
+        self._snapshot: CatalogSnapshot | None = None
+        self._checked_at = float("-inf")
+        self._lock = asyncio.Lock()
+        self._derived: dict[Callable[[CatalogSnapshot], Any], tuple[str, Any]] = {}
+
+    @property
+    def version(self) -> str | None:
+        return self._snapshot.version if self._snapshot else None
+
+    async def snapshot(self) -> CatalogSnapshot:
+        if self._snapshot is not None and monotonic() - self._checked_at < self._refresh_interval:
+            return self._snapshot
+        async with self._lock:
+            if self._snapshot is not None and monotonic() - self._checked_at < self._refresh_interval:
+                return self._snapshot
+            try:
+                version = await self._qdrant.read_catalog_version()
+                if self._snapshot is not None and version is not None and version == self._snapshot.version:
+                    self._checked_at = monotonic()
+                    return self._snapshot
+                records = await self._qdrant.scroll_schemes(with_vectors=self._with_vectors)
+            except Exception:
+                if self._snapshot is None:
+                    raise
+                # Keep serving the last snapshot and retry after the next interval.
+                logger.warning("Catalog refresh failed; keeping version %s", self._snapshot.version, exc_info=True)
+                self._checked_at = monotonic()
+                return self._snapshot
+            self._checked_at = monotonic()
+            # Catalogs ingested before versioning get a fresh version on every reload.
+            self._snapshot = CatalogSnapshot(version or f"unversioned-{uuid.uuid4().hex[:8]}", records)
+            return self._snapshot
+
+    async def derived(self, builder: Callable[[CatalogSnapshot], T]) -> T:
+        snapshot = await self.snapshot()
+        cached = self._derived.get(builder)
+        if cached is not None and cached[0] == snapshot.version:
+            return cached[1]
+        value = builder(snapshot)
+        self._derived[builder] = (snapshot.version, value)
+        return value
+
+    def invalidate(self) -> None:
+        self._checked_at = float("-inf")
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Awaitable, Iterator, TypeVar
 
-from qdrant_client import QdrantClient
 from qdrant_client.http import models as qdrant_models
 
-from convolve.config import Settings, require_qdrant_settings
-from convolve.embeddings import EmbeddingService
-from convolve.explain import explain_match
-from convolve.memory import MemoryService
-from convolve.qdrant_client import QdrantService
+from convolve.eligibility_index import EligibilityIndex
+from convolve.eligibility_rules import RuleBook
+from convolve.explain import explain_match, explain_near_miss
+from convolve.metrics import observe_stage
+from convolve.qdrant_client import SchemeQuery
+from convolve.result_cache import land_thresholds, result_cache_key
 from convolve.schemas import CaseMemory, EligibilitySignals
+from convolve.services import ServiceContainer
+
+
+T = TypeVar("T")
 
 
 @dataclass(frozen=True)
@@ -20,44 +28,53 @@ class RetrievalResult:
     explanations: list[dict[str, object]]
     memories: list[qdrant_models.ScoredPoint]
     memory_id: str
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    near_misses: list[dict[str, object]] = field(default_factory=list)
 
 
 def run_retrieval_pipeline(
-    settings: Settings,
+    services: ServiceContainer,
     signals: EligibilitySignals,
     query_intent: str,
     limit: int = 3,
 ) -> RetrievalResult:
-    require_qdrant_settings(settings)
-    client = QdrantClient(url=settings.qdrant_url, api_key=settings.qdrant_api_key)
-    embedder = EmbeddingService(settings)
-    qdrant = QdrantService(client)
-    memory = MemoryService(qdrant, embedder)
+    embedder = services.embedder
+    qdrant = services.qdrant
+    memory = services.memory
+    timings: dict[str, float] = {}
+    started = perf_counter()
 
     query_text = query_intent or signals.summary_text()
-    query_vector = embedder.embed_query(query_text)
-    sparse_vector = qdrant.build_sparse_query(query_text)
-
-    schemes = qdrant.search_schemes(
-        query_vector=query_vector,
-        sparse_vector=sparse_vector,
-        state=signals.state,
-        housing=signals.housing_type if signals.housing_type != "unknown" else None,
-        caste=signals.caste,
-        land_acres=signals.land_acres,
-        limit=limit,
-    )
+    with stage_timer(timings, "embed_query"):
+        query_vector = embedder.embed_query(query_text)
+    with stage_timer(timings, "sparse_encode"):
+        sparse_vector = qdrant.build_sparse_query(query_text)
 
-    explanations = [explain_match(signals, scheme) for scheme in schemes]
+    with stage_timer(timings, "search_schemes"):
+        schemes = qdrant.search_schemes(
+            query_vector=query_vector,
+            sparse_vector=sparse_vector,
+            state=signals.state,
+            housing=signals.housing_type if signals.housing_type != "unknown" else None,
+            caste=signals.caste,
+            land_acres=signals.land_acres,
+            limit=limit,
+        )
 
-    memories = memory.recall_cases(query_text)
+    with stage_timer(timings, "explain"):
+        explanations = [explain_match(signals, scheme) for scheme in schemes]
+
+    with stage_timer(timings, "recall_memories"):
+        memories = memory.recall_cases(query_text, query_vector=query_vector, state=recall_state(services, signals))
     case = CaseMemory(
         signals=signals,
         query_intent=query_text,
         retrieved_scheme_ids=[str(scheme.id) for scheme in schemes],
         status="draft",
     )
-    memory_id = memory.save_case(case)
+    with stage_timer(timings, "save_memory"):
+        memory_id = memory.save_case(case)
+    timings["total"] = elapsed_ms(started)
 
     return RetrievalResult(
         signals=signals,
@@ -65,4 +82,274 @@ def run_retrieval_pipeline(
         explanations=explanations,
         memories=memories,
         memory_id=memory_id,
-    )
\ No newline at end of file
+        timings_ms=timings,
+    )
+
+
+async def arun_retrieval_pipeline(
+    services: ServiceContainer,
+    signals: EligibilitySignals,
+    query_intent: str,
+    limit: int = 3,
+) -> RetrievalResult:
+    embedder = services.embedder
+    qdrant = services.async_qdrant
+    memory = services.async_memory
+    timings: dict[str, float] = {}
+    started = perf_counter()
+
+    query_text = query_intent or signals.summary_text()
+    case = CaseMemory(
+        signals=signals,
+        query_intent=query_text,
+        retrieved_scheme_ids=[],
+        status="draft",
+    )
+    with stage_timer(timings, "sparse_encode"):
+        sparse_vector = qdrant.build_sparse_query(query_text)
+    query_vector, case_vector = await asyncio.gather(
+        timed_stage(timings, "embed_query", embedder.aembed_query(query_text)),
+        timed_stage(timings, "embed_case", embedder.aembed_query(case.summary_text())),
+    )
+
+    async def search_and_save() -> tuple[
+        list[qdrant_models.ScoredPoint], list[dict[str, object]], list[dict[str, object]], str
+    ]:
+        (schemes,) = await retrieve_schemes(
+            services, [signals], [query_text], [query_vector], [sparse_vector], limit, timings
+        )
+        case.retrieved_scheme_ids = [str(scheme.id) for scheme in schemes]
+        save = asyncio.ensure_future(
+            timed_stage(timings, "save_memory", memory.save_case(case, vector=case_vector))
+        )
+        book = await rule_book(services)
+        with stage_timer(timings, "explain"):
+            explanations = explain_schemes(book, signals, schemes)
+            misses = near_misses(services, book, signals, schemes)
+        return schemes, explanations, misses, await save
+
+    (schemes, explanations, misses, memory_id), memories = await asyncio.gather(
+        search_and_save(),
+        timed_stage(
+            timings,
+            "recall_memories",
+            memory.recall_cases(query_text, query_vector=query_vector, state=recall_state(services, signals)),
+        ),
+    )
+    memories = [point for point in memories if str(point.id) != memory_id]
+    timings["total"] = elapsed_ms(started)
+
+    return RetrievalResult(
+        signals=signals,
+        schemes=schemes,
+        explanations=explanations,
+        memories=memories,
+        memory_id=memory_id,
+        timings_ms=timings,
+        near_misses=misses,
+    )
+
+
+async def arun_retrieval_batch(
+    services: ServiceContainer,
+    items: list[tuple[EligibilitySignals, str]],
+    limit: int = 3,
+) -> list[RetrievalResult]:
+    if not items:
+        return []
+    qdrant = services.async_qdrant
+    memory = services.async_memory
+    timings: dict[str, float] = {}
+    started = perf_counter()
+
+    query_texts = [query_intent or signals.summary_text() for signals, query_intent in items]
+    cases = [
+        CaseMemory(
+            signals=signals,
+            query_intent=query_text,
+            retrieved_scheme_ids=[],
+            status="draft",
+        )
+        for (signals, _), query_text in zip(items, query_texts, strict=True)
+    ]
+    vectors = await timed_stage(
+        timings,
+        "embed",
+        services.embedder.aembed_documents(query_texts + [case.summary_text() for case in cases]),
+    )
+    query_vectors = vectors[: len(items)]
+    case_vectors = vectors[len(items) :]
+    with stage_timer(timings, "sparse_encode"):
+        sparse_vectors = qdrant.build_sparse_queries(query_texts)
+
+    signals_list = [signals for signals, _ in items]
+    scheme_batches, memory_batches = await asyncio.gather(
+        retrieve_schemes(services, signals_list, query_texts, query_vectors, sparse_vectors, limit, timings),
+        timed_stage(
+            timings,
+            "recall_memories",
+            memory.recall_cases_batch(
+                query_vectors, states=[recall_state(services, signals) for signals in signals_list]
+            ),
+        ),
+    )
+
+    for case, schemes in zip(cases, scheme_batches, strict=True):
+        case.retrieved_scheme_ids = [str(scheme.id) for scheme in schemes]
+    memory_ids = await timed_stage(timings, "save_memory", memory.save_cases(cases, case_vectors))
+    book = await rule_book(services)
+    timings["total"] = elapsed_ms(started)
+
+    return [
+        RetrievalResult(
+            signals=signals,
+            schemes=schemes,
+            explanations=explain_schemes(book, signals, schemes),
+            memories=memories,
+            memory_id=memory_id,
+            timings_ms=timings,
+            near_misses=near_misses(services, book, signals, schemes),
+        )
+        for (signals, _), schemes, memories, memory_id in zip(
+            items, scheme_batches, memory_batches, memory_ids, strict=True
+        )
+    ]
+
+
+async def retrieve_schemes(
+    services: ServiceContainer,
+    signals: list[EligibilitySignals],
+    query_texts: list[str],
+    query_vectors: list[list[float]],
+    sparse_vectors: list[qdrant_models.SparseVector],
+    limit: int,
+    timings: dict[str, float],
+) -> list[list[qdrant_models.ScoredPoint]]:
+    index = await timed_stage(timings, "eligibility", eligibility_index(services))
+    eligible = [index.eligible_bits(item) if index is not None else None for item in signals]
+    results: list[list[qdrant_models.ScoredPoint] | None] = [None] * len(signals)
+
+    cache = services.result_cache
+    version = index.version if index is not None else None
+    land_limits: tuple[float, ...] | None = None
+    if cache is not None and version is None and services.catalog is not None:
+        version = (await services.catalog.snapshot()).version
+        land_limits = await services.catalog.derived(land_thresholds)
+    keys: list[str | None] = [None] * len(signals)
+    if cache is not None and version is not None:
+        with stage_timer(timings, "result_cache"):
+            for position, item in enumerate(signals):
+                keys[position] = result_cache_key(
+                    version, query_texts[position], item, limit, eligible[position], land_limits
+                )
+                results[position] = await cache.get(version, keys[position])
+
+    queries: list[SchemeQuery] = []
+    positions: list[int] = []
+    for position, item in enumerate(signals):
+        if results[position] is not None:
+            continue
+        if eligible[position] == 0:
+            results[position] = []
+            continue
+        queries.append(
+            SchemeQuery(
+                query_vector=query_vectors[position],
+                sparse_vector=sparse_vectors[position],
+                state=item.state,
+                housing=item.housing_type if item.housing_type != "unknown" else None,
+                caste=item.caste,
+                land_acres=item.land_acres,
+                limit=limit,
+                point_ids=index.point_ids(eligible[position]) if index is not None else None,
+            )
+        )
+        positions.append(position)
+
+    if queries:
+        searched = await timed_stage(timings, "search_schemes", search_schemes(services, queries))
+        for position, hits in zip(positions, searched, strict=True):
+            results[position] = hits
+            key = keys[position]
+            if cache is not None and version is not None and key is not None:
+                await cache.put(version, key, hits)
+    return [hits or [] for hits in results]
+
+
+async def eligibility_index(services: ServiceContainer) -> EligibilityIndex | None:
+    # None leaves filtering to the scheme search itself.
+    if services.catalog is None or not services.settings.eligibility_index:
+        return None
+    index = await services.catalog.derived(EligibilityIndex.from_snapshot)
+    return index if len(index) else None
+
+
+async def rule_book(services: ServiceContainer) -> RuleBook | None:
+    # Compiled once per catalog version alongside the eligibility index; None evaluates each
+    # result's own payload instead and skips near misses.
+    if services.catalog is None:
+        return None
+    book = await services.catalog.derived(RuleBook.from_snapshot)
+    return book if len(book) else None
+
+
+def explain_schemes(
+    book: RuleBook | None,
+    signals: EligibilitySignals,
+    schemes: list[qdrant_models.ScoredPoint],
+) -> list[dict[str, object]]:
+    evaluations = book.evaluate(signals, [str(scheme.id) for scheme in schemes]) if book is not None else []
+    return [
+        explain_match(signals, scheme, evaluations[position] if evaluations else None)
+        for position, scheme in enumerate(schemes)
+    ]
+
+
+def near_misses(
+    services: ServiceContainer,
+    book: RuleBook | None,
+    signals: EligibilitySignals,
+    schemes: list[qdrant_models.ScoredPoint],
+) -> list[dict[str, object]]:
+    if book is None:
+        return []
+    evaluations = book.near_misses(
+        signals,
+        exclude={str(scheme.id) for scheme in schemes},
+        limit=services.settings.near_miss_limit,
+    )
+    return [explain_near_miss(evaluation) for evaluation in evaluations]
+
+
+async def search_schemes(
+    services: ServiceContainer,
+    queries: list[SchemeQuery],
+) -> list[list[qdrant_models.ScoredPoint]]:
+    if not queries:
+        return []
+    if services.scheme_search is not None:
+        return await services.scheme_search.search_batch(queries)
+    return await services.async_qdrant.search_schemes_batch(queries)
+
+
+def recall_state(services: ServiceContainer, signals: EligibilitySignals) -> str | None:
+    return signals.state if services.settings.memory_recall_same_state else None
+
+
+def elapsed_ms(started: float) -> float:
+    return round((perf_counter() - started) * 1000, 2)
+
+
+@contextmanager
+def stage_timer(timings: dict[str, float], stage: str) -> Iterator[None]:
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = elapsed_ms(started)
+        observe_stage(stage, timings[stage])
+
+
+async def timed_stage(timings: dict[str, float], stage: str, awaitable: Awaitable[T]) -> T:
+    with stage_timer(timings, stage):
+        return await awaitable
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Literal
+
+from qdrant_client.http import models as qdrant_models
+
+
+QuantizationKind = Literal["none", "scalar", "binary"]
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    name: str
+    quantization: QuantizationKind = "none"
+    quantization_always_ram: bool = True
+    scalar_quantile: float = 0.99
+    rescore: bool = True
+    oversampling: float | None = None
+    vectors_on_disk: bool = False
+    payload_on_disk: bool = False
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    hnsw_on_disk: bool = False
+    search_hnsw_ef: int | None = None
+    indexing_threshold: int | None = None
+    memmap_threshold: int | None = None
+    default_segment_number: int | None = None
+
+    def quantization_config(self) -> qdrant_models.QuantizationConfig | None:
+        if self.quantization == "scalar":
+            return qdrant_models.ScalarQuantization(
+                scalar=qdrant_models.ScalarQuantizationConfig(
+                    type=qdrant_models.ScalarType.INT8,
+                    quantile=self.scalar_quantile,
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        if self.quantization == "binary":
+            return qdrant_models.BinaryQuantization(
+                binary=qdrant_models.BinaryQuantizationConfig(always_ram=self.quantization_always_ram)
+            )
+        return None
+
+    def quantization_diff(self) -> qdrant_models.QuantizationConfigDiff:
+        # update_collection leaves omitted settings untouched, so "none" must disable explicitly.
+        return self.quantization_config() or qdrant_models.Disabled.DISABLED
+
+    def hnsw_config(self) -> qdrant_models.HnswConfigDiff:
+        return qdrant_models.HnswConfigDiff(
+            m=self.hnsw_m,
+            ef_construct=self.hnsw_ef_construct,
+            on_disk=self.hnsw_on_disk,
+        )
+
+    def optimizers_config(self) -> qdrant_models.OptimizersConfigDiff | None:
+        if self.indexing_threshold is None and self.memmap_threshold is None and self.default_segment_number is None:
+            return None
+        return qdrant_models.OptimizersConfigDiff(
+            indexing_threshold=self.indexing_threshold,
+            memmap_threshold=self.memmap_threshold,
+            default_segment_number=self.default_segment_number,
+        )
+
+    def vector_params(self, size: int, distance: qdrant_models.Distance) -> qdrant_models.VectorParams:
+        return qdrant_models.VectorParams(
+            size=size,
+            distance=distance,
+            on_disk=self.vectors_on_disk or None,
+            hnsw_config=self.hnsw_config(),
+            quantization_config=self.quantization_config(),
+        )
+
+    def vector_params_diff(self) -> qdrant_models.VectorParamsDiff:
+        return qdrant_models.VectorParamsDiff(
+            on_disk=self.vectors_on_disk,
+            hnsw_config=self.hnsw_config(),
+            quantization_config=self.quantization_diff(),
+        )
+
+    def search_params(self) -> qdrant_models.SearchParams | None:
+        quantization = None
+        if self.quantization != "none":
+            quantization = qdrant_models.QuantizationSearchParams(
+                rescore=self.rescore,
+                oversampling=self.oversampling,
+            )
+        if quantization is None and self.search_hnsw_ef is None:
+            return None
+        return qdrant_models.SearchParams(hnsw_ef=self.search_hnsw_ef, quantization=quantization)
+
+    def estimated_ram_bytes(self, points: int, dimension: int) -> int:
+        # Rough steady-state RAM for the dense vectors and HNSW graph, ignoring payloads.
+        original = 0 if self.vectors_on_disk else points * dimension * 4
+        if self.quantization == "scalar":
+            quantized = points * dimension
+        elif self.quantization == "binary":
+            quantized = points * -(-dimension // 8)
+        else:
+            quantized = 0
+        if not self.quantization_always_ram and self.vectors_on_disk:
+            quantized = 0
+        graph = 0 if self.hnsw_on_disk else points * self.hnsw_m * 2 * 4
+        return original + quantized + graph
+
+
+COLLECTION_PROFILES = {
+    "default": CollectionProfile(name="default"),
+    "accurate": CollectionProfile(
+        name="accurate",
+        hnsw_m=32,
+        hnsw_ef_construct=256,
+        search_hnsw_ef=256,
+    ),
+    "balanced": CollectionProfile(
+        name="balanced",
+        quantization="scalar",
+        oversampling=2.0,
+        vectors_on_disk=True,
+        hnsw_ef_construct=128,
+        search_hnsw_ef=128,
+    ),
+    "compact": CollectionProfile(
+        name="compact",
+        quantization="binary",
+        oversampling=3.0,
+        vectors_on_disk=True,
+        payload_on_disk=True,
+        hnsw_on_disk=True,
+        search_hnsw_ef=128,
+        memmap_threshold=20_000,
+    ),
+}
+
+
+@dataclass(frozen=True)
+class CollectionProfiles:
+    schemes: CollectionProfile = COLLECTION_PROFILES["default"]
+    memories: CollectionProfile = COLLECTION_PROFILES["default"]
+
+
+def collection_profile(name: str) -> CollectionProfile:
+    profile = COLLECTION_PROFILES.get(name.strip().lower())
+    if profile is None:
+        raise ValueError(f"Unknown collection profile {name!r}; expected one of {', '.join(COLLECTION_PROFILES)}")
+    return profile
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+import json
+import logging
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Literal
+
+from qdrant_client.http import models as qdrant_models
+
+from convolve.embeddings import normalize_query
+from convolve.qdrant_client import AsyncQdrantService
+
+
+logger = logging.getLogger(__name__)
+
+StaleDraftAction = Literal["archive", "delete", "keep"]
+
+DEFAULT_CHECKPOINT_PATH = Path(__file__).resolve().parents[2] / ".cache" / "compaction_checkpoint.json"
+MAX_MERGED_IDS = 200
+MAX_RETRIEVED_IDS = 20
+MAX_REPORTED_MERGES = 1_000
+_MERGED_FIELDS = ("merged_case_ids", "duplicate_count", "retrieved_scheme_ids", "created_at", "updated_at")
+# Submitted, approved and rejected cases carry real outcomes, so only drafts are ever absorbed.
+_STATUS_RANK = {"approved": 3, "rejected": 3, "submitted": 2, "draft": 0}
+
+
+@dataclass(frozen=True)
+class CompactionPolicy:
+    similarity_threshold: float = 0.97
+    neighbours: int = 8
+    land_tolerance_acres: float = 0.25
+    income_tolerance: float = 0.1
+    min_draft_age: timedelta = timedelta(days=1)
+    draft_ttl: timedelta | None = timedelta(days=90)
+    stale_draft_action: StaleDraftAction = "archive"
+    page_size: int = 256
+
+
+@dataclass
+class CompactionReport:
+    scanned: int = 0
+    merged: int = 0
+    survivors: int = 0
+    expired: int = 0
+    pages: int = 0
+    dry_run: bool = False
+    watermark: str | None = None
+    elapsed_ms: float = 0.0
+    merges: list[tuple[str, str]] = field(default_factory=list)
+
+
+class CaseMemoryCompactor:
+    def __init__(
+        self,
+        qdrant: AsyncQdrantService,
+        policy: CompactionPolicy | None = None,
+        checkpoint_path: str | Path | None = DEFAULT_CHECKPOINT_PATH,
+    ) -> None:
+        self._qdrant = qdrant
+        self._policy = policy or CompactionPolicy()
+        self._checkpoint = Path(checkpoint_path) if checkpoint_path else None
+
+    async def run(
+        self,
+        dry_run: bool = False,
+        full: bool = False,
+        max_pages: int | None = None,
+        now: datetime | None = None,
+    ) -> CompactionReport:
+        started = perf_counter()
+        now = now or datetime.now(timezone.utc)
+        report = CompactionReport(dry_run=dry_run)
+        if self._policy.draft_ttl is not None and self._policy.stale_draft_action != "keep":
+            await self._expire_stale_drafts(now - self._policy.draft_ttl, report, dry_run, max_pages)
+        since = None if full else self._read_watermark()
+        completed = await self._merge_duplicates(since, now - self._policy.min_draft_age, report, dry_run, max_pages)
+        if completed and not dry_run:
+            # Later runs only scan drafts that became old enough after this cutoff; their
+            # neighbour queries still see the whole collection.
+            report.watermark = (now - self._policy.min_draft_age).isoformat()
+            self._write_watermark(report.watermark)
+        report.elapsed_ms = round((perf_counter() - started) * 1000, 2)
+        return report
+
+    async def _expire_stale_drafts(
+        self, cutoff: datetime, report: CompactionReport, dry_run: bool, max_pages: int | None
+    ) -> None:
+        stale = qdrant_models.Filter(must=[_draft_condition(), _datetime_range("updated_at", lt=cutoff)])
+        offset: qdrant_models.ExtendedPointId | None = None
+        # Each phase gets its own page budget, so a backlog of stale drafts cannot starve merging.
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            records, next_offset = await self._qdrant.scroll_case_memories(
+                stale,
+                limit=self._policy.page_size,
+                offset=offset,
+                with_vectors=self._policy.stale_draft_action == "archive",
+            )
+            pages += 1
+            report.pages += 1
+            if not records:
+                return
+            report.expired += len(records)
+            if dry_run:
+                offset = next_offset
+            else:
+                if self._policy.stale_draft_action == "archive":
+                    await self._qdrant.archive_case_memories(records)
+                await self._qdrant.delete_case_memories([str(record.id) for record in records])
+            # Deleted pages drop out of the filter, so live runs rescan from the start.
+            if next_offset is None:
+                return
+
+    async def _merge_duplicates(
+        self,
+        since: datetime | None,
+        until: datetime,
+        report: CompactionReport,
+        dry_run: bool,
+        max_pages: int | None,
+    ) -> bool:
+        conditions: list[qdrant_models.Condition] = [_draft_condition(), _datetime_range("created_at", lt=until)]
+        if since is not None:
+            conditions.append(_datetime_range("created_at", gte=since))
+        candidates = qdrant_models.Filter(must=conditions)
+        offset: qdrant_models.ExtendedPointId | None = None
+        survivors: set[str] = set()
+        pages = 0
+        try:
+            while max_pages is None or pages < max_pages:
+                records, offset = await self._qdrant.scroll_case_memories(
+                    candidates, limit=self._policy.page_size, offset=offset, with_vectors=True
+                )
+                pages += 1
+                report.pages += 1
+                report.scanned += len(records)
+                await self._merge_page(records, report, survivors, dry_run)
+                if offset is None:
+                    return True
+            return False
+        finally:
+            report.survivors = len(survivors)
+
+    async def _merge_page(
+        self,
+        records: list[qdrant_models.Record],
+        report: CompactionReport,
+        survivors: set[str],
+        dry_run: bool,
+    ) -> None:
+        if not records:
+            return
+        neighbours = await self._qdrant.case_memory_neighbours(
+            [record.vector for record in records],
+            limit=self._policy.neighbours + 1,
+            score_threshold=self._policy.similarity_threshold,
+        )
+        payloads: dict[str, dict[str, Any]] = {}
+        merges: list[tuple[str, str]] = []
+        absorbed: set[str] = set()
+        for record, hits in zip(records, neighbours, strict=True):
+            case_id = str(record.id)
+            if case_id in absorbed:
+                continue
+            candidate = payloads.setdefault(case_id, dict(record.payload or {}))
+            for hit in hits:
+                hit_id = str(hit.id)
+                if hit_id == case_id or hit_id in absorbed:
+                    continue
+                other = payloads.setdefault(hit_id, dict(hit.payload or {}))
+                if _rank(hit_id, other) > _rank(case_id, candidate) and cases_match(candidate, other, self._policy):
+                    # A survivor absorbed later in the page forwards everything it collected.
+                    payloads[hit_id] = merge_case_payloads(other, case_id, candidate)
+                    merges.append((case_id, hit_id))
+                    absorbed.add(case_id)
+                    break
+        if not merges:
+            return
+        updated = {survivor for _, survivor in merges} - absorbed
+        survivors.difference_update(absorbed)
+        survivors.update(updated)
+        report.merged += len(absorbed)
+        report.merges.extend(merges[: max(MAX_REPORTED_MERGES - len(report.merges), 0)])
+        if dry_run:
+            return
+        for survivor in updated:
+            payload = payloads[survivor]
+            await self._qdrant.update_case_memory(
+                survivor,
+                {key: payload[key] for key in _MERGED_FIELDS if key in payload},
+            )
+        await self._qdrant.delete_case_memories(sorted(absorbed))
+
+    def _read_watermark(self) -> datetime | None:
+        if self._checkpoint is None or not self._checkpoint.exists():
+            return None
+        try:
+            value = json.loads(self._checkpoint.read_text(encoding="utf-8")).get("watermark")
+            return datetime.fromisoformat(value) if value else None
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable compaction checkpoint %s", self._checkpoint)
+            return None
+
+    def _write_watermark(self, watermark: str) -> None:
+        if self._checkpoint is None:
+            return
+        self._checkpoint.parent.mkdir(parents=True, exist_ok=True)
+        self._checkpoint.write_text(json.dumps({"watermark": watermark}), encoding="utf-8")
+
+
+class CompactionScheduler:
+    def __init__(self, compactor: CaseMemoryCompactor, interval_seconds: float) -> None:
+        self._compactor = compactor
+        self._interval = interval_seconds
+        self._task: asyncio.Task[None] | None = None
+        self.last_report: CompactionReport | None = None
+
+    async def start(self) -> None:
+        if self._task is None and self._interval > 0:
+            self._task = asyncio.create_task(self._run(), name="case-memory-compaction")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                self.last_report = await self._compactor.run()
+            except Exception:
+                logger.exception("Case-memory compaction failed; retrying in %.0fs", self._interval)
+                continue
+            report = self.last_report
+            logger.info(
+                "Compacted case memory: merged %d drafts into %d cases, expired %d in %.0f ms",
+                report.merged,
+                report.survivors,
+                report.expired,
+                report.elapsed_ms,
+            )
+
+
+def cases_match(left: dict[str, Any], right: dict[str, Any], policy: CompactionPolicy) -> bool:
+    if normalize_query(str(left.get("query_intent") or "")) != normalize_query(str(right.get("query_intent") or "")):
+        return False
+    a = left.get("signals") or {}
+    b = right.get("signals") or {}
+    for key in ("state", "caste", "housing_type", "intent"):
+        if _text(a.get(key)) != _text(b.get(key)):
+            return False
+    for key in ("assets", "demographics"):
+        if {_text(value) for value in a.get(key) or []} != {_text(value) for value in b.get(key) or []}:
+            return False
+    if not _close(a.get("land_acres"), b.get("land_acres"), absolute=policy.land_tolerance_acres):
+        return False
+    return _close(a.get("annual_income"), b.get("annual_income"), relative=policy.income_tolerance)
+
+
+def merge_case_payloads(survivor: dict[str, Any], case_id: str, duplicate: dict[str, Any]) -> dict[str, Any]:
+    merged = dict(survivor)
+    merged_ids = [*(survivor.get("merged_case_ids") or []), case_id, *(duplicate.get("merged_case_ids") or [])]
+    merged["merged_case_ids"] = list(dict.fromkeys(merged_ids))[-MAX_MERGED_IDS:]
+    merged["duplicate_count"] = int(survivor.get("duplicate_count") or 1) + int(duplicate.get("duplicate_count") or 1)
+    retrieved = [*(survivor.get("retrieved_scheme_ids") or []), *(duplicate.get("retrieved_scheme_ids") or [])]
+    merged["retrieved_scheme_ids"] = list(dict.fromkeys(retrieved))[:MAX_RETRIEVED_IDS]
+    # Keep the earliest sighting and the latest activity so recency ranking still reflects the repeat visit.
+    merged["created_at"] = _earliest(survivor.get("created_at"), duplicate.get("created_at"))
+    merged["updated_at"] = _latest(survivor.get("updated_at"), duplicate.get("updated_at"))
+    return merged
+
+
+def report_dict(report: CompactionReport) -> dict[str, Any]:
+    payload = asdict(report)
+    payload["merges"] = [{"merged": merged, "into": survivor} for merged, survivor in report.merges]
+    return payload
+
+
+def _rank(case_id: str, payload: dict[str, Any]) -> tuple[int, float, str]:
+    # Among drafts the oldest record wins, with the id as a tie-breaker so merges never cycle.
+    created_at = _parse(str(payload.get("created_at") or ""))
+    return (_STATUS_RANK.get(str(payload.get("status") or "draft"), 1), -created_at.timestamp(), case_id)
+
+
+def _draft_condition() -> qdrant_models.FieldCondition:
+    return qdrant_models.FieldCondition(key="status", match=qdrant_models.MatchValue(value="draft"))
+
+
+def _datetime_range(
+    key: str, lt: datetime | None = None, gte: datetime | None = None
+) -> qdrant_models.FieldCondition:
+    return qdrant_models.FieldCondition(key=key, range=qdrant_models.DatetimeRange(lt=lt, gte=gte))
+
+
+def _text(value: object) -> str | None:
+    return str(value).strip().lower() if value not in (None, "") else None
+
+
+def _close(left: object, right: object, absolute: float = 0.0, relative: float = 0.0) -> bool:
+    if left is None or right is None:
+        return left is None and right is None
+    left_value, right_value = float(left), float(right)
+    tolerance = max(absolute, relative * max(abs(left_value), abs(right_value)))
+    return abs(left_value - right_value) <= tolerance
+
+
+def _earliest(left: object, right: object) -> object:
+    values = [value for value in (left, right) if isinstance(value, str)]
+    return min(values, key=_parse) if values else left
+
+
+def _latest(left: object, right: object) -> object:
+    values = [value for value in (left, right) if isinstance(value, str)]
+    return max(values, key=_parse) if values else left
+
+
+def _parse(value: str) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
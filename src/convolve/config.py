@@ -2,16 +2,75 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import os
+from pathlib import Path
 
 from dotenv import load_dotenv
 
 
+DEFAULT_DOCUMENT_CACHE_PATH = Path(__file__).resolve().parents[2] / ".cache" / "embeddings.sqlite"
+DEFAULT_ONNX_MODEL_DIR = Path(__file__).resolve().parents[2] / ".cache" / "onnx" / "all-MiniLM-L6-v2"
+# Scheme fields read by explanations and the rule evaluator; description and source_url are
+# fetched per scheme through GET /schemes/{point_id}.
+DEFAULT_SCHEME_PAYLOAD_FIELDS = ("scheme_id", "scheme_name", "benefits", "states", "eligibility_rules")
+DEFAULT_MEMORY_PAYLOAD_EXCLUDE = ("merged_case_ids",)
+
+
 @dataclass(frozen=True)
 class Settings:
     openai_api_key: str | None
     qdrant_url: str | None
     qdrant_api_key: str | None
     embedding_backend: str
+    qdrant_prefer_grpc: bool = False
+    qdrant_grpc_port: int = 6334
+    scheme_payload_fields: tuple[str, ...] = DEFAULT_SCHEME_PAYLOAD_FIELDS
+    memory_payload_exclude: tuple[str, ...] = DEFAULT_MEMORY_PAYLOAD_EXCLUDE
+    embedding_workers: int = 2
+    embedding_cache_size: int = 1024
+    embedding_cache_ttl_seconds: float = 3600.0
+    embedding_batching: bool = True
+    embedding_batch_window_ms: float = 2.0
+    embedding_batch_max_size: int = 32
+    embedding_batch_max_queue: int = 1024
+    embedding_batch_process: bool = False
+    onnx_model_dir: str = str(DEFAULT_ONNX_MODEL_DIR)
+    onnx_quantized: bool = True
+    onnx_threads: int = 0
+    document_cache_path: str | None = None
+    document_cache_max_entries: int = 100_000
+    memory_write_behind: bool = True
+    memory_flush_batch_size: int = 64
+    memory_flush_interval_ms: float = 250.0
+    vision_enabled: bool = True
+    vision_max_edge: int = 1024
+    vision_image_quality: int = 80
+    vision_image_format: str = "JPEG"
+    vision_cache_size: int = 512
+    vision_cache_ttl_seconds: float = 86_400.0
+    eligibility_index: bool = True
+    near_miss_limit: int = 3
+    catalog_refresh_seconds: float = 30.0
+    scheme_replica: str = "primary"
+    scheme_search_timeout_ms: float = 1500.0
+    result_cache_backend: str = "memory"
+    result_cache_url: str | None = None
+    result_cache_size: int = 4096
+    result_cache_ttl_seconds: float = 600.0
+    traffic_record_path: str | None = None
+    metrics_enabled: bool = True
+    startup_warm_up: bool = True
+    scheme_collection_profile: str = "default"
+    memory_collection_profile: str = "default"
+    memory_dedup_threshold: float = 0.97
+    memory_draft_ttl_days: float = 90.0
+    memory_stale_draft_action: str = "archive"
+    memory_compaction_interval_seconds: float = 0.0
+    memory_recall_candidates: int = 50
+    memory_recency_half_life_days: float = 1.0
+    memory_recency_weight: float = 1.0
+    memory_recall_scoring: str = "server"
+    memory_recall_statuses: tuple[str, ...] = ()
+    memory_recall_same_state: bool = False
 
 
 def load_settings() -> Settings:
@@ -21,9 +80,73 @@ def load_settings() -> Settings:
         qdrant_url=os.getenv("QDRANT_URL"),
         qdrant_api_key=os.getenv("QDRANT_API_KEY"),
         embedding_backend=os.getenv("EMBEDDING_BACKEND", "sentence-transformers"),
+        qdrant_prefer_grpc=env_flag("QDRANT_PREFER_GRPC", False),
+        qdrant_grpc_port=int(os.getenv("QDRANT_GRPC_PORT", "6334")),
+        scheme_payload_fields=env_list("SCHEME_PAYLOAD_FIELDS", DEFAULT_SCHEME_PAYLOAD_FIELDS),
+        memory_payload_exclude=env_list("MEMORY_PAYLOAD_EXCLUDE", DEFAULT_MEMORY_PAYLOAD_EXCLUDE),
+        embedding_workers=int(os.getenv("EMBEDDING_WORKERS", "2")),
+        embedding_cache_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "1024")),
+        embedding_cache_ttl_seconds=float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "3600")),
+        embedding_batching=env_flag("EMBEDDING_BATCHING", True),
+        embedding_batch_window_ms=float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "2")),
+        embedding_batch_max_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32")),
+        embedding_batch_max_queue=int(os.getenv("EMBEDDING_BATCH_MAX_QUEUE", "1024")),
+        embedding_batch_process=env_flag("EMBEDDING_BATCH_PROCESS", False),
+        onnx_model_dir=os.getenv("ONNX_MODEL_DIR") or str(DEFAULT_ONNX_MODEL_DIR),
+        onnx_quantized=env_flag("ONNX_QUANTIZED", True),
+        onnx_threads=int(os.getenv("ONNX_THREADS", "0")),
+        document_cache_path=os.getenv("DOCUMENT_CACHE_PATH", str(DEFAULT_DOCUMENT_CACHE_PATH)) or None,
+        document_cache_max_entries=int(os.getenv("DOCUMENT_CACHE_MAX_ENTRIES", "100000")),
+        memory_write_behind=env_flag("MEMORY_WRITE_BEHIND", True),
+        memory_flush_batch_size=int(os.getenv("MEMORY_FLUSH_BATCH_SIZE", "64")),
+        memory_flush_interval_ms=float(os.getenv("MEMORY_FLUSH_INTERVAL_MS", "250")),
+        vision_enabled=env_flag("VISION_ENABLED", True),
+        vision_max_edge=int(os.getenv("VISION_MAX_EDGE", "1024")),
+        vision_image_quality=int(os.getenv("VISION_IMAGE_QUALITY", "80")),
+        vision_image_format=os.getenv("VISION_IMAGE_FORMAT", "JPEG"),
+        vision_cache_size=int(os.getenv("VISION_CACHE_SIZE", "512")),
+        vision_cache_ttl_seconds=float(os.getenv("VISION_CACHE_TTL_SECONDS", "86400")),
+        eligibility_index=env_flag("ELIGIBILITY_INDEX", True),
+        near_miss_limit=int(os.getenv("NEAR_MISS_LIMIT", "3")),
+        catalog_refresh_seconds=float(os.getenv("CATALOG_REFRESH_SECONDS", "30")),
+        scheme_replica=os.getenv("SCHEME_REPLICA", "primary").strip().lower(),
+        scheme_search_timeout_ms=float(os.getenv("SCHEME_SEARCH_TIMEOUT_MS", "1500")),
+        result_cache_backend=os.getenv("RESULT_CACHE_BACKEND", "memory").strip().lower(),
+        result_cache_url=os.getenv("RESULT_CACHE_URL") or None,
+        result_cache_size=int(os.getenv("RESULT_CACHE_SIZE", "4096")),
+        result_cache_ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "600")),
+        traffic_record_path=os.getenv("TRAFFIC_RECORD_PATH") or None,
+        metrics_enabled=env_flag("METRICS_ENABLED", True),
+        startup_warm_up=env_flag("STARTUP_WARM_UP", True),
+        scheme_collection_profile=os.getenv("SCHEME_COLLECTION_PROFILE", "default").strip().lower(),
+        memory_collection_profile=os.getenv("MEMORY_COLLECTION_PROFILE", "default").strip().lower(),
+        memory_dedup_threshold=float(os.getenv("MEMORY_DEDUP_THRESHOLD", "0.97")),
+        memory_draft_ttl_days=float(os.getenv("MEMORY_DRAFT_TTL_DAYS", "90")),
+        memory_stale_draft_action=os.getenv("MEMORY_STALE_DRAFT_ACTION", "archive").strip().lower(),
+        memory_compaction_interval_seconds=float(os.getenv("MEMORY_COMPACTION_INTERVAL_SECONDS", "0")),
+        memory_recall_candidates=int(os.getenv("MEMORY_RECALL_CANDIDATES", "50")),
+        memory_recency_half_life_days=float(os.getenv("MEMORY_RECENCY_HALF_LIFE_DAYS", "1")),
+        memory_recency_weight=float(os.getenv("MEMORY_RECENCY_WEIGHT", "1")),
+        memory_recall_scoring=os.getenv("MEMORY_RECALL_SCORING", "server").strip().lower(),
+        memory_recall_statuses=env_list("MEMORY_RECALL_STATUSES"),
+        memory_recall_same_state=env_flag("MEMORY_RECALL_SAME_STATE", False),
     )
 
 
+def env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def env_list(name: str, default: tuple[str, ...] = ()) -> tuple[str, ...]:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return tuple(item.strip().lower() for item in value.split(",") if item.strip())
+
+
 def require_qdrant_settings(settings: Settings) -> None:
     if not settings.qdrant_url:
         raise ValueError("QDRANT_URL is required to connect to Qdrant")
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+import math
+from typing import Any, Iterable
+
+from convolve.catalog import CatalogSnapshot
+from convolve.schemas import EligibilitySignals, parse_limit
+
+
+ALL_STATES = "All"
+
+
+@dataclass(frozen=True)
+class _CategoricalRule:
+    unrestricted: int
+    by_value: dict[str, int]
+
+    def matching(self, value: str) -> int:
+        return self.unrestricted | self.by_value.get(_normalize(value), 0)
+
+
+@dataclass(frozen=True)
+class _UpperLimitRule:
+    unrestricted: int
+    thresholds: list[float]
+    at_least: list[int]
+
+    def matching(self, value: float) -> int:
+        position = bisect_left(self.thresholds, value)
+        if position == len(self.thresholds):
+            return self.unrestricted
+        return self.unrestricted | self.at_least[position]
+
+
+class EligibilityIndex:
+    def __init__(self, version: str, point_ids: list[str], payloads: list[dict[str, Any]]) -> None:
+        self.version = version
+        self._point_ids = point_ids
+        self._all = (1 << len(point_ids)) - 1
+        states: dict[str, int] = defaultdict(int)
+        housing: dict[str, int] = defaultdict(int)
+        caste: dict[str, int] = defaultdict(int)
+        land: dict[float, int] = defaultdict(int)
+        income: dict[float, int] = defaultdict(int)
+        excluded_assets: dict[str, int] = defaultdict(int)
+        no_housing = no_caste = no_land = no_income = 0
+
+        for position, payload in enumerate(payloads):
+            bit = 1 << position
+            rules = payload.get("eligibility_rules") or {}
+            for state in payload.get("states") or [ALL_STATES]:
+                states[_normalize(state)] |= bit
+            no_housing |= _add_categorical(housing, rules.get("housing"), bit)
+            no_caste |= _add_categorical(caste, rules.get("caste"), bit)
+            no_land |= _add_limit(land, rules.get("land_max_acres"), bit)
+            no_income |= _add_limit(income, rules.get("income_limit"), bit)
+            for asset in rules.get("assets_excluded") or []:
+                excluded_assets[_normalize(asset)] |= bit
+
+        self._states = dict(states)
+        self._all_states = self._states.get(_normalize(ALL_STATES), 0)
+        self._housing = _CategoricalRule(no_housing, dict(housing))
+        self._caste = _CategoricalRule(no_caste, dict(caste))
+        self._land = _upper_limit_rule(no_land, land)
+        self._income = _upper_limit_rule(no_income, income)
+        self._excluded_assets = dict(excluded_assets)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: CatalogSnapshot) -> EligibilityIndex:
+        return cls(snapshot.version, snapshot.point_ids, snapshot.payloads)
+
+    def __len__(self) -> int:
+        return len(self._point_ids)
+
+    def eligible_bits(self, signals: EligibilitySignals) -> int:
+        # Unknown household signals never rule a scheme out; a scheme without a rule matches everyone.
+        bits = self._all
+        if signals.state:
+            bits &= self._all_states | self._states.get(_normalize(signals.state), 0)
+        if signals.housing_type != "unknown":
+            bits &= self._housing.matching(signals.housing_type)
+        if signals.caste:
+            bits &= self._caste.matching(signals.caste)
+        if signals.land_acres is not None:
+            bits &= self._land.matching(signals.land_acres)
+        if signals.annual_income is not None:
+            bits &= self._income.matching(signals.annual_income)
+        for asset in signals.assets:
+            bits &= ~self._excluded_assets.get(_normalize(asset), 0)
+        return bits & self._all
+
+    def eligible_point_ids(self, signals: EligibilitySignals) -> list[str]:
+        return self.point_ids(self.eligible_bits(signals))
+
+    def point_ids(self, bits: int) -> list[str]:
+        return list(self._iter_point_ids(bits))
+
+    def _iter_point_ids(self, bits: int) -> Iterable[str]:
+        while bits:
+            lowest = bits & -bits
+            yield self._point_ids[lowest.bit_length() - 1]
+            bits ^= lowest
+
+
+def _add_categorical(index: dict[str, int], value: Any, bit: int) -> int:
+    if value in (None, ""):
+        return bit
+    values = value if isinstance(value, list) else [value]
+    for item in values:
+        index[_normalize(str(item))] |= bit
+    return 0
+
+
+def _add_limit(index: dict[float, int], value: Any, bit: int) -> int:
+    # Parsed like the rule book, so the pre-filter and the explanations agree on formatted limits.
+    limit = parse_limit(value)
+    if math.isnan(limit):
+        return bit
+    index[limit] |= bit
+    return 0
+
+
+def _upper_limit_rule(unrestricted: int, limits: dict[float, int]) -> _UpperLimitRule:
+    thresholds = sorted(limits)
+    at_least = [0] * len(thresholds)
+    running = 0
+    for position in range(len(thresholds) - 1, -1, -1):
+        running |= limits[thresholds[position]]
+        at_least[position] = running
+    return _UpperLimitRule(unrestricted, thresholds, at_least)
+
+
+def _normalize(value: str) -> str:
+    return value.strip().casefold()
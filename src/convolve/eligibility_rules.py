@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import numpy as np
+
+from convolve.catalog import CatalogSnapshot
+from convolve.schemas import EligibilitySignals, parse_limit
+
+
+RuleStatus = Literal["pass", "fail", "unknown"]
+SetRuleKind = Literal["allow", "exclude", "require"]
+
+ALL_STATES = "all"
+# Bounds the per-request near-miss scan; catalogs beyond this only search their first schemes.
+MAX_NEAR_MISS_CANDIDATES = 50_000
+# A household cannot change state, so a scheme that fails only on state is not reported as a near miss.
+UNACTIONABLE_RULES = frozenset({"state"})
+
+_ABSENT, _PASS, _FAIL, _UNKNOWN = 0, 1, 2, 3
+_STATUS_NAMES: dict[int, RuleStatus] = {_PASS: "pass", _FAIL: "fail", _UNKNOWN: "unknown"}
+
+
+@dataclass(frozen=True)
+class RuleOutcome:
+    status: RuleStatus
+    signal: Any
+    rule: Any
+
+
+@dataclass(frozen=True)
+class SchemeEvaluation:
+    point_id: str
+    payload: dict[str, Any]
+    rules: dict[str, RuleOutcome]
+    gap: float | None = None
+
+    @property
+    def failed(self) -> list[str]:
+        return [name for name, outcome in self.rules.items() if outcome.status == "fail"]
+
+    @property
+    def unknown(self) -> list[str]:
+        return [name for name, outcome in self.rules.items() if outcome.status == "unknown"]
+
+    @property
+    def eligible(self) -> bool | None:
+        if self.failed:
+            return False
+        return None if self.unknown else True
+
+
+@dataclass(frozen=True)
+class _SetRule:
+    name: str
+    kind: SetRuleKind
+    # Each scheme points at one distinct value set; set 0 is the empty set, meaning no rule.
+    set_ids: np.ndarray
+    sets: list[frozenset[str]]
+
+    def statuses(self, signals: EligibilitySignals, positions: np.ndarray) -> np.ndarray:
+        per_set = np.array([self._status(values, signals) for values in self.sets], dtype=np.int8)
+        return per_set[self.set_ids[positions]]
+
+    def _status(self, values: frozenset[str], signals: EligibilitySignals) -> int:
+        if not values:
+            return _ABSENT
+        if self.kind == "exclude":
+            owned = {_normalize(item) for item in signals.assets}
+            return _FAIL if values & owned else _PASS
+        if self.kind == "require":
+            present = {_normalize(item) for item in signals.demographics}
+            if not present:
+                return _UNKNOWN
+            return _PASS if values <= present else _FAIL
+        value = _signal_value(self.name, signals)
+        if value is None:
+            return _UNKNOWN
+        return _PASS if _normalize(str(value)) in values else _FAIL
+
+
+@dataclass(frozen=True)
+class _LimitRule:
+    name: str
+    # Upper bounds per scheme, NaN where the scheme has no such rule.
+    limits: np.ndarray
+
+    def statuses(self, signals: EligibilitySignals, positions: np.ndarray) -> np.ndarray:
+        limits = self.limits[positions]
+        present = ~np.isnan(limits)
+        value = _signal_value(self.name, signals)
+        if value is None:
+            return np.where(present, _UNKNOWN, _ABSENT).astype(np.int8)
+        with np.errstate(invalid="ignore"):
+            passed = value <= limits
+        return np.where(present, np.where(passed, _PASS, _FAIL), _ABSENT).astype(np.int8)
+
+    def gaps(self, signals: EligibilitySignals, positions: np.ndarray) -> np.ndarray:
+        value = _signal_value(self.name, signals)
+        limits = self.limits[positions]
+        if value is None:
+            return np.full(len(positions), np.inf)
+        # Relative overshoot, so "5% over the income limit" ranks ahead of "twice the land limit".
+        return (value - limits) / np.maximum(np.abs(limits), 1.0)
+
+
+class RuleBook:
+    def __init__(self, version: str, point_ids: list[str], payloads: list[dict[str, Any]]) -> None:
+        self.version = version
+        self._point_ids = point_ids
+        self._payloads = payloads
+        self._positions = {point_id: position for position, point_id in enumerate(point_ids)}
+        rules = [payload.get("eligibility_rules") or {} for payload in payloads]
+        self._rules: list[_SetRule | _LimitRule] = [
+            _set_rule("state", "allow", [_states(payload) for payload in payloads]),
+            _set_rule("housing", "allow", [item.get("housing") for item in rules]),
+            _set_rule("caste", "allow", [item.get("caste") for item in rules]),
+            _limit_rule("land_acres", [item.get("land_max_acres") for item in rules]),
+            _limit_rule("annual_income", [item.get("income_limit") for item in rules]),
+            _set_rule("assets", "exclude", [item.get("assets_excluded") for item in rules]),
+            _set_rule("demographics", "require", [item.get("demographics_required") for item in rules]),
+        ]
+
+    @classmethod
+    def from_snapshot(cls, snapshot: CatalogSnapshot) -> RuleBook:
+        return cls(snapshot.version, snapshot.point_ids, snapshot.payloads)
+
+    @classmethod
+    def from_payloads(cls, point_ids: list[str], payloads: list[dict[str, Any]]) -> RuleBook:
+        return cls("", point_ids, payloads)
+
+    def __len__(self) -> int:
+        return len(self._point_ids)
+
+    def evaluate(self, signals: EligibilitySignals, point_ids: list[str]) -> list[SchemeEvaluation | None]:
+        known = [self._positions.get(point_id) for point_id in point_ids]
+        positions = np.array([position for position in known if position is not None], dtype=np.int64)
+        evaluations = iter(self._evaluations(signals, positions, self._statuses(signals, positions)))
+        return [next(evaluations) if position is not None else None for position in known]
+
+    def near_misses(
+        self,
+        signals: EligibilitySignals,
+        exclude: set[str] | None = None,
+        limit: int = 3,
+    ) -> list[SchemeEvaluation]:
+        if limit <= 0 or not self._point_ids:
+            return []
+        candidates = np.arange(min(len(self._point_ids), MAX_NEAR_MISS_CANDIDATES), dtype=np.int64)
+        statuses = self._statuses(signals, candidates)
+        failed = statuses == _FAIL
+        # One vectorized pass over the catalog: a near miss fails exactly one actionable rule.
+        actionable = np.array([rule.name not in UNACTIONABLE_RULES for rule in self._rules])
+        single = (failed.sum(axis=0) == 1) & (failed & actionable[:, None]).any(axis=0)
+        if exclude:
+            single &= ~np.isin(candidates, [self._positions[item] for item in exclude if item in self._positions])
+        positions = candidates[single]
+        if not len(positions):
+            return []
+        gaps = np.full(len(positions), np.inf)
+        for row, rule in enumerate(self._rules):
+            if isinstance(rule, _LimitRule):
+                failing = failed[row, single]
+                gaps[failing] = rule.gaps(signals, positions[failing])
+        order = np.argsort(gaps, kind="stable")[:limit]
+        chosen = positions[order]
+        return self._evaluations(
+            signals, chosen, statuses[:, single][:, order], [float(gaps[index]) for index in order]
+        )
+
+    def _statuses(self, signals: EligibilitySignals, positions: np.ndarray) -> np.ndarray:
+        if not len(positions):
+            return np.empty((len(self._rules), 0), dtype=np.int8)
+        return np.stack([rule.statuses(signals, positions) for rule in self._rules])
+
+    def _evaluations(
+        self,
+        signals: EligibilitySignals,
+        positions: np.ndarray,
+        statuses: np.ndarray,
+        gaps: list[float] | None = None,
+    ) -> list[SchemeEvaluation]:
+        evaluations = []
+        for column, position in enumerate(positions.tolist()):
+            payload = self._payloads[position]
+            outcomes = {}
+            for row, rule in enumerate(self._rules):
+                status = int(statuses[row, column])
+                signal = _signal_value(rule.name, signals)
+                # Rules a scheme does not set are shown only when the household reported the signal.
+                if status == _ABSENT and signal in (None, []):
+                    continue
+                outcomes[rule.name] = RuleOutcome(
+                    status=_STATUS_NAMES.get(status, "pass"),
+                    signal=signal,
+                    rule=_rule_value(rule.name, payload),
+                )
+            gap = gaps[column] if gaps is not None and np.isfinite(gaps[column]) else None
+            evaluations.append(SchemeEvaluation(self._point_ids[position], payload, outcomes, gap))
+        return evaluations
+
+
+def evaluate_payload(signals: EligibilitySignals, point_id: str, payload: dict[str, Any]) -> SchemeEvaluation:
+    book = RuleBook.from_payloads([point_id], [payload])
+    # The payload is the book's only scheme, so it is evaluated by position rather than looked up.
+    positions = np.zeros(1, dtype=np.int64)
+    return book._evaluations(signals, positions, book._statuses(signals, positions))[0]
+
+
+def _set_rule(name: str, kind: SetRuleKind, values: list[Any]) -> _SetRule:
+    sets: dict[frozenset[str], int] = {frozenset(): 0}
+    set_ids = np.empty(len(values), dtype=np.int32)
+    for position, value in enumerate(values):
+        items = value if isinstance(value, list) else [] if value in (None, "") else [value]
+        normalized = frozenset(_normalize(str(item)) for item in items)
+        set_ids[position] = sets.setdefault(normalized, len(sets))
+    return _SetRule(name, kind, set_ids, list(sets))
+
+
+def _limit_rule(name: str, values: list[Any]) -> _LimitRule:
+    return _LimitRule(name, np.array([parse_limit(value) for value in values]))
+
+
+def _states(payload: dict[str, Any]) -> list[str] | None:
+    states = payload.get("states") or []
+    if not states or any(_normalize(state) == ALL_STATES for state in states):
+        return None
+    return states
+
+
+def _signal_value(name: str, signals: EligibilitySignals) -> Any:
+    if name == "housing":
+        return signals.housing_type if signals.housing_type != "unknown" else None
+    return getattr(signals, name)
+
+
+def _rule_value(name: str, payload: dict[str, Any]) -> Any:
+    if name == "state":
+        return payload.get("states")
+    rules = payload.get("eligibility_rules") or {}
+    key = {
+        "land_acres": "land_max_acres",
+        "annual_income": "income_limit",
+        "assets": "assets_excluded",
+        "demographics": "demographics_required",
+    }.get(name, name)
+    return rules.get(key)
+
+
+def _normalize(value: str) -> str:
+    return value.strip().casefold()
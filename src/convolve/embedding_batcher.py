@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from time import perf_counter
+from typing import Awaitable, Callable
+
+
+logger = logging.getLogger(__name__)
+
+BatchRunner = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+
+class EmbeddingQueueFull(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class EmbeddingBatcherStats:
+    queue_depth: int
+    in_flight: int
+    batches: int
+    texts: int
+    rejected: int
+    max_batch: int
+    avg_batch: float
+    last_batch_ms: float
+
+
+class EmbeddingBatcher:
+    def __init__(
+        self,
+        run: BatchRunner,
+        window_seconds: float = 0.002,
+        max_batch_size: int = 32,
+        max_queue_size: int = 1024,
+        concurrency: int = 1,
+    ) -> None:
+        self._run_batch = run
+        self._window = max(window_seconds, 0.0)
+        self._max_batch = max(max_batch_size, 1)
+        self._max_queue = max(max_queue_size, 1)
+        self._concurrency = max(concurrency, 1)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future[list[float]]]] | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._running: set[asyncio.Task[None]] = set()
+        self._batches = 0
+        self._texts = 0
+        self._rejected = 0
+        self._largest = 0
+        self._last_batch_ms = 0.0
+
+    async def embed(self, text: str) -> list[float]:
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        queue = self._ensure_started()
+        # Shed load instead of queueing without bound: a caller that would wait behind more than
+        # max_queue_size texts is better served by a fast 503 and a retry elsewhere.
+        if queue.qsize() + len(texts) > self._max_queue:
+            self._rejected += len(texts)
+            raise EmbeddingQueueFull(f"embedding queue is full ({queue.qsize()} texts waiting)")
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        for text, future in zip(texts, futures, strict=True):
+            queue.put_nowait((text, future))
+        return list(await asyncio.gather(*futures))
+
+    def stats(self) -> EmbeddingBatcherStats:
+        return EmbeddingBatcherStats(
+            queue_depth=self._queue.qsize() if self._queue is not None else 0,
+            in_flight=len(self._running),
+            batches=self._batches,
+            texts=self._texts,
+            rejected=self._rejected,
+            max_batch=self._largest,
+            avg_batch=round(self._texts / self._batches, 2) if self._batches else 0.0,
+            last_batch_ms=round(self._last_batch_ms, 2),
+        )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("EmbeddingBatcher stopped"))
+        self._task = None
+        self._loop = None
+
+    def _ensure_started(self) -> asyncio.Queue[tuple[str, asyncio.Future[list[float]]]]:
+        loop = asyncio.get_running_loop()
+        # Queues and futures belong to one event loop; scripts that call asyncio.run twice get a
+        # fresh collector rather than one bound to a closed loop.
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self._concurrency)
+            self._running = set()
+            self._task = loop.create_task(self._collect(), name="embedding-batcher")
+        assert self._queue is not None
+        return self._queue
+
+    async def _collect(self) -> None:
+        assert self._queue is not None and self._slots is not None
+        queue, slots = self._queue, self._slots
+        loop = asyncio.get_running_loop()
+        batch: list[tuple[str, asyncio.Future[list[float]]]] = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                # A slot is taken before the batch closes: while every worker is busy, arrivals keep
+                # accumulating, so batches grow with load and the window only applies when idle.
+                await slots.acquire()
+                deadline = loop.time() + self._window
+                while len(batch) < self._max_batch:
+                    if not queue.empty():
+                        batch.append(queue.get_nowait())
+                        continue
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                task = loop.create_task(self._flush(batch))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                # The flush owns these futures now; cancellation must only fail undispatched texts.
+                batch = []
+        except asyncio.CancelledError:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("EmbeddingBatcher stopped"))
+            raise
+
+    async def _flush(self, batch: list[tuple[str, asyncio.Future[list[float]]]]) -> None:
+        assert self._slots is not None
+        slots = self._slots
+        started = perf_counter()
+        try:
+            pending = [(text, future) for text, future in batch if not future.cancelled()]
+            # Concurrent requests for the same text share a single row of the forward pass.
+            unique = list(dict.fromkeys(text for text, _ in pending))
+            if not unique:
+                return
+            try:
+                vectors = dict(zip(unique, await self._run_batch(unique), strict=True))
+            except Exception as exc:
+                logger.warning("Embedding batch of %d texts failed: %s", len(unique), exc)
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+            for text, future in pending:
+                if not future.done():
+                    future.set_result(list(vectors[text]))
+            self._batches += 1
+            self._texts += len(unique)
+            self._largest = max(self._largest, len(unique))
+        finally:
+            self._last_batch_ms = (perf_counter() - started) * 1000
+            slots.release()
@@ -1,11 +1,27 @@
 from __future__ import annotations
 
-from typing import Protocol, Sequence
-
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_openai import OpenAIEmbeddings
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+import multiprocessing
+import threading
+from typing import TYPE_CHECKING, Protocol, Sequence
 
+from convolve.cache import CacheStats, LRUCache
 from convolve.config import Settings
+from convolve.embedding_batcher import EmbeddingBatcher, EmbeddingBatcherStats
+from convolve.embedding_store import DocumentEmbeddingCache, document_cache_key
+from convolve.metrics import instrumented
+
+if TYPE_CHECKING:
+    from langchain_huggingface import HuggingFaceEmbeddings
+    from langchain_openai import OpenAIEmbeddings
+
+    from convolve.onnx_embeddings import OnnxEmbeddings
+
+
+HF_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+OPENAI_MODEL_NAME = "text-embedding-ada-002"
 
 
 class EmbeddingBackend(Protocol):
@@ -17,38 +33,222 @@ class EmbeddingBackend(Protocol):
 
 
 class EmbeddingService:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        document_cache: DocumentEmbeddingCache | None = None,
+    ) -> None:
         self._settings = settings
+        self._document_cache = document_cache
         self._backend = settings.embedding_backend
         self._hf_backend: HuggingFaceEmbeddings | None = None
+        self._onnx_backend: OnnxEmbeddings | None = None
         self._openai_backend: OpenAIEmbeddings | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+        self._backend_lock = threading.Lock()
+        self._query_cache: LRUCache[tuple[str, str, str], list[float]] = LRUCache(
+            settings.embedding_cache_size,
+            ttl_seconds=settings.embedding_cache_ttl_seconds,
+        )
+        self._batcher: EmbeddingBatcher | None = None
+        if settings.embedding_batching:
+            self._batcher = EmbeddingBatcher(
+                self._run_batch,
+                window_seconds=settings.embedding_batch_window_ms / 1000,
+                max_batch_size=settings.embedding_batch_max_size,
+                max_queue_size=settings.embedding_batch_max_queue,
+                # The worker process runs one batch at a time; in-process batches use the thread pool.
+                concurrency=1 if settings.embedding_batch_process else settings.embedding_workers,
+            )
 
+    @instrumented("embedding")
     def embed_documents(self, texts: Sequence[str]) -> list[list[float]]:
-        return self._get_backend().embed_documents(list(texts))
+        if self._document_cache is None:
+            return self._get_backend().embed_documents(list(texts))
+
+        model_name = self.model_name()
+        keys = [document_cache_key(self._backend, model_name, text) for text in texts]
+        cached = self._document_cache.get_many(keys)
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self._get_backend().embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors, strict=True))
+            self._document_cache.put_many(computed)
+            cached.update(computed)
+        return [cached[key] for key in keys]
 
+    @instrumented("embedding")
     def embed_query(self, text: str) -> list[float]:
-        return self._get_backend().embed_query(text)
+        if not self._query_cache.enabled:
+            return self._get_backend().embed_query(text)
+        key = self._query_key(text)
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            return list(cached)
+        vector = self._get_backend().embed_query(text)
+        self._query_cache.put(key, list(vector))
+        return vector
+
+    def cache_stats(self) -> CacheStats:
+        return self._query_cache.stats()
+
+    def batcher_stats(self) -> EmbeddingBatcherStats | None:
+        return self._batcher.stats() if self._batcher is not None else None
+
+    def model_name(self) -> str:
+        if self._backend == "openai":
+            return OPENAI_MODEL_NAME
+        if self._backend == "onnx" and self._settings.onnx_quantized:
+            return f"{HF_MODEL_NAME}:int8"
+        return HF_MODEL_NAME
+
+    @instrumented("embedding")
+    async def aembed_documents(self, texts: Sequence[str]) -> list[list[float]]:
+        if self._batcher is not None and self._document_cache is None:
+            return await self._batcher.embed_many(list(texts))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.embed_documents, list(texts))
+
+    @instrumented("embedding")
+    async def aembed_query(self, text: str) -> list[float]:
+        if self._batcher is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), self.embed_query, text)
+        # Concurrent requests share one forward pass instead of each running the model at batch size 1.
+        if not self._query_cache.enabled:
+            return await self._batcher.embed(text)
+        key = self._query_key(text)
+        cached = self._query_cache.get(key)
+        if cached is not None:
+            return list(cached)
+        vector = await self._batcher.embed(text)
+        self._query_cache.put(key, list(vector))
+        return vector
+
+    def warm_up(self) -> int:
+        # Loads the backend and runs one inference outside the query cache, so the first
+        # request pays neither the model load nor lazy graph initialisation.
+        return len(self._get_backend().embed_query("warm up"))
+
+    async def awarm_up(self) -> int:
+        if self._batcher is not None:
+            # Through the batcher, so a dedicated worker process loads the model too.
+            return len(await self._batcher.embed("warm up"))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.warm_up)
+
+    async def aclose(self) -> None:
+        if self._batcher is not None:
+            await self._batcher.stop()
+        self.close()
+
+    def close(self) -> None:
+        if self._document_cache is not None:
+            self._document_cache.close()
+            self._document_cache = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True, cancel_futures=True)
+            self._process_pool = None
 
     def embedding_dimension(self) -> int:
         return len(self.embed_query("dimension"))
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(self._settings.embedding_workers, 1),
+                thread_name_prefix="embedding",
+            )
+        return self._executor
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            # Spawned rather than forked, so the child starts without the parent's threads. With a
+            # single in-flight batch the worker's ONNX pool can use every core.
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_start_worker,
+                initargs=(replace(self._settings, embedding_batching=False, embedding_workers=1),),
+            )
+        return self._process_pool
+
+    async def _run_batch(self, texts: list[str]) -> list[list[float]]:
+        loop = asyncio.get_running_loop()
+        if self._settings.embedding_batch_process:
+            return await loop.run_in_executor(self._get_process_pool(), _embed_in_worker, texts)
+        return await loop.run_in_executor(self._get_executor(), self._embed_batch, texts)
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return self._get_backend().embed_documents(texts)
+
+    def _query_key(self, text: str) -> tuple[str, str, str]:
+        return (self._backend, self.model_name(), normalize_query(text))
+
     def _get_backend(self) -> EmbeddingBackend:
-        if self._backend == "openai":
-            return self._openai_embeddings()
-        return self._hf_embeddings()
+        with self._backend_lock:
+            if self._backend == "openai":
+                return self._openai_embeddings()
+            if self._backend == "onnx":
+                return self._onnx_embeddings()
+            return self._hf_embeddings()
 
     def _hf_embeddings(self) -> HuggingFaceEmbeddings:
         if self._hf_backend is None:
+            # Backends are imported on first use: this one pulls in PyTorch, the OpenAI one
+            # langchain and the OpenAI SDK.
+            from langchain_huggingface import HuggingFaceEmbeddings
+
             self._hf_backend = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
+                model_name=HF_MODEL_NAME
             )
         return self._hf_backend
 
+    def _onnx_embeddings(self) -> OnnxEmbeddings:
+        if self._onnx_backend is None:
+            from convolve.onnx_embeddings import OnnxEmbeddings, onnx_threads
+
+            self._onnx_backend = OnnxEmbeddings(
+                self._settings.onnx_model_dir,
+                quantized=self._settings.onnx_quantized,
+                threads=onnx_threads(self._settings.onnx_threads, self._settings.embedding_workers),
+            )
+        return self._onnx_backend
+
     def _openai_embeddings(self) -> OpenAIEmbeddings:
         if not self._settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY is required for OpenAI embeddings")
         if self._openai_backend is None:
+            from langchain_openai import OpenAIEmbeddings
+
             self._openai_backend = OpenAIEmbeddings(
-                openai_api_key=self._settings.openai_api_key
+                model=OPENAI_MODEL_NAME,
+                openai_api_key=self._settings.openai_api_key,
             )
-        return self._openai_backend
\ No newline at end of file
+        return self._openai_backend
+
+
+_WORKER_EMBEDDER: EmbeddingService | None = None
+
+
+def _start_worker(settings: Settings) -> None:
+    global _WORKER_EMBEDDER
+    _WORKER_EMBEDDER = EmbeddingService(settings)
+    _WORKER_EMBEDDER.warm_up()
+
+
+def _embed_in_worker(texts: list[str]) -> list[list[float]]:
+    if _WORKER_EMBEDDER is None:
+        raise RuntimeError("embedding worker process was not initialised")
+    return _WORKER_EMBEDDER._embed_batch(texts)
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.split()).lower()
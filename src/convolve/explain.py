@@ -4,44 +4,50 @@ from typing import Any
 
 from qdrant_client.http import models as qdrant_models
 
+from convolve.eligibility_rules import SchemeEvaluation, evaluate_payload
 from convolve.schemas import EligibilitySignals
 
 
-def explain_match(signals: EligibilitySignals, result: qdrant_models.ScoredPoint) -> dict[str, Any]:
+def explain_match(
+    signals: EligibilitySignals,
+    result: qdrant_models.ScoredPoint,
+    evaluation: SchemeEvaluation | None = None,
+) -> dict[str, Any]:
     payload = result.payload or {}
-    rules = payload.get("eligibility_rules", {})
-    explanation = {
+    if evaluation is None:
+        evaluation = evaluate_payload(signals, str(result.id), payload)
+    return {
         "scheme_id": payload.get("scheme_id"),
         "scheme_name": payload.get("scheme_name", "Unknown"),
         "benefits": payload.get("benefits", ""),
         "score": result.score,
-        "matched_filters": {},
+        "eligible": evaluation.eligible,
+        "failed_rules": evaluation.failed,
+        "unknown_rules": evaluation.unknown,
+        "matched_filters": matched_filters(evaluation),
         "notes": signals.notes,
         "point_id": str(result.id),
     }
 
-    if signals.housing_type != "unknown":
-        explanation["matched_filters"]["housing"] = {
-            "signal": signals.housing_type,
-            "rule": rules.get("housing"),
-        }
-
-    if signals.state:
-        explanation["matched_filters"]["state"] = {
-            "signal": signals.state,
-            "rule": payload.get("states"),
-        }
-
-    if signals.caste:
-        explanation["matched_filters"]["caste"] = {
-            "signal": signals.caste,
-            "rule": rules.get("caste"),
-        }
-
-    if signals.land_acres is not None:
-        explanation["matched_filters"]["land_acres"] = {
-            "signal": signals.land_acres,
-            "rule": rules.get("land_max_acres"),
-        }
-
-    return explanation
\ No newline at end of file
+
+def explain_near_miss(evaluation: SchemeEvaluation) -> dict[str, Any]:
+    payload = evaluation.payload
+    (failed_rule,) = evaluation.failed
+    return {
+        "scheme_id": payload.get("scheme_id"),
+        "scheme_name": payload.get("scheme_name", "Unknown"),
+        "benefits": payload.get("benefits", ""),
+        "failed_rule": failed_rule,
+        # Relative overshoot of a numeric limit, e.g. 0.05 for an income 5% above it.
+        "gap": round(evaluation.gap, 4) if evaluation.gap is not None else None,
+        "unknown_rules": evaluation.unknown,
+        "matched_filters": matched_filters(evaluation),
+        "point_id": evaluation.point_id,
+    }
+
+
+def matched_filters(evaluation: SchemeEvaluation) -> dict[str, dict[str, Any]]:
+    return {
+        name: {"signal": outcome.signal, "rule": outcome.rule, "status": outcome.status}
+        for name, outcome in evaluation.rules.items()
+    }
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from io import BytesIO
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+
+class InvalidImageError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    data: bytes
+    mime_type: str
+    perceptual_hash: str
+    width: int
+    height: int
+    original_bytes: int
+
+
+def prepare_image(
+    image_bytes: bytes,
+    max_edge: int = 1024,
+    quality: int = 80,
+    image_format: str = "JPEG",
+) -> PreparedImage:
+    # Pillow is only needed once a photo arrives, so API workers without vision never load it.
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    image_format = image_format.upper()
+    if image_format not in MIME_TYPES:
+        raise ValueError(f"Unsupported vision image format: {image_format}")
+
+    try:
+        with Image.open(BytesIO(image_bytes)) as source:
+            # Apply the EXIF orientation before dropping the metadata on re-encode.
+            image = ImageOps.exif_transpose(source)
+            image = image.convert("RGB")
+    except (UnidentifiedImageError, OSError) as exc:
+        raise InvalidImageError("Image could not be decoded") from exc
+    if max(image.size) > max_edge:
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=quality, optimize=True)
+    return PreparedImage(
+        data=buffer.getvalue(),
+        mime_type=MIME_TYPES[image_format],
+        perceptual_hash=difference_hash(image),
+        width=image.width,
+        height=image.height,
+        original_bytes=len(image_bytes),
+    )
+
+
+def difference_hash(image: Image.Image, hash_size: int = 8) -> str:
+    from PIL import Image
+
+    pixels = list(
+        image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS).getdata()
+    )
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            bits = (bits << 1) | int(pixels[offset + column] > pixels[offset + column + 1])
+    return f"{bits:0{hash_size * hash_size // 4}x}"
@@ -1,24 +1,115 @@
 from __future__ import annotations
 
+import argparse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+import hashlib
+from itertools import islice
 import json
 from pathlib import Path
+from time import perf_counter
+from typing import Iterator, Literal, TextIO
+from uuid import uuid4
 
-from qdrant_client import QdrantClient
-
-from convolve.config import Settings, load_settings, require_qdrant_settings
-from convolve.embeddings import EmbeddingService
-from convolve.qdrant_client import QdrantService, VectorConfig
+from convolve.config import Settings, load_settings
+from convolve.qdrant_client import QdrantCollections, VectorConfig, scheme_content_hash
 from convolve.schemas import Scheme
-from convolve.sparse import SparseEncoder, combine_texts
+from convolve.services import ServiceContainer, build_services
+from convolve.sparse import combine_texts
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SEED_PATH = PROJECT_ROOT / "data" / "schemes_seed.json"
+CHECKPOINT_PATH = PROJECT_ROOT / ".cache" / "ingest_checkpoint.json"
+READ_CHUNK_SIZE = 1 << 16
+
+IngestMode = Literal["delta", "rebuild"]
+
+
+@dataclass(frozen=True)
+class IngestCheckpoint:
+    source: str
+    batch_size: int
+    completed_batches: int
+    points: int
+    collection: str = ""
 
 
-SEED_PATH = Path(__file__).resolve().parents[2] / "data" / "schemes_seed.json"
+@dataclass(frozen=True)
+class IngestReport:
+    mode: str
+    batches: int
+    points: int
+    unchanged: int
+    deleted: int
+    skipped_points: int
+    elapsed_seconds: float
+
+    @property
+    def points_per_second(self) -> float:
+        return self.points / self.elapsed_seconds if self.elapsed_seconds else 0.0
 
 
 def load_seed_schemes() -> list[Scheme]:
-    with SEED_PATH.open("r", encoding="utf-8") as handle:
-        raw_items = json.load(handle)
-    return [Scheme(**item) for item in raw_items]
+    return list(iter_schemes(SEED_PATH))
+
+
+def iter_schemes(path: Path) -> Iterator[Scheme]:
+    for item in iter_raw_items(path):
+        yield Scheme(**item)
+
+
+def iter_raw_items(path: Path) -> Iterator[dict[str, object]]:
+    with path.open("r", encoding="utf-8") as handle:
+        if path.suffix == ".jsonl":
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        yield from _iter_json_array(handle)
+
+
+def _iter_json_array(handle: TextIO) -> Iterator[dict[str, object]]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    exhausted = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position >= len(buffer) and not exhausted:
+            chunk = handle.read(READ_CHUNK_SIZE)
+            exhausted = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        if not started:
+            if buffer[position : position + 1] != "[":
+                raise ValueError("Scheme catalog must be a JSON array or a .jsonl file")
+            started = True
+            position += 1
+            continue
+        if position >= len(buffer) or buffer[position] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+            chunk = handle.read(READ_CHUNK_SIZE)
+            exhausted = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        yield item
+        position = end
+
+
+def iter_batches(schemes: Iterator[Scheme], batch_size: int) -> Iterator[list[Scheme]]:
+    while batch := list(islice(schemes, batch_size)):
+        yield batch
 
 
 def build_sparse_text(scheme: Scheme) -> str:
@@ -32,31 +123,238 @@ def build_sparse_text(scheme: Scheme) -> str:
     )
 
 
-def ingest_schemes(settings: Settings) -> None:
-    require_qdrant_settings(settings)
-    client = QdrantClient(
-        url=settings.qdrant_url,
-        api_key=settings.qdrant_api_key,
-        timeout=60,
-    )
-    embedder = EmbeddingService(settings)
-    sparse_encoder = SparseEncoder()
-    service = QdrantService(client)
-
-    schemes = load_seed_schemes()
-    descriptions = [scheme.description for scheme in schemes]
-    dense_vectors = embedder.embed_documents(descriptions)
-    sparse_texts = [build_sparse_text(scheme) for scheme in schemes]
-    sparse_vectors = sparse_encoder.encode_batch(sparse_texts)
-
-    vector_size = len(dense_vectors[0])
-    service.recreate_schemes_collection(VectorConfig(size=vector_size))
+def ingest_schemes(
+    settings: Settings,
+    source: Path = SEED_PATH,
+    batch_size: int = 256,
+    upload_parallel: int = 2,
+    checkpoint_path: Path | None = CHECKPOINT_PATH,
+    restart: bool = False,
+    mode: IngestMode = "delta",
+) -> IngestReport:
+    services = build_services(settings, timeout=60, document_cache=True)
+    try:
+        return _ingest(
+            services,
+            source=source,
+            batch_size=batch_size,
+            upload_parallel=upload_parallel,
+            checkpoint_path=checkpoint_path,
+            restart=restart,
+            mode=mode,
+        )
+    finally:
+        services.close()
+
+
+def _ingest(
+    services: ServiceContainer,
+    source: Path = SEED_PATH,
+    batch_size: int = 256,
+    upload_parallel: int = 2,
+    checkpoint_path: Path | None = None,
+    restart: bool = False,
+    mode: IngestMode = "delta",
+) -> IngestReport:
+    embedder = services.embedder
+    sparse_encoder = services.sparse_encoder
+    service = services.qdrant
+    embedding_model = f"{services.settings.embedding_backend}:{embedder.model_name()}"
+
+    if mode == "delta" and not service.schemes_collection_exists():
+        mode = "rebuild"
+
+    checkpoint = None
+    existing_hashes: dict[str, str | None] = {}
+    target_collection: str | None = None
+    if mode == "delta":
+        checkpoint_path = None
+        existing_hashes = service.scheme_content_hashes()
+    else:
+        if not restart:
+            checkpoint = read_checkpoint(checkpoint_path, source, batch_size)
+        if checkpoint is not None and not service.collection_exists(checkpoint.collection):
+            checkpoint = None
+        target_collection = checkpoint.collection if checkpoint else versioned_collection_name()
+
+    completed_batches = checkpoint.completed_batches if checkpoint else 0
+    points_done = checkpoint.points if checkpoint else 0
+    skipped_points = points_done
+    collection_ready = mode == "delta" or checkpoint is not None
+    vector_size: int | None = None
+
+    catalog_hashes: dict[str, str] = {}
+    batches = iter_batches(iter_schemes(source), batch_size)
+    for uploaded_batch in islice(batches, completed_batches):
+        catalog_hashes.update(
+            (scheme.scheme_id, scheme_content_hash(scheme, embedding_model)) for scheme in uploaded_batch
+        )
+
+    started = perf_counter()
+    points_uploaded = 0
+    unchanged = 0
+    finished: dict[int, int] = {}
+    in_flight: dict[Future[None], tuple[int, int]] = {}
+
+    def settle(done: set[Future[None]]) -> None:
+        nonlocal completed_batches, points_done, points_uploaded
+        for future in done:
+            batch_number, batch_points = in_flight.pop(future)
+            future.result()
+            finished[batch_number] = batch_points
+        while completed_batches in finished:
+            batch_points = finished.pop(completed_batches)
+            completed_batches += 1
+            points_done += batch_points
+            points_uploaded += batch_points
+            write_checkpoint(
+                checkpoint_path,
+                IngestCheckpoint(
+                    str(source), batch_size, completed_batches, points_done, target_collection or ""
+                ),
+            )
+            elapsed = perf_counter() - started
+            rate = points_uploaded / elapsed if elapsed else 0.0
+            print(f"batch {completed_batches}: {points_done} points total, {rate:,.1f} points/s")
+
+    with ThreadPoolExecutor(max_workers=max(upload_parallel, 1), thread_name_prefix="ingest") as pool:
+        for batch_number, batch in enumerate(batches, start=completed_batches):
+            hashes = [scheme_content_hash(scheme, embedding_model) for scheme in batch]
+            catalog_hashes.update(
+                (scheme.scheme_id, content_hash) for scheme, content_hash in zip(batch, hashes, strict=True)
+            )
+            changed = [
+                (scheme, content_hash)
+                for scheme, content_hash in zip(batch, hashes, strict=True)
+                if existing_hashes.get(scheme.scheme_id) != content_hash
+            ]
+            unchanged += len(batch) - len(changed)
+            if not changed:
+                finished[batch_number] = 0
+                settle(set())
+                continue
+
+            schemes = [scheme for scheme, _ in changed]
+            dense_vectors = embedder.embed_documents([scheme.description for scheme in schemes])
+            sparse_vectors = sparse_encoder.encode_batch(build_sparse_text(scheme) for scheme in schemes)
+            vector_size = len(dense_vectors[0])
+
+            if not collection_ready and target_collection is not None:
+                service.create_scheme_collection(target_collection, VectorConfig(size=vector_size))
+                collection_ready = True
+
+            while len(in_flight) >= max(upload_parallel, 1):
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                settle(done)
+            future = pool.submit(
+                service.upload_schemes,
+                schemes,
+                dense_vectors,
+                sparse_vectors,
+                content_hashes=[content_hash for _, content_hash in changed],
+                collection_name=target_collection,
+            )
+            in_flight[future] = (batch_number, len(schemes))
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            settle(done)
+
+    deleted = 0
+    if mode == "delta":
+        removed = set(existing_hashes) - set(catalog_hashes)
+        service.delete_schemes(sorted(removed))
+        deleted = len(removed)
+    else:
+        if not collection_ready or target_collection is None:
+            raise ValueError(f"No schemes found in {source}")
+        previous = service.swap_schemes_alias(target_collection)
+        if previous is not None and previous != target_collection:
+            service.delete_collection(previous)
+
+    service.write_catalog_version(catalog_version(catalog_hashes), len(catalog_hashes))
+
+    memory_size = vector_size or embedder.embedding_dimension()
     service.create_collections(
-        scheme_vector=VectorConfig(size=vector_size),
-        memory_vector=VectorConfig(size=vector_size),
+        scheme_vector=VectorConfig(size=memory_size),
+        memory_vector=VectorConfig(size=memory_size),
+    )
+
+    if checkpoint_path is not None and checkpoint_path.exists():
+        checkpoint_path.unlink()
+
+    report = IngestReport(
+        mode=mode,
+        batches=completed_batches,
+        points=points_uploaded,
+        unchanged=unchanged,
+        deleted=deleted,
+        skipped_points=skipped_points,
+        elapsed_seconds=round(perf_counter() - started, 3),
+    )
+    print(
+        f"{report.mode}: ingested {report.points} points in {report.elapsed_seconds}s "
+        f"({report.points_per_second:,.1f} points/s), {report.unchanged} unchanged, "
+        f"{report.deleted} deleted, {report.skipped_points} resumed from checkpoint"
+    )
+    return report
+
+
+def catalog_version(content_hashes: dict[str, str]) -> str:
+    digest = hashlib.sha256()
+    for scheme_id in sorted(content_hashes):
+        digest.update(f"{scheme_id}\0{content_hashes[scheme_id]}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def versioned_collection_name() -> str:
+    # The random suffix keeps two rebuilds started in the same second (a retried CI job, two
+    # operators) from colliding; the timestamp prefix still sorts versions chronologically.
+    return f"{QdrantCollections().schemes}_{datetime.now(timezone.utc):%Y%m%d%H%M%S}_{uuid4().hex[:8]}"
+
+
+def read_checkpoint(path: Path | None, source: Path, batch_size: int) -> IngestCheckpoint | None:
+    if path is None or not path.exists():
+        return None
+    checkpoint = IngestCheckpoint(**json.loads(path.read_text(encoding="utf-8")))
+    if checkpoint.source != str(source) or checkpoint.batch_size != batch_size:
+        return None
+    return checkpoint
+
+
+def write_checkpoint(path: Path | None, checkpoint: IngestCheckpoint) -> None:
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(".tmp")
+    temporary.write_text(json.dumps(asdict(checkpoint)), encoding="utf-8")
+    temporary.replace(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest the scheme catalog into Qdrant.")
+    parser.add_argument("--source", type=Path, default=SEED_PATH, help="JSON array or JSONL catalog")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--upload-parallel", type=int, default=2)
+    parser.add_argument("--checkpoint", type=Path, default=CHECKPOINT_PATH)
+    parser.add_argument("--restart", action="store_true", help="ignore any existing checkpoint")
+    parser.add_argument(
+        "--mode",
+        choices=["delta", "rebuild"],
+        default="delta",
+        help="delta upserts changed schemes in place; rebuild builds a new collection and swaps the alias",
+    )
+    args = parser.parse_args()
+    ingest_schemes(
+        load_settings(),
+        source=args.source,
+        batch_size=args.batch_size,
+        upload_parallel=args.upload_parallel,
+        checkpoint_path=args.checkpoint,
+        restart=args.restart,
+        mode=args.mode,
     )
-    service.upsert_schemes(schemes, dense_vectors, sparse_vectors)
 
 
 if __name__ == "__main__":
-    ingest_schemes(load_settings())
\ No newline at end of file
+    main()
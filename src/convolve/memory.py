@@ -1,61 +1,220 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
+import math
+from typing import Any, Literal, Sequence
 
+import numpy as np
 from qdrant_client.http import models as qdrant_models
+from qdrant_client.http.exceptions import UnexpectedResponse
 
 from convolve.embeddings import EmbeddingService
-from convolve.qdrant_client import QdrantService
+from convolve.memory_writer import CaseMemoryWriter
+from convolve.metrics import instrumented
+from convolve.qdrant_client import (
+    FORMULA_QUERIES,
+    RECENCY_PAYLOAD,
+    AsyncQdrantService,
+    QdrantService,
+    RecencyDecay,
+)
 from convolve.schemas import CaseMemory
 
 
-class MemoryService:
-    def __init__(self, qdrant: QdrantService, embedder: EmbeddingService) -> None:
-        self._qdrant = qdrant
-        self._embedder = embedder
+RecallScoring = Literal["server", "client"]
 
-    def save_case(self, memory: CaseMemory) -> str:
-        vector = self._embedder.embed_query(memory.summary_text())
-        return self._qdrant.upsert_case_memory(memory, vector)
 
-    def update_case(self, case_id: str, updates: dict[str, object]) -> None:
-        if updates:
-            self._qdrant.update_case_memory(case_id, updates)
+@dataclass(frozen=True)
+class RecallPolicy:
+    candidates: int = 50
+    half_life_days: float = 1.0
+    recency_weight: float = 1.0
+    scoring: RecallScoring = "server"
+    statuses: tuple[str, ...] = ()
+
+
+class _MemoryRanking:
+    _policy: RecallPolicy
+
+    def _recall_options(self, limit: int, statuses: Sequence[str] | None) -> dict[str, Any]:
+        policy = self._policy
+        statuses = tuple(statuses) if statuses is not None else policy.statuses
+        if policy.recency_weight <= 0:
+            return {"statuses": statuses}
+        options: dict[str, Any] = {"candidates": max(policy.candidates, limit), "statuses": statuses}
+        if self._server_scoring():
+            options["recency"] = RecencyDecay(policy.half_life_days * 86_400, policy.recency_weight)
+        elif self._client_scoring():
+            # Only `limit` of the over-fetched pool survive reranking, so the pool carries just the
+            # timestamp and the survivors' payloads are fetched afterwards.
+            options["payload"] = RECENCY_PAYLOAD
+        return options
 
-    def recall_cases(self, query_text: str, limit: int = 3) -> list[qdrant_models.ScoredPoint]:
-        vector = self._embedder.embed_query(query_text)
-        memories = self._qdrant.search_case_memory(vector, limit=limit)
-        return self._rank_memories(memories)
+    def _server_scoring(self) -> bool:
+        return self._policy.scoring == "server" and FORMULA_QUERIES and self._policy.recency_weight > 0
+
+    def _client_scoring(self) -> bool:
+        return not self._server_scoring() and self._policy.recency_weight > 0
+
+    def _with_payloads(
+        self, memories: list[qdrant_models.ScoredPoint], payloads: dict[str, dict[str, Any]]
+    ) -> list[qdrant_models.ScoredPoint]:
+        return [
+            point.model_copy(update={"payload": payloads.get(str(point.id), point.payload)}) for point in memories
+        ]
 
     def _rank_memories(
-        self, memories: list[qdrant_models.ScoredPoint]
+        self, memories: list[qdrant_models.ScoredPoint], limit: int
     ) -> list[qdrant_models.ScoredPoint]:
-        now = datetime.now(timezone.utc)
-
-        def sort_key(point: qdrant_models.ScoredPoint) -> tuple[float, float]:
-            payload = point.payload or {}
-            updated_at = payload.get("updated_at")
-            recency_boost = self._recency_boost(updated_at, now)
-            base_score = float(point.score or 0.0)
-            return (base_score + recency_boost, recency_boost)
-
-        return sorted(memories, key=sort_key, reverse=True)
-
-    def _recency_boost(self, value: object, now: datetime) -> float:
-        timestamp = self._parse_timestamp(value)
-        if not timestamp:
-            return 0.0
-        age_seconds = (now - timestamp).total_seconds()
-        age_days = max(age_seconds / 86_400, 0.0)
-        return 1.0 / (1.0 + age_days)
-
-    def _parse_timestamp(self, value: object) -> datetime | None:
+        if self._server_scoring() or self._policy.recency_weight <= 0 or not memories:
+            return memories[:limit]
+        # Same exponential decay as the server-side formula: the boost halves every half-life.
+        now = datetime.now(timezone.utc).timestamp()
+        scores = np.fromiter((point.score or 0.0 for point in memories), dtype=np.float64, count=len(memories))
+        updated = np.fromiter(
+            (self._timestamp((point.payload or {}).get("updated_at")) for point in memories),
+            dtype=np.float64,
+            count=len(memories),
+        )
+        half_life = self._policy.half_life_days * 86_400
+        boost = np.nan_to_num(self._policy.recency_weight * np.exp2(-np.abs(now - updated) / half_life))
+        combined = scores + boost
+        order = np.argsort(-combined, kind="stable")[:limit]
+        return [memories[index].model_copy(update={"score": float(combined[index])}) for index in order]
+
+    def _timestamp(self, value: object) -> float:
         if not isinstance(value, str):
-            return None
+            return math.nan
         try:
             parsed = datetime.fromisoformat(value)
         except ValueError:
-            return None
+            return math.nan
         if parsed.tzinfo is None:
-            return parsed.replace(tzinfo=timezone.utc)
-        return parsed
\ No newline at end of file
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
+class MemoryService(_MemoryRanking):
+    def __init__(
+        self,
+        qdrant: QdrantService,
+        embedder: EmbeddingService,
+        recall: RecallPolicy | None = None,
+    ) -> None:
+        self._qdrant = qdrant
+        self._embedder = embedder
+        self._policy = recall or RecallPolicy()
+
+    @instrumented("memory")
+    def save_case(self, memory: CaseMemory, vector: list[float] | None = None) -> str:
+        if vector is None:
+            vector = self._embedder.embed_query(memory.summary_text())
+        return self._qdrant.upsert_case_memory(memory, vector)
+
+    @instrumented("memory")
+    def update_case(self, case_id: str, updates: dict[str, object]) -> None:
+        if updates:
+            self._qdrant.update_case_memory(case_id, updates)
+
+    @instrumented("memory")
+    def recall_cases(
+        self,
+        query_text: str,
+        limit: int = 3,
+        query_vector: list[float] | None = None,
+        statuses: Sequence[str] | None = None,
+        state: str | None = None,
+    ) -> list[qdrant_models.ScoredPoint]:
+        vector = query_vector if query_vector is not None else self._embedder.embed_query(query_text)
+        memories = self._qdrant.search_case_memory(
+            vector, limit=limit, state=state, **self._recall_options(limit, statuses)
+        )
+        ranked = self._rank_memories(memories, limit)
+        if not self._client_scoring():
+            return ranked
+        return self._with_payloads(ranked, self._qdrant.case_memory_payloads([str(point.id) for point in ranked]))
+
+
+class AsyncMemoryService(_MemoryRanking):
+    def __init__(
+        self,
+        qdrant: AsyncQdrantService,
+        embedder: EmbeddingService,
+        writer: CaseMemoryWriter | None = None,
+        recall: RecallPolicy | None = None,
+    ) -> None:
+        self._qdrant = qdrant
+        self._embedder = embedder
+        self._writer = writer
+        self._policy = recall or RecallPolicy()
+
+    @instrumented("memory")
+    async def save_case(self, memory: CaseMemory, vector: list[float] | None = None) -> str:
+        if vector is None:
+            vector = await self._embedder.aembed_query(memory.summary_text())
+        if self._writer is not None:
+            return await self._writer.enqueue(memory, vector)
+        return await self._qdrant.upsert_case_memory(memory, vector)
+
+    @instrumented("memory")
+    async def update_case(self, case_id: str, updates: dict[str, object]) -> None:
+        if updates:
+            if self._writer is not None:
+                await self._writer.wait_for(case_id)
+            try:
+                await self._qdrant.update_case_memory(case_id, updates)
+            except (UnexpectedResponse, KeyError) as exc:
+                # Compaction may have merged this draft into another case; follow it there.
+                # Local-mode Qdrant reports a missing point as KeyError instead of a 404.
+                if isinstance(exc, UnexpectedResponse) and exc.status_code != 404:
+                    raise
+                survivor = await self._qdrant.find_merged_case(case_id)
+                if survivor is None:
+                    raise
+                await self._qdrant.update_case_memory(survivor, updates)
+
+    @instrumented("memory")
+    async def recall_cases(
+        self,
+        query_text: str,
+        limit: int = 3,
+        query_vector: list[float] | None = None,
+        statuses: Sequence[str] | None = None,
+        state: str | None = None,
+    ) -> list[qdrant_models.ScoredPoint]:
+        if query_vector is None:
+            query_vector = await self._embedder.aembed_query(query_text)
+        memories = await self._qdrant.search_case_memory(
+            query_vector, limit=limit, state=state, **self._recall_options(limit, statuses)
+        )
+        ranked = self._rank_memories(memories, limit)
+        if not self._client_scoring():
+            return ranked
+        payloads = await self._qdrant.case_memory_payloads([str(point.id) for point in ranked])
+        return self._with_payloads(ranked, payloads)
+
+    @instrumented("memory")
+    async def save_cases(self, memories: list[CaseMemory], vectors: list[list[float]]) -> list[str]:
+        if self._writer is not None:
+            return await self._writer.enqueue_many(memories, vectors)
+        return await self._qdrant.upsert_case_memories(memories, vectors)
+
+    @instrumented("memory")
+    async def recall_cases_batch(
+        self,
+        vectors: list[list[float]],
+        limit: int = 3,
+        statuses: Sequence[str] | None = None,
+        states: list[str | None] | None = None,
+    ) -> list[list[qdrant_models.ScoredPoint]]:
+        batches = await self._qdrant.search_case_memory_batch(
+            vectors, limit=limit, states=states, **self._recall_options(limit, statuses)
+        )
+        ranked = [self._rank_memories(memories, limit) for memories in batches]
+        if not self._client_scoring():
+            return ranked
+        # One retrieve hydrates the survivors of every query in the batch.
+        point_ids = list(dict.fromkeys(str(point.id) for memories in ranked for point in memories))
+        payloads = await self._qdrant.case_memory_payloads(point_ids)
+        return [self._with_payloads(memories, payloads) for memories in ranked]
\ No newline at end of file
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from time import perf_counter
+import uuid
+
+from convolve.qdrant_client import AsyncQdrantService
+from convolve.schemas import CaseMemory
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MemoryWriterStats:
+    queue_depth: int
+    pending: int
+    written: int
+    batches: int
+    retries: int
+    dropped: int
+    last_flush_ms: float
+    avg_flush_ms: float
+
+
+class CaseMemoryWriter:
+    def __init__(
+        self,
+        qdrant: AsyncQdrantService,
+        batch_size: int = 64,
+        flush_interval_seconds: float = 0.25,
+        max_queue_size: int = 10_000,
+        max_retries: int = 5,
+        retry_backoff_seconds: float = 0.5,
+    ) -> None:
+        self._qdrant = qdrant
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = max(flush_interval_seconds, 0.0)
+        self._max_retries = max(max_retries, 0)
+        self._retry_backoff = retry_backoff_seconds
+        self._queue: asyncio.Queue[tuple[CaseMemory, list[float]] | None] = asyncio.Queue(
+            maxsize=max_queue_size
+        )
+        self._pending: dict[str, asyncio.Event] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+        self._written = 0
+        self._batches = 0
+        self._retries = 0
+        self._dropped = 0
+        self._last_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="case-memory-writer")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def enqueue(self, memory: CaseMemory, vector: list[float]) -> str:
+        if self._task is None or self._stopping:
+            raise RuntimeError("CaseMemoryWriter is not running")
+        if memory.case_id is None:
+            memory = memory.model_copy(update={"case_id": str(uuid.uuid4())})
+        case_id = str(memory.case_id)
+        self._pending[case_id] = asyncio.Event()
+        await self._queue.put((memory, vector))
+        return case_id
+
+    async def enqueue_many(self, memories: list[CaseMemory], vectors: list[list[float]]) -> list[str]:
+        return [
+            await self.enqueue(memory, vector)
+            for memory, vector in zip(memories, vectors, strict=True)
+        ]
+
+    async def wait_for(self, case_id: str) -> None:
+        event = self._pending.get(case_id)
+        if event is not None:
+            await event.wait()
+
+    def stats(self) -> MemoryWriterStats:
+        return MemoryWriterStats(
+            queue_depth=self._queue.qsize(),
+            pending=len(self._pending),
+            written=self._written,
+            batches=self._batches,
+            retries=self._retries,
+            dropped=self._dropped,
+            last_flush_ms=round(self._last_flush_ms, 2),
+            avg_flush_ms=round(self._total_flush_ms / self._batches, 2) if self._batches else 0.0,
+        )
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout > 0:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    else:
+                        item = self._queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+        remaining = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                remaining.append(item)
+        for start in range(0, len(remaining), self._batch_size):
+            await self._flush(remaining[start : start + self._batch_size])
+
+    async def _flush(self, batch: list[tuple[CaseMemory, list[float]]]) -> None:
+        memories = [memory for memory, _ in batch]
+        vectors = [vector for _, vector in batch]
+        started = perf_counter()
+        try:
+            for attempt in range(self._max_retries + 1):
+                try:
+                    await self._qdrant.upsert_case_memories(memories, vectors, wait=False)
+                except Exception:
+                    if attempt == self._max_retries:
+                        self._dropped += len(batch)
+                        logger.exception("Dropping %d case memories after %d attempts", len(batch), attempt + 1)
+                        return
+                    self._retries += 1
+                    await asyncio.sleep(self._retry_backoff * (2**attempt))
+                else:
+                    self._written += len(batch)
+                    return
+        finally:
+            self._batches += 1
+            self._last_flush_ms = (perf_counter() - started) * 1000
+            self._total_flush_ms += self._last_flush_ms
+            for memory in memories:
+                event = self._pending.pop(str(memory.case_id), None)
+                if event is not None:
+                    event.set()
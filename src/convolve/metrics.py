@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+import inspect
+import threading
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Iterable, Iterator, MutableMapping, TypeVar, cast
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+Labels = tuple[tuple[str, str], ...]
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_SECONDS = "convolve_stage_duration_seconds"
+OPERATION_SECONDS = "convolve_operation_duration_seconds"
+OPERATION_ERRORS = "convolve_operation_errors_total"
+HTTP_SECONDS = "convolve_http_request_duration_seconds"
+HTTP_REQUESTS = "convolve_http_requests_total"
+
+_HELP = {
+    STAGE_SECONDS: ("histogram", "Time spent in each retrieval pipeline stage."),
+    OPERATION_SECONDS: ("histogram", "Time spent in embedding, vision, sparse, Qdrant and memory calls."),
+    OPERATION_ERRORS: ("counter", "Embedding, vision, sparse, Qdrant and memory calls that raised."),
+    HTTP_SECONDS: ("histogram", "HTTP request latency until the response starts."),
+    HTTP_REQUESTS: ("counter", "HTTP requests by route and status."),
+}
+
+_request_timings: ContextVar[dict[str, float] | None] = ContextVar("convolve_request_timings", default=None)
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, buckets: tuple[float, ...], value: float) -> None:
+        self.counts[bisect_left(buckets, value)] += 1
+        self.total += value
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.enabled = enabled
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[Labels, _Histogram]] = {}
+        self._counters: dict[str, dict[Labels, float]] = {}
+
+    def observe(self, name: str, labels: Labels, seconds: float) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = _Histogram(self._buckets)
+            histogram.observe(self._buckets, seconds)
+
+    def increment(self, name: str, labels: Labels, amount: float = 1.0) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0.0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.extend(_header(name, *_HELP.get(name, ("histogram", name))))
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip((*self._buckets, float("inf")), histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f"{name}_bucket{_labels((*labels, ('le', le)))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {histogram.total:.6f}")
+                    lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+            for name, counters in sorted(self._counters.items()):
+                lines.extend(_header(name, *_HELP.get(name, ("counter", name))))
+                lines.extend(f"{name}{_labels(labels)} {value:g}" for labels, value in sorted(counters.items()))
+        lines.extend(extra)
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+def metric_family(
+    name: str,
+    kind: str,
+    help_text: str,
+    samples: Iterable[tuple[dict[str, str], float]],
+) -> list[str]:
+    lines = _header(name, kind, help_text)
+    lines.extend(f"{name}{_labels(tuple(labels.items()))} {value:g}" for labels, value in samples)
+    return lines
+
+
+def observe_stage(stage: str, elapsed_ms: float) -> None:
+    if not METRICS.enabled:
+        return
+    METRICS.observe(STAGE_SECONDS, (("stage", stage),), elapsed_ms / 1000)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + elapsed_ms
+
+
+@contextmanager
+def stage_span(stage: str) -> Iterator[None]:
+    if not METRICS.enabled:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, (perf_counter() - started) * 1000)
+
+
+def instrumented(component: str, operation: str | None = None) -> Callable[[F], F]:
+    def decorate(function: F) -> F:
+        labels = (("component", component), ("operation", operation or function.__name__))
+
+        if inspect.iscoroutinefunction(function):
+
+            @wraps(function)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not METRICS.enabled:
+                    return await function(*args, **kwargs)
+                started = perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                except Exception:
+                    METRICS.increment(OPERATION_ERRORS, labels)
+                    raise
+                finally:
+                    METRICS.observe(OPERATION_SECONDS, labels, perf_counter() - started)
+
+            return cast(F, async_wrapper)
+
+        @wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not METRICS.enabled:
+                return function(*args, **kwargs)
+            started = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except Exception:
+                METRICS.increment(OPERATION_ERRORS, labels)
+                raise
+            finally:
+                METRICS.observe(OPERATION_SECONDS, labels, perf_counter() - started)
+
+        return cast(F, wrapper)
+
+    return decorate
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = METRICS) -> None:
+        self._app = app
+        self._registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._registry.enabled:
+            await self._app(scope, receive, send)
+            return
+
+        timings: dict[str, float] = {}
+        token = _request_timings.set(timings)
+        started = perf_counter()
+        status = 500
+
+        async def timing_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                entries = [*timings.items(), ("total", (perf_counter() - started) * 1000)]
+                header = ", ".join(f"{stage};dur={elapsed:.2f}" for stage, elapsed in entries)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode())]}
+            await send(message)
+
+        try:
+            await self._app(scope, receive, timing_send)
+        finally:
+            _request_timings.reset(token)
+            # Route templates keep label cardinality bounded; raw paths would include case ids.
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            labels = (("method", scope.get("method", "")), ("route", route))
+            self._registry.observe(HTTP_SECONDS, labels, perf_counter() - started)
+            self._registry.increment(HTTP_REQUESTS, (*labels, ("status", str(status))))
+
+
+def _header(name: str, kind: str, help_text: str) -> list[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
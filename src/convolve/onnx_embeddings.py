@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+import numpy as np
+
+from convolve.config import DEFAULT_ONNX_MODEL_DIR, load_settings
+from convolve.embeddings import HF_MODEL_NAME
+
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+# all-MiniLM-L6-v2 was trained with 256-token inputs; sentence-transformers truncates there too.
+MAX_SEQUENCE_LENGTH = 256
+ONNX_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+
+
+class OnnxEmbeddings:
+    def __init__(
+        self,
+        model_dir: str | Path = DEFAULT_ONNX_MODEL_DIR,
+        quantized: bool = True,
+        threads: int = 0,
+        batch_size: int = 32,
+    ) -> None:
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_dir)
+        model_path = model_dir / (INT8_FILE if quantized else FP32_FILE)
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"{model_path} not found; run `python scripts/export_onnx_model.py` to export the model"
+            )
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # One session serves every embedding worker thread, so parallelism comes from the
+        # intra-op pool rather than from overlapping runs.
+        options.intra_op_num_threads = max(threads, 0)
+        options.inter_op_num_threads = 1
+        self._session = onnxruntime.InferenceSession(
+            str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {item.name for item in self._session.get_inputs()}
+        self._tokenizer = Tokenizer.from_file(str(model_dir / TOKENIZER_FILE))
+        self._tokenizer.enable_truncation(max_length=MAX_SEQUENCE_LENGTH)
+        self._tokenizer.enable_padding(pad_id=self._tokenizer.token_to_id("[PAD]") or 0, pad_token="[PAD]")
+        self._batch_size = max(batch_size, 1)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        # Sorting by length keeps padding, and therefore wasted attention work, per batch small.
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        stacked = np.concatenate(
+            [
+                self._encode([texts[index] for index in order[start : start + self._batch_size]])
+                for start in range(0, len(texts), self._batch_size)
+            ]
+        )
+        vectors = np.empty_like(stacked)
+        vectors[order] = stacked
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._encode([text])[0].tolist()
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(texts)
+        features = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64),
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64),
+        }
+        feeds = {name: features[name] for name in ONNX_INPUTS if name in self._input_names}
+        hidden = self._session.run(None, feeds)[0]
+        # Mean pooling over real tokens followed by L2 normalization, as in the sentence-transformers model.
+        mask = features["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+
+def onnx_threads(configured: int, workers: int) -> int:
+    if configured > 0:
+        return configured
+    return max((os.cpu_count() or 1) // max(workers, 1), 1)
+
+
+def export_model(output_dir: Path = DEFAULT_ONNX_MODEL_DIR, quantize: bool = True, opset: int = 17) -> dict[str, Any]:
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    started = perf_counter()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(HF_MODEL_NAME)
+    tokenizer.save_pretrained(output_dir)
+    model = AutoModel.from_pretrained(HF_MODEL_NAME).eval()
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    axes = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in ONNX_INPUTS),
+            str(output_dir / FP32_FILE),
+            input_names=list(ONNX_INPUTS),
+            output_names=["last_hidden_state"],
+            dynamic_axes={**{name: axes for name in ONNX_INPUTS}, "last_hidden_state": axes},
+            opset_version=opset,
+        )
+    files = [FP32_FILE, TOKENIZER_FILE]
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        # Dynamic quantization stores int8 weights and quantizes activations per batch at run
+        # time, so no calibration set is needed.
+        quantize_dynamic(str(output_dir / FP32_FILE), str(output_dir / INT8_FILE), weight_type=QuantType.QInt8)
+        files.append(INT8_FILE)
+    manifest = {
+        "model": HF_MODEL_NAME,
+        "opset": opset,
+        "files": {name: (output_dir / name).stat().st_size for name in files},
+        "seconds": round(perf_counter() - started, 1),
+    }
+    (output_dir / "export.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=f"Export {HF_MODEL_NAME} to ONNX for EMBEDDING_BACKEND=onnx.")
+    parser.add_argument("--output", type=Path, help="default ONNX_MODEL_DIR")
+    parser.add_argument("--no-quantize", action="store_true", help="skip the int8 model")
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    output = args.output or Path(load_settings().onnx_model_dir)
+    manifest = export_model(output, quantize=not args.no_quantize, opset=args.opset)
+    for name, size in manifest["files"].items():
+        print(f"{output / name}  {size / 2**20:.1f} MB")
+    print(f"exported in {manifest['seconds']}s")
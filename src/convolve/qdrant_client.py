@@ -1,24 +1,35 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable
+from datetime import datetime, timezone
+import hashlib
+import json
+from typing import Any, Iterable
 import uuid
 
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http import models as qdrant_models
 
-from convolve.schemas import CaseMemory, Scheme
+from convolve.collection_profiles import CollectionProfile, CollectionProfiles
+from convolve.metrics import instrumented
+from convolve.schemas import CaseMemory, Scheme, numeric_limits
 from convolve.sparse import SparseEncoder
 
 
 DENSE_VECTOR_NAME = "dense"
 SPARSE_VECTOR_NAME = "sparse"
+CATALOG_VERSION_POINT_ID = str(uuid.uuid5(uuid.NAMESPACE_DNS, "convolve.catalog_version"))
+# Score formulas need Qdrant and qdrant-client 1.14+; older clients fall back to client-side reranking.
+FORMULA_QUERIES = hasattr(qdrant_models, "FormulaQuery")
+EPOCH = "1970-01-01T00:00:00+00:00"
 
 
 @dataclass(frozen=True)
 class QdrantCollections:
     schemes: str = "gov_schemes"
     memories: str = "case_memory"
+    memory_archive: str = "case_memory_archive"
+    metadata: str = "convolve_metadata"
 
 
 @dataclass(frozen=True)
@@ -27,46 +38,460 @@ class VectorConfig:
     distance: qdrant_models.Distance = qdrant_models.Distance.COSINE
 
 
+@dataclass(frozen=True)
+class PayloadFields:
+    include: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = ()
+
+    def selector(self) -> bool | qdrant_models.PayloadSelector:
+        if self.include:
+            return qdrant_models.PayloadSelectorInclude(include=list(self.include))
+        if self.exclude:
+            return qdrant_models.PayloadSelectorExclude(exclude=list(self.exclude))
+        return True
+
+    def project(self, payload: dict[str, Any]) -> dict[str, Any]:
+        # The selector applied to a payload held in process, such as the catalog replica's, so hits
+        # look the same whichever side served them. The stored payload is never mutated.
+        if self.include:
+            projected: dict[str, Any] = {}
+            for path in self.include:
+                _copy_path(payload, projected, path.split("."))
+            return projected
+        if self.exclude:
+            projected = dict(payload)
+            for path in self.exclude:
+                _drop_path(projected, path.split("."))
+            return projected
+        return payload
+
+
+FULL_PAYLOAD = PayloadFields()
+# Client-side recency reranking only needs the timestamp of each over-fetched candidate.
+RECENCY_PAYLOAD = PayloadFields(include=("updated_at",))
+
+
+@dataclass(frozen=True)
+class PayloadProjections:
+    schemes: PayloadFields = FULL_PAYLOAD
+    memories: PayloadFields = FULL_PAYLOAD
+
+
+@dataclass(frozen=True)
+class RecencyDecay:
+    half_life_seconds: float
+    weight: float = 1.0
+
+
+@dataclass(frozen=True)
+class MemoryQuery:
+    query_vector: list[float]
+    limit: int
+    candidates: int | None = None
+    statuses: tuple[str, ...] = ()
+    state: str | None = None
+    recency: RecencyDecay | None = None
+    payload: PayloadFields | None = None
+
+
+@dataclass(frozen=True)
+class SchemeQuery:
+    query_vector: list[float]
+    sparse_vector: qdrant_models.SparseVector
+    state: str | None
+    housing: str | None
+    caste: str | None
+    land_acres: float | None
+    limit: int
+    point_ids: list[str] | None = None
+    payload: PayloadFields | None = None
+
+
+def _copy_path(source: dict[str, Any], target: dict[str, Any], keys: list[str]) -> None:
+    key = keys[0]
+    if key not in source:
+        return
+    if len(keys) == 1:
+        target[key] = source[key]
+        return
+    value, current = source[key], target.get(key)
+    if not isinstance(value, dict) or current is value:
+        return
+    # Qdrant keeps the parent object, even when the nested field is missing from it.
+    nested = dict(current) if isinstance(current, dict) else {}
+    _copy_path(value, nested, keys[1:])
+    target[key] = nested
+
+
+def _drop_path(payload: dict[str, Any], keys: list[str]) -> None:
+    key = keys[0]
+    if key not in payload:
+        return
+    if len(keys) == 1:
+        del payload[key]
+    elif isinstance(payload[key], dict):
+        payload[key] = dict(payload[key])
+        _drop_path(payload[key], keys[1:])
+
+
+def scheme_point_id(scheme_id: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_DNS, scheme_id))
+
+
+def scheme_content_hash(scheme: Scheme, embedding_model: str = "") -> str:
+    canonical = json.dumps(scheme.model_dump(mode="json"), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{embedding_model}\0{canonical}".encode("utf-8")).hexdigest()
+
+
 @dataclass(frozen=True)
 class QdrantDependencies:
     client: QdrantClient
 
 
-class QdrantService:
-    def __init__(self, client: QdrantClient) -> None:
+class _QdrantServiceBase:
+    def __init__(
+        self,
+        sparse_encoder: SparseEncoder | None = None,
+        collections: QdrantCollections | None = None,
+        profiles: CollectionProfiles | None = None,
+        projections: PayloadProjections | None = None,
+    ) -> None:
+        self._collections = collections or QdrantCollections()
+        self._profiles = profiles or CollectionProfiles()
+        self._projections = projections or PayloadProjections()
+        self._sparse_encoder_instance: SparseEncoder | None = sparse_encoder
+
+    def build_sparse_query(self, text: str) -> qdrant_models.SparseVector:
+        return self._sparse_encoder().encode(text)
+
+    def build_sparse_queries(self, texts: Iterable[str]) -> list[qdrant_models.SparseVector]:
+        return self._sparse_encoder().encode_batch(texts)
+
+    def _scheme_query(self, query: SchemeQuery) -> dict[str, Any]:
+        if query.point_ids is not None:
+            query_filter = qdrant_models.Filter(
+                must=[qdrant_models.HasIdCondition(has_id=list(query.point_ids))]
+            )
+        else:
+            query_filter = self._build_scheme_filter(query.state, query.housing, query.caste, query.land_acres)
+        return {
+            "query": qdrant_models.FusionQuery(fusion=qdrant_models.Fusion.RRF),
+            "prefetch": [
+                qdrant_models.Prefetch(
+                    query=query.query_vector,
+                    using=DENSE_VECTOR_NAME,
+                    filter=query_filter,
+                    params=self._profiles.schemes.search_params(),
+                    limit=query.limit,
+                ),
+                qdrant_models.Prefetch(
+                    query=query.sparse_vector,
+                    using=SPARSE_VECTOR_NAME,
+                    filter=query_filter,
+                    limit=query.limit,
+                ),
+            ],
+            "limit": query.limit,
+            "with_payload": (query.payload or self._projections.schemes).selector(),
+        }
+
+    def _case_memory_query(self, query: MemoryQuery) -> dict[str, Any]:
+        query_filter = self._build_memory_filter(query.statuses, query.state)
+        pool = max(query.candidates or 0, query.limit)
+        with_payload = (query.payload or self._projections.memories).selector()
+        if query.recency is None:
+            return {
+                "query": query.query_vector,
+                "query_filter": query_filter,
+                "search_params": self._profiles.memories.search_params(),
+                "limit": pool,
+                "with_payload": with_payload,
+            }
+        # Decay is applied to the over-fetched candidates only, so a recent case that ranks below
+        # `limit` on similarity alone can still surface without scoring the whole collection.
+        return {
+            "prefetch": qdrant_models.Prefetch(
+                query=query.query_vector,
+                filter=query_filter,
+                params=self._profiles.memories.search_params(),
+                limit=pool,
+            ),
+            "query": self._recency_formula(query.recency),
+            "limit": query.limit,
+            "with_payload": with_payload,
+        }
+
+    def _case_memory_request(self, query: MemoryQuery) -> qdrant_models.QueryRequest:
+        arguments = self._case_memory_query(query)
+        return qdrant_models.QueryRequest(
+            query=arguments["query"],
+            prefetch=arguments.get("prefetch"),
+            filter=arguments.get("query_filter"),
+            params=arguments.get("search_params"),
+            limit=arguments["limit"],
+            with_payload=arguments["with_payload"],
+        )
+
+    def _recency_formula(self, recency: RecencyDecay) -> Any:
+        now = datetime.now(timezone.utc).isoformat()
+        decay = qdrant_models.ExpDecayExpression(
+            exp_decay=qdrant_models.DecayParamsExpression(
+                x=qdrant_models.DatetimeKeyExpression(datetime_key="updated_at"),
+                target=qdrant_models.DatetimeExpression(datetime=now),
+                scale=recency.half_life_seconds,
+                midpoint=0.5,
+            )
+        )
+        return qdrant_models.FormulaQuery(
+            formula=qdrant_models.SumExpression(
+                sum=["$score", qdrant_models.MultExpression(mult=[recency.weight, decay])]
+            ),
+            defaults={"updated_at": EPOCH},
+        )
+
+    def _build_memory_filter(self, statuses: tuple[str, ...], state: str | None) -> qdrant_models.Filter | None:
+        conditions: list[qdrant_models.Condition] = []
+        if statuses:
+            conditions.append(
+                qdrant_models.FieldCondition(key="status", match=qdrant_models.MatchAny(any=list(statuses)))
+            )
+        if state:
+            conditions.append(
+                qdrant_models.FieldCondition(key="signals.state", match=qdrant_models.MatchValue(value=state))
+            )
+        return qdrant_models.Filter(must=conditions) if conditions else None
+
+    def _case_memory_point(self, memory: CaseMemory, vector: list[float]) -> qdrant_models.PointStruct:
+        case_id = memory.case_id or str(uuid.uuid4())
+        payload = {
+            "signals": memory.signals.model_dump(),
+            "query_intent": memory.query_intent,
+            "retrieved_scheme_ids": memory.retrieved_scheme_ids,
+            "chosen_scheme_id": memory.chosen_scheme_id,
+            "status": memory.status,
+            "feedback_score": memory.feedback_score,
+            "notes": memory.notes,
+            "created_at": memory.created_at.isoformat(),
+            "updated_at": memory.updated_at.isoformat(),
+        }
+        return qdrant_models.PointStruct(
+            id=case_id,
+            vector=vector,
+            payload=payload,
+        )
+
+    def _sparse_encoder(self) -> SparseEncoder:
+        if self._sparse_encoder_instance is None:
+            self._sparse_encoder_instance = SparseEncoder()
+        return self._sparse_encoder_instance
+
+    def _build_scheme_filter(
+        self,
+        state: str | None,
+        housing: str | None,
+        caste: str | None,
+        land_acres: float | None,
+    ) -> qdrant_models.Filter | None:
+        must: list[qdrant_models.FieldCondition] = []
+        should: list[qdrant_models.FieldCondition] = []
+        if state:
+            should.extend(
+                [
+                    qdrant_models.FieldCondition(
+                        key="states",
+                        match=qdrant_models.MatchValue(value=state),
+                    ),
+                    qdrant_models.FieldCondition(
+                        key="states",
+                        match=qdrant_models.MatchValue(value="All"),
+                    ),
+                ]
+            )
+        if housing:
+            must.append(
+                qdrant_models.FieldCondition(
+                    key="eligibility_rules.housing",
+                    match=qdrant_models.MatchValue(value=housing),
+                )
+            )
+        if caste:
+            must.append(
+                qdrant_models.FieldCondition(
+                    key="eligibility_rules.caste",
+                    match=qdrant_models.MatchValue(value=caste),
+                )
+            )
+        if land_acres is not None:
+            must.append(
+                qdrant_models.FieldCondition(
+                    key="eligibility_rules.land_max_acres",
+                    range=qdrant_models.Range(lte=land_acres),
+                )
+            )
+
+        if not must and not should:
+            return None
+
+        return qdrant_models.Filter(
+            must=must or None,
+            should=should or None,
+        )
+
+
+class QdrantService(_QdrantServiceBase):
+    def __init__(
+        self,
+        client: QdrantClient,
+        sparse_encoder: SparseEncoder | None = None,
+        collections: QdrantCollections | None = None,
+        profiles: CollectionProfiles | None = None,
+        projections: PayloadProjections | None = None,
+    ) -> None:
+        super().__init__(sparse_encoder, collections, profiles, projections)
         self._client = client
-        self._collections = QdrantCollections()
-        self._sparse_encoder_instance: SparseEncoder | None = None
 
     def create_collections(self, scheme_vector: VectorConfig, memory_vector: VectorConfig) -> None:
-        if not self._client.collection_exists(self._collections.schemes):
-            self._client.create_collection(
-                collection_name=self._collections.schemes,
-                vectors_config=self._scheme_vectors_config(scheme_vector),
-                sparse_vectors_config=self._scheme_sparse_config(),
-            )
-            self._create_scheme_indexes()
+        if not self.schemes_collection_exists():
+            self.create_scheme_collection(self._collections.schemes, scheme_vector)
 
         if not self._client.collection_exists(self._collections.memories):
+            profile = self._profiles.memories
             self._client.create_collection(
                 collection_name=self._collections.memories,
-                vectors_config=qdrant_models.VectorParams(
-                    size=memory_vector.size,
-                    distance=memory_vector.distance,
-                ),
+                vectors_config=profile.vector_params(memory_vector.size, memory_vector.distance),
+                on_disk_payload=profile.payload_on_disk or None,
+                optimizers_config=profile.optimizers_config(),
             )
-            self._create_memory_indexes()
+        # Index creation is idempotent, so existing collections pick up indexes added later.
+        self._create_memory_indexes()
 
     def recreate_schemes_collection(self, scheme_vector: VectorConfig) -> None:
         self._client.recreate_collection(
             collection_name=self._collections.schemes,
             vectors_config=self._scheme_vectors_config(scheme_vector),
             sparse_vectors_config=self._scheme_sparse_config(),
+            on_disk_payload=self._profiles.schemes.payload_on_disk or None,
+            optimizers_config=self._profiles.schemes.optimizers_config(),
         )
-        self._create_scheme_indexes()
+        self._create_scheme_indexes(self._collections.schemes)
 
-    def build_sparse_query(self, text: str) -> qdrant_models.SparseVector:
-        return self._sparse_encoder().encode(text)
+    def create_scheme_collection(self, collection_name: str, scheme_vector: VectorConfig) -> None:
+        self._client.create_collection(
+            collection_name=collection_name,
+            vectors_config=self._scheme_vectors_config(scheme_vector),
+            sparse_vectors_config=self._scheme_sparse_config(),
+            on_disk_payload=self._profiles.schemes.payload_on_disk or None,
+            optimizers_config=self._profiles.schemes.optimizers_config(),
+        )
+        self._create_scheme_indexes(collection_name)
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return self._client.collection_exists(collection_name)
+
+    def schemes_collection_exists(self) -> bool:
+        return (
+            self.schemes_alias_target() is not None
+            or self._client.collection_exists(self._collections.schemes)
+        )
+
+    def schemes_alias_target(self) -> str | None:
+        for alias in self._client.get_aliases().aliases:
+            if alias.alias_name == self._collections.schemes:
+                return alias.collection_name
+        return None
+
+    def swap_schemes_alias(self, collection_name: str) -> str | None:
+        alias_name = self._collections.schemes
+        previous = self.schemes_alias_target()
+        operations: list[qdrant_models.CreateAliasOperation | qdrant_models.DeleteAliasOperation] = []
+        if previous is not None:
+            operations.append(
+                qdrant_models.DeleteAliasOperation(
+                    delete_alias=qdrant_models.DeleteAlias(alias_name=alias_name)
+                )
+            )
+        elif self._client.collection_exists(alias_name):
+            # A legacy physical collection owns the alias name and must be dropped once.
+            self._client.delete_collection(alias_name)
+        operations.append(
+            qdrant_models.CreateAliasOperation(
+                create_alias=qdrant_models.CreateAlias(
+                    collection_name=collection_name,
+                    alias_name=alias_name,
+                )
+            )
+        )
+        self._client.update_collection_aliases(change_aliases_operations=operations)
+        return previous
+
+    def apply_collection_profiles(self) -> None:
+        # Qdrant rebuilds quantized vectors, HNSW graphs and storage in the background after this.
+        schemes = self.schemes_alias_target() or self._collections.schemes
+        if self._client.collection_exists(schemes):
+            self._apply_collection_profile(schemes, DENSE_VECTOR_NAME, self._profiles.schemes)
+        if self._client.collection_exists(self._collections.memories):
+            self._apply_collection_profile(self._collections.memories, "", self._profiles.memories)
+
+    def _apply_collection_profile(self, collection_name: str, vector_name: str, profile: CollectionProfile) -> None:
+        self._client.update_collection(
+            collection_name=collection_name,
+            vectors_config={vector_name: profile.vector_params_diff()},
+            optimizers_config=profile.optimizers_config(),
+            collection_params=qdrant_models.CollectionParamsDiff(on_disk_payload=profile.payload_on_disk),
+        )
+
+    def delete_collection(self, collection_name: str) -> None:
+        self._client.delete_collection(collection_name)
+
+    def scheme_content_hashes(self, page_size: int = 1_000) -> dict[str, str | None]:
+        hashes: dict[str, str | None] = {}
+        offset: qdrant_models.ExtendedPointId | None = None
+        while True:
+            points, offset = self._client.scroll(
+                collection_name=self._collections.schemes,
+                limit=page_size,
+                offset=offset,
+                with_payload=qdrant_models.PayloadSelectorInclude(include=["scheme_id", "content_hash"]),
+                with_vectors=False,
+            )
+            for point in points:
+                payload = point.payload or {}
+                scheme_id = payload.get("scheme_id")
+                if scheme_id is not None:
+                    hashes[str(scheme_id)] = payload.get("content_hash")
+            if offset is None:
+                return hashes
+
+    def write_catalog_version(self, version: str, scheme_count: int) -> None:
+        if not self._client.collection_exists(self._collections.metadata):
+            self._client.create_collection(
+                collection_name=self._collections.metadata,
+                vectors_config={},
+            )
+        self._client.upsert(
+            collection_name=self._collections.metadata,
+            points=[
+                qdrant_models.PointStruct(
+                    id=CATALOG_VERSION_POINT_ID,
+                    vector={},
+                    payload={
+                        "version": version,
+                        "scheme_count": scheme_count,
+                        "updated_at": datetime.now(timezone.utc).isoformat(),
+                    },
+                )
+            ],
+            wait=True,
+        )
+
+    def delete_schemes(self, scheme_ids: Iterable[str]) -> None:
+        point_ids = [scheme_point_id(scheme_id) for scheme_id in scheme_ids]
+        if point_ids:
+            self._client.delete(
+                collection_name=self._collections.schemes,
+                points_selector=qdrant_models.PointIdsList(points=point_ids),
+                wait=True,
+            )
 
     def upsert_schemes(
         self,
@@ -74,11 +499,44 @@ class QdrantService:
         dense_vectors: list[list[float]],
         sparse_vectors: list[qdrant_models.SparseVector],
     ) -> None:
+        self._client.upsert(
+            collection_name=self._collections.schemes,
+            points=self._scheme_points(schemes, dense_vectors, sparse_vectors),
+        )
+
+    def upload_schemes(
+        self,
+        schemes: Iterable[Scheme],
+        dense_vectors: list[list[float]],
+        sparse_vectors: list[qdrant_models.SparseVector],
+        content_hashes: list[str] | None = None,
+        collection_name: str | None = None,
+        batch_size: int = 64,
+        parallel: int = 1,
+    ) -> None:
+        self._client.upload_points(
+            collection_name=collection_name or self._collections.schemes,
+            points=self._scheme_points(schemes, dense_vectors, sparse_vectors, content_hashes),
+            batch_size=batch_size,
+            parallel=parallel,
+            wait=True,
+        )
+
+    def _scheme_points(
+        self,
+        schemes: Iterable[Scheme],
+        dense_vectors: list[list[float]],
+        sparse_vectors: list[qdrant_models.SparseVector],
+        content_hashes: list[str] | None = None,
+    ) -> list[qdrant_models.PointStruct]:
+        schemes = list(schemes)
+        if content_hashes is None:
+            content_hashes = [scheme_content_hash(scheme) for scheme in schemes]
         points = []
-        for scheme, dense_vector, sparse_vector in zip(
-            schemes, dense_vectors, sparse_vectors, strict=True
+        for scheme, dense_vector, sparse_vector, content_hash in zip(
+            schemes, dense_vectors, sparse_vectors, content_hashes, strict=True
         ):
-            point_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, scheme.scheme_id))
+            point_id = scheme_point_id(scheme.scheme_id)
             points.append(
                 qdrant_models.PointStruct(
                     id=point_id,
@@ -91,17 +549,16 @@ class QdrantService:
                         "scheme_name": scheme.scheme_name,
                         "description": scheme.description,
                         "states": scheme.states,
-                        "eligibility_rules": scheme.eligibility_rules,
+                        "eligibility_rules": numeric_limits(scheme.eligibility_rules),
                         "benefits": scheme.benefits,
                         "source_url": scheme.source_url,
+                        "content_hash": content_hash,
                     },
                 )
             )
-        self._client.upsert(
-            collection_name=self._collections.schemes,
-            points=points,
-        )
+        return points
 
+    @instrumented("qdrant")
     def search_schemes(
         self,
         query_vector: list[float],
@@ -111,55 +568,44 @@ class QdrantService:
         caste: str | None,
         land_acres: float | None,
         limit: int,
+        point_ids: list[str] | None = None,
+        payload: PayloadFields | None = None,
     ) -> list[qdrant_models.ScoredPoint]:
-        query_filter = self._build_scheme_filter(state, housing, caste, land_acres)
+        query = SchemeQuery(
+            query_vector, sparse_vector, state, housing, caste, land_acres, limit, point_ids, payload
+        )
         response = self._client.query_points(
             collection_name=self._collections.schemes,
-            query=qdrant_models.FusionQuery(fusion=qdrant_models.Fusion.RRF),
-            prefetch=[
-                qdrant_models.Prefetch(
-                    query=query_vector,
-                    using=DENSE_VECTOR_NAME,
-                    filter=query_filter,
-                    limit=limit,
-                ),
-                qdrant_models.Prefetch(
-                    query=sparse_vector,
-                    using=SPARSE_VECTOR_NAME,
-                    filter=query_filter,
-                    limit=limit,
-                ),
-            ],
-            limit=limit,
-            with_payload=True,
+            **self._scheme_query(query),
         )
         return response.points
 
+    @instrumented("qdrant")
     def upsert_case_memory(self, memory: CaseMemory, vector: list[float]) -> str:
-        case_id = memory.case_id or str(uuid.uuid4())
-        payload = {
-            "signals": memory.signals.model_dump(),
-            "query_intent": memory.query_intent,
-            "retrieved_scheme_ids": memory.retrieved_scheme_ids,
-            "chosen_scheme_id": memory.chosen_scheme_id,
-            "status": memory.status,
-            "feedback_score": memory.feedback_score,
-            "notes": memory.notes,
-            "created_at": memory.created_at.isoformat(),
-            "updated_at": memory.updated_at.isoformat(),
-        }
+        point = self._case_memory_point(memory, vector)
         self._client.upsert(
+            collection_name=self._collections.memories,
+            points=[point],
+        )
+        return str(point.id)
+
+    def upload_case_memories(
+        self,
+        memories: Iterable[CaseMemory],
+        vectors: list[list[float]],
+        batch_size: int = 256,
+    ) -> None:
+        self._client.upload_points(
             collection_name=self._collections.memories,
             points=[
-                qdrant_models.PointStruct(
-                    id=case_id,
-                    vector=vector,
-                    payload=payload,
-                )
+                self._case_memory_point(memory, vector)
+                for memory, vector in zip(memories, vectors, strict=True)
             ],
+            batch_size=batch_size,
+            wait=True,
         )
-        return case_id
 
+    @instrumented("qdrant")
     def update_case_memory(self, case_id: str, updates: dict[str, object]) -> None:
         if not updates:
             return
@@ -170,22 +616,48 @@ class QdrantService:
             wait=True,
         )
 
-    def search_case_memory(self, query_vector: list[float], limit: int = 3) -> list[qdrant_models.ScoredPoint]:
+    @instrumented("qdrant")
+    def search_case_memory(
+        self,
+        query_vector: list[float],
+        limit: int = 3,
+        candidates: int | None = None,
+        statuses: tuple[str, ...] = (),
+        state: str | None = None,
+        recency: RecencyDecay | None = None,
+        payload: PayloadFields | None = None,
+    ) -> list[qdrant_models.ScoredPoint]:
+        query = MemoryQuery(query_vector, limit, candidates, statuses, state, recency, payload)
         response = self._client.query_points(
             collection_name=self._collections.memories,
-            query=query_vector,
-            limit=limit,
-            with_payload=True,
+            **self._case_memory_query(query),
         )
         return response.points
 
+    @instrumented("qdrant")
+    def scheme_payloads(
+        self, point_ids: list[str], payload: PayloadFields = FULL_PAYLOAD
+    ) -> dict[str, dict[str, Any]]:
+        return self._payloads(self._collections.schemes, point_ids, payload)
+
+    @instrumented("qdrant")
+    def case_memory_payloads(
+        self, case_ids: list[str], payload: PayloadFields | None = None
+    ) -> dict[str, dict[str, Any]]:
+        return self._payloads(self._collections.memories, case_ids, payload or self._projections.memories)
+
+    def _payloads(
+        self, collection_name: str, point_ids: list[str], payload: PayloadFields
+    ) -> dict[str, dict[str, Any]]:
+        if not point_ids:
+            return {}
+        records = self._client.retrieve(
+            collection_name=collection_name, ids=list(point_ids), with_payload=payload.selector()
+        )
+        return {str(record.id): record.payload or {} for record in records}
+
     def _scheme_vectors_config(self, scheme_vector: VectorConfig) -> dict[str, qdrant_models.VectorParams]:
-        return {
-            DENSE_VECTOR_NAME: qdrant_models.VectorParams(
-                size=scheme_vector.size,
-                distance=scheme_vector.distance,
-            )
-        }
+        return {DENSE_VECTOR_NAME: self._profiles.schemes.vector_params(scheme_vector.size, scheme_vector.distance)}
 
     def _scheme_sparse_config(self) -> dict[str, qdrant_models.SparseVectorParams]:
         modifier_type = getattr(qdrant_models, "Modifier", None)
@@ -203,86 +675,29 @@ class QdrantService:
             )
         }
 
-    def _sparse_encoder(self) -> SparseEncoder:
-        if self._sparse_encoder_instance is None:
-            self._sparse_encoder_instance = SparseEncoder()
-        return self._sparse_encoder_instance
-
-    def _build_scheme_filter(
-        self,
-        state: str | None,
-        housing: str | None,
-        caste: str | None,
-        land_acres: float | None,
-    ) -> qdrant_models.Filter | None:
-        must: list[qdrant_models.FieldCondition] = []
-        should: list[qdrant_models.FieldCondition] = []
-        if state:
-            should.extend(
-                [
-                    qdrant_models.FieldCondition(
-                        key="states",
-                        match=qdrant_models.MatchValue(value=state),
-                    ),
-                    qdrant_models.FieldCondition(
-                        key="states",
-                        match=qdrant_models.MatchValue(value="All"),
-                    ),
-                ]
-            )
-        if housing:
-            must.append(
-                qdrant_models.FieldCondition(
-                    key="eligibility_rules.housing",
-                    match=qdrant_models.MatchValue(value=housing),
-                )
-            )
-        if caste:
-            must.append(
-                qdrant_models.FieldCondition(
-                    key="eligibility_rules.caste",
-                    match=qdrant_models.MatchValue(value=caste),
-                )
-            )
-        if land_acres is not None:
-            must.append(
-                qdrant_models.FieldCondition(
-                    key="eligibility_rules.land_max_acres",
-                    range=qdrant_models.Range(lte=land_acres),
-                )
-            )
-
-        if not must and not should:
-            return None
-
-        return qdrant_models.Filter(
-            must=must or None,
-            should=should or None,
-        )
-
-    def _create_scheme_indexes(self) -> None:
+    def _create_scheme_indexes(self, collection_name: str) -> None:
         self._client.create_payload_index(
-            collection_name=self._collections.schemes,
+            collection_name=collection_name,
             field_name="states",
             field_schema=qdrant_models.PayloadSchemaType.KEYWORD,
         )
         self._client.create_payload_index(
-            collection_name=self._collections.schemes,
+            collection_name=collection_name,
             field_name="eligibility_rules.housing",
             field_schema=qdrant_models.PayloadSchemaType.KEYWORD,
         )
         self._client.create_payload_index(
-            collection_name=self._collections.schemes,
+            collection_name=collection_name,
             field_name="eligibility_rules.assets_excluded",
             field_schema=qdrant_models.PayloadSchemaType.KEYWORD,
         )
         self._client.create_payload_index(
-            collection_name=self._collections.schemes,
+            collection_name=collection_name,
             field_name="eligibility_rules.caste",
             field_schema=qdrant_models.PayloadSchemaType.KEYWORD,
         )
         self._client.create_payload_index(
-            collection_name=self._collections.schemes,
+            collection_name=collection_name,
             field_name="eligibility_rules.land_max_acres",
             field_schema=qdrant_models.PayloadSchemaType.FLOAT,
         )
@@ -302,4 +717,298 @@ class QdrantService:
             collection_name=self._collections.memories,
             field_name="status",
             field_schema=qdrant_models.PayloadSchemaType.KEYWORD,
-        )
\ No newline at end of file
+        )
+        self._client.create_payload_index(
+            collection_name=self._collections.memories,
+            field_name="merged_case_ids",
+            field_schema=qdrant_models.PayloadSchemaType.KEYWORD,
+        )
+        self._client.create_payload_index(
+            collection_name=self._collections.memories,
+            field_name="signals.state",
+            field_schema=qdrant_models.PayloadSchemaType.KEYWORD,
+        )
+
+
+class AsyncQdrantService(_QdrantServiceBase):
+    def __init__(
+        self,
+        client: AsyncQdrantClient,
+        sparse_encoder: SparseEncoder | None = None,
+        collections: QdrantCollections | None = None,
+        profiles: CollectionProfiles | None = None,
+        projections: PayloadProjections | None = None,
+    ) -> None:
+        super().__init__(sparse_encoder, collections, profiles, projections)
+        self._client = client
+
+    @instrumented("qdrant")
+    async def search_schemes(
+        self,
+        query_vector: list[float],
+        sparse_vector: qdrant_models.SparseVector,
+        state: str | None,
+        housing: str | None,
+        caste: str | None,
+        land_acres: float | None,
+        limit: int,
+        point_ids: list[str] | None = None,
+        payload: PayloadFields | None = None,
+    ) -> list[qdrant_models.ScoredPoint]:
+        query = SchemeQuery(
+            query_vector, sparse_vector, state, housing, caste, land_acres, limit, point_ids, payload
+        )
+        response = await self._client.query_points(
+            collection_name=self._collections.schemes,
+            **self._scheme_query(query),
+        )
+        return response.points
+
+    @instrumented("qdrant")
+    async def search_schemes_batch(
+        self, queries: list[SchemeQuery]
+    ) -> list[list[qdrant_models.ScoredPoint]]:
+        if not queries:
+            return []
+        responses = await self._client.query_batch_points(
+            collection_name=self._collections.schemes,
+            requests=[qdrant_models.QueryRequest(**self._scheme_query(query)) for query in queries],
+        )
+        return [response.points for response in responses]
+
+    @instrumented("qdrant")
+    async def upsert_case_memory(self, memory: CaseMemory, vector: list[float]) -> str:
+        point = self._case_memory_point(memory, vector)
+        await self._client.upsert(
+            collection_name=self._collections.memories,
+            points=[point],
+        )
+        return str(point.id)
+
+    @instrumented("qdrant")
+    async def upsert_case_memories(
+        self,
+        memories: list[CaseMemory],
+        vectors: list[list[float]],
+        wait: bool = True,
+    ) -> list[str]:
+        points = [
+            self._case_memory_point(memory, vector)
+            for memory, vector in zip(memories, vectors, strict=True)
+        ]
+        if points:
+            await self._client.upsert(
+                collection_name=self._collections.memories,
+                points=points,
+                wait=wait,
+            )
+        return [str(point.id) for point in points]
+
+    @instrumented("qdrant")
+    async def update_case_memory(self, case_id: str, updates: dict[str, object]) -> None:
+        if not updates:
+            return
+        await self._client.set_payload(
+            collection_name=self._collections.memories,
+            payload=updates,
+            points=[case_id],
+            wait=True,
+        )
+
+    @instrumented("qdrant")
+    async def search_case_memory(
+        self,
+        query_vector: list[float],
+        limit: int = 3,
+        candidates: int | None = None,
+        statuses: tuple[str, ...] = (),
+        state: str | None = None,
+        recency: RecencyDecay | None = None,
+        payload: PayloadFields | None = None,
+    ) -> list[qdrant_models.ScoredPoint]:
+        query = MemoryQuery(query_vector, limit, candidates, statuses, state, recency, payload)
+        response = await self._client.query_points(
+            collection_name=self._collections.memories,
+            **self._case_memory_query(query),
+        )
+        return response.points
+
+    @instrumented("qdrant")
+    async def search_case_memory_batch(
+        self,
+        query_vectors: list[list[float]],
+        limit: int = 3,
+        candidates: int | None = None,
+        statuses: tuple[str, ...] = (),
+        states: list[str | None] | None = None,
+        recency: RecencyDecay | None = None,
+        payload: PayloadFields | None = None,
+    ) -> list[list[qdrant_models.ScoredPoint]]:
+        if not query_vectors:
+            return []
+        states = states or [None] * len(query_vectors)
+        responses = await self._client.query_batch_points(
+            collection_name=self._collections.memories,
+            requests=[
+                self._case_memory_request(
+                    MemoryQuery(vector, limit, candidates, statuses, state, recency, payload)
+                )
+                for vector, state in zip(query_vectors, states, strict=True)
+            ],
+        )
+        return [response.points for response in responses]
+
+    @instrumented("qdrant")
+    async def scheme_payloads(
+        self, point_ids: list[str], payload: PayloadFields = FULL_PAYLOAD
+    ) -> dict[str, dict[str, Any]]:
+        return await self._payloads(self._collections.schemes, point_ids, payload)
+
+    @instrumented("qdrant")
+    async def case_memory_payloads(
+        self, case_ids: list[str], payload: PayloadFields | None = None
+    ) -> dict[str, dict[str, Any]]:
+        return await self._payloads(self._collections.memories, case_ids, payload or self._projections.memories)
+
+    async def _payloads(
+        self, collection_name: str, point_ids: list[str], payload: PayloadFields
+    ) -> dict[str, dict[str, Any]]:
+        if not point_ids:
+            return {}
+        records = await self._client.retrieve(
+            collection_name=collection_name, ids=list(point_ids), with_payload=payload.selector()
+        )
+        return {str(record.id): record.payload or {} for record in records}
+
+    @instrumented("qdrant")
+    async def scroll_case_memories(
+        self,
+        scroll_filter: qdrant_models.Filter | None,
+        limit: int,
+        offset: qdrant_models.ExtendedPointId | None = None,
+        with_vectors: bool = False,
+    ) -> tuple[list[qdrant_models.Record], qdrant_models.ExtendedPointId | None]:
+        return await self._client.scroll(
+            collection_name=self._collections.memories,
+            scroll_filter=scroll_filter,
+            limit=limit,
+            offset=offset,
+            with_payload=True,
+            with_vectors=with_vectors,
+        )
+
+    @instrumented("qdrant")
+    async def case_memory_neighbours(
+        self, query_vectors: list[list[float]], limit: int, score_threshold: float
+    ) -> list[list[qdrant_models.ScoredPoint]]:
+        if not query_vectors:
+            return []
+        responses = await self._client.query_batch_points(
+            collection_name=self._collections.memories,
+            requests=[
+                qdrant_models.QueryRequest(
+                    query=vector,
+                    params=self._profiles.memories.search_params(),
+                    score_threshold=score_threshold,
+                    limit=limit,
+                    with_payload=True,
+                )
+                for vector in query_vectors
+            ],
+        )
+        return [response.points for response in responses]
+
+    @instrumented("qdrant")
+    async def delete_case_memories(self, case_ids: list[str]) -> None:
+        if case_ids:
+            await self._client.delete(
+                collection_name=self._collections.memories,
+                points_selector=qdrant_models.PointIdsList(points=list(case_ids)),
+                wait=True,
+            )
+
+    @instrumented("qdrant")
+    async def archive_case_memories(self, records: list[qdrant_models.Record]) -> None:
+        if not records:
+            return
+        if not await self._client.collection_exists(self._collections.memory_archive):
+            # Archived cases are only read back for audits, so keep them on disk and skip the graph.
+            await self._client.create_collection(
+                collection_name=self._collections.memory_archive,
+                vectors_config=qdrant_models.VectorParams(
+                    size=len(records[0].vector),
+                    distance=qdrant_models.Distance.COSINE,
+                    on_disk=True,
+                ),
+                hnsw_config=qdrant_models.HnswConfigDiff(m=0),
+                on_disk_payload=True,
+            )
+        await self._client.upsert(
+            collection_name=self._collections.memory_archive,
+            points=[
+                qdrant_models.PointStruct(id=record.id, vector=record.vector, payload=record.payload)
+                for record in records
+            ],
+            wait=True,
+        )
+
+    @instrumented("qdrant")
+    async def find_merged_case(self, case_id: str) -> str | None:
+        records, _ = await self._client.scroll(
+            collection_name=self._collections.memories,
+            scroll_filter=qdrant_models.Filter(
+                must=[
+                    qdrant_models.FieldCondition(
+                        key="merged_case_ids", match=qdrant_models.MatchValue(value=case_id)
+                    )
+                ]
+            ),
+            limit=1,
+            with_payload=False,
+            with_vectors=False,
+        )
+        return str(records[0].id) if records else None
+
+    @instrumented("qdrant")
+    async def missing_collections(self) -> list[str]:
+        missing = []
+        # The schemes name is an alias after a blue/green ingest, so resolve aliases first.
+        aliases = {alias.alias_name for alias in (await self._client.get_aliases()).aliases}
+        for name in (self._collections.schemes, self._collections.memories):
+            if name not in aliases and not await self._client.collection_exists(name):
+                missing.append(name)
+        return missing
+
+    @instrumented("qdrant")
+    async def read_catalog_version(self) -> str | None:
+        if not await self._client.collection_exists(self._collections.metadata):
+            return None
+        records = await self._client.retrieve(
+            collection_name=self._collections.metadata,
+            ids=[CATALOG_VERSION_POINT_ID],
+            with_payload=True,
+        )
+        if not records or not records[0].payload:
+            return None
+        version = records[0].payload.get("version")
+        return str(version) if version is not None else None
+
+    @instrumented("qdrant")
+    async def scroll_schemes(
+        self,
+        with_vectors: bool | list[str] = False,
+        page_size: int = 1_000,
+    ) -> list[qdrant_models.Record]:
+        records: list[qdrant_models.Record] = []
+        offset: qdrant_models.ExtendedPointId | None = None
+        while True:
+            page, offset = await self._client.scroll(
+                collection_name=self._collections.schemes,
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=with_vectors,
+            )
+            records.extend(page)
+            if offset is None:
+                return records
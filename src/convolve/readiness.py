@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+from time import monotonic, perf_counter
+from typing import Awaitable, Callable
+
+
+logger = logging.getLogger(__name__)
+
+ReadinessCheck = Callable[[], Awaitable[object]]
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    ok: bool
+    detail: str
+    elapsed_ms: float
+
+
+@dataclass(frozen=True)
+class ReadinessSnapshot:
+    ready: bool
+    checks: dict[str, CheckResult | None]
+    warm_up_ms: float | None
+
+
+class Readiness:
+    def __init__(self, checks: dict[str, ReadinessCheck], retry_interval_seconds: float = 5.0) -> None:
+        self._checks = checks
+        self._retry_interval = retry_interval_seconds
+        self._results: dict[str, CheckResult | None] = {name: None for name in checks}
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._created = perf_counter()
+        self._last_attempt = 0.0
+        self._warm_up_ms: float | None = None
+
+    async def start(self) -> None:
+        # Warm-up runs after the server starts accepting connections, so /health answers
+        # immediately and /ready reports 503 until the model and collections are confirmed.
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="readiness-warm-up")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def check(self) -> ReadinessSnapshot:
+        # Failed checks are retried on probe, rate-limited so a probe storm cannot hammer Qdrant.
+        if (
+            not self.ready
+            and (self._task is None or self._task.done())
+            and not self._lock.locked()
+            and monotonic() - self._last_attempt >= self._retry_interval
+        ):
+            await self._run()
+        return self.snapshot()
+
+    def snapshot(self) -> ReadinessSnapshot:
+        return ReadinessSnapshot(ready=self.ready, checks=dict(self._results), warm_up_ms=self._warm_up_ms)
+
+    @property
+    def ready(self) -> bool:
+        return all(result is not None and result.ok for result in self._results.values())
+
+    async def _run(self) -> None:
+        async with self._lock:
+            self._last_attempt = monotonic()
+            pending = [
+                name for name, result in self._results.items() if result is None or not result.ok
+            ]
+            # Loading the model is CPU-bound in the embedding pool while the catalog check waits
+            # on Qdrant, so they overlap.
+            results = await asyncio.gather(*(_run_check(name, self._checks[name]) for name in pending))
+            self._results.update(zip(pending, results))
+            if self.ready and self._warm_up_ms is None:
+                self._warm_up_ms = round((perf_counter() - self._created) * 1000, 2)
+                logger.info("Service ready %.0f ms after start-up", self._warm_up_ms)
+
+
+async def _run_check(name: str, check: ReadinessCheck) -> CheckResult:
+    started = perf_counter()
+    try:
+        detail = await check()
+    except Exception as exc:
+        logger.warning("Readiness check %s failed: %s", name, exc)
+        return CheckResult(ok=False, detail=f"{type(exc).__name__}: {exc}", elapsed_ms=_elapsed(started))
+    return CheckResult(ok=True, detail="" if detail is None else str(detail), elapsed_ms=_elapsed(started))
+
+
+def _elapsed(started: float) -> float:
+    return round((perf_counter() - started) * 1000, 2)
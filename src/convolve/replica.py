@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+import math
+from typing import Any
+
+import numpy as np
+from qdrant_client.http import models as qdrant_models
+
+from convolve.catalog import CatalogSnapshot, CatalogWatcher
+from convolve.metrics import instrumented
+from convolve.qdrant_client import (
+    DENSE_VECTOR_NAME,
+    FULL_PAYLOAD,
+    SPARSE_VECTOR_NAME,
+    AsyncQdrantService,
+    PayloadFields,
+    PayloadProjections,
+    SchemeQuery,
+)
+from convolve.schemas import parse_limit
+
+
+logger = logging.getLogger(__name__)
+
+REPLICA_MODES = ("off", "primary", "fallback")
+
+# Qdrant's RRF scores a point at 0-based rank r as 1 / (r + k) with k = 2.
+RRF_RANKING_CONSTANT = 2
+
+
+@dataclass(frozen=True)
+class SchemeSearchStats:
+    mode: str
+    replica_version: str | None
+    replica_points: int
+    replica_queries: int
+    qdrant_queries: int
+    fallbacks: int
+
+
+class SchemeReplica:
+    def __init__(
+        self,
+        version: str,
+        point_ids: list[str],
+        payloads: list[dict[str, Any]],
+        dense: np.ndarray,
+        sparse: list[qdrant_models.SparseVector],
+    ) -> None:
+        self.version = version
+        self._point_ids = point_ids
+        self._payloads = payloads
+        self._rows = {point_id: row for row, point_id in enumerate(point_ids)}
+        norms = np.linalg.norm(dense, axis=1, keepdims=True) if len(dense) else np.ones((0, 1))
+        self._dense = (dense / np.where(norms == 0, 1.0, norms)).astype(np.float32)
+
+        # CSR layout: the entries of row i live in [indptr[i], indptr[i + 1]).
+        lengths = np.array([len(vector.indices) for vector in sparse], dtype=np.int64)
+        self._indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self._indices = np.array(
+            [index for vector in sparse for index in vector.indices], dtype=np.int64
+        )
+        self._data = np.array([value for vector in sparse for value in vector.values], dtype=np.float32)
+        self._entry_rows = np.repeat(np.arange(len(sparse), dtype=np.int64), lengths)
+        width = int(self._indices.max()) + 1 if len(self._indices) else 0
+        self._document_frequency = np.bincount(self._indices, minlength=width)
+        self._sparse_documents = int(np.count_nonzero(lengths))
+
+        self._states = [set(payload.get("states") or []) for payload in payloads]
+        rules = [payload.get("eligibility_rules") or {} for payload in payloads]
+        self._housing = [_as_values(rule.get("housing")) for rule in rules]
+        self._caste = [_as_values(rule.get("caste")) for rule in rules]
+        self._land_max = np.array([parse_limit(rule.get("land_max_acres")) for rule in rules], dtype=np.float64)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: CatalogSnapshot) -> SchemeReplica:
+        point_ids: list[str] = []
+        payloads: list[dict[str, Any]] = []
+        dense: list[list[float]] = []
+        sparse: list[qdrant_models.SparseVector] = []
+        for record in snapshot.records:
+            vectors = record.vector if isinstance(record.vector, dict) else {}
+            dense_vector = vectors.get(DENSE_VECTOR_NAME)
+            if dense_vector is None:
+                continue
+            point_ids.append(str(record.id))
+            payloads.append(record.payload or {})
+            dense.append(dense_vector)
+            sparse.append(
+                vectors.get(SPARSE_VECTOR_NAME) or qdrant_models.SparseVector(indices=[], values=[])
+            )
+        matrix = np.array(dense, dtype=np.float32) if dense else np.zeros((0, 0), dtype=np.float32)
+        return cls(snapshot.version, point_ids, payloads, matrix, sparse)
+
+    def __len__(self) -> int:
+        return len(self._point_ids)
+
+    def search(self, query: SchemeQuery, payload: PayloadFields = FULL_PAYLOAD) -> list[qdrant_models.ScoredPoint]:
+        mask = self._filter_mask(query)
+        dense_rows = self._top_rows(self._dense_scores(query.query_vector), mask, query.limit)
+        sparse_scores, overlap = self._sparse_scores(query.sparse_vector)
+        sparse_rows = self._top_rows(sparse_scores, mask & overlap, query.limit)
+        # Like the Qdrant path, a per-query projection wins over the default one.
+        return self._fuse([dense_rows, sparse_rows], query.limit, query.payload or payload)
+
+    def search_batch(
+        self, queries: list[SchemeQuery], payload: PayloadFields = FULL_PAYLOAD
+    ) -> list[list[qdrant_models.ScoredPoint]]:
+        return [self.search(query, payload) for query in queries]
+
+    def _dense_scores(self, query_vector: list[float]) -> np.ndarray:
+        vector = np.asarray(query_vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return self._dense @ (vector / norm if norm else vector)
+
+    def _sparse_scores(self, sparse_vector: qdrant_models.SparseVector) -> tuple[np.ndarray, np.ndarray]:
+        weights = np.zeros(len(self._document_frequency), dtype=np.float32)
+        for index, value in zip(sparse_vector.indices, sparse_vector.values, strict=True):
+            if index < len(weights) and self._document_frequency[index]:
+                weights[index] = value * _idf(int(self._document_frequency[index]), self._sparse_documents)
+        matched = weights[self._indices] if len(self._indices) else np.zeros(0, dtype=np.float32)
+        scores = np.bincount(self._entry_rows, weights=matched * self._data, minlength=len(self))
+        overlap = np.bincount(self._entry_rows, weights=(matched != 0).astype(np.float64), minlength=len(self)) > 0
+        return scores, overlap
+
+    def _filter_mask(self, query: SchemeQuery) -> np.ndarray:
+        if query.point_ids is not None:
+            mask = np.zeros(len(self), dtype=bool)
+            rows = [self._rows[point_id] for point_id in query.point_ids if point_id in self._rows]
+            mask[rows] = True
+            return mask
+
+        # Mirrors _QdrantServiceBase._build_scheme_filter.
+        mask = np.ones(len(self), dtype=bool)
+        if query.state:
+            mask &= np.array([query.state in states or "All" in states for states in self._states], dtype=bool)
+        if query.housing:
+            mask &= np.array([query.housing in values for values in self._housing], dtype=bool)
+        if query.caste:
+            mask &= np.array([query.caste in values for values in self._caste], dtype=bool)
+        if query.land_acres is not None:
+            with np.errstate(invalid="ignore"):
+                mask &= self._land_max <= query.land_acres
+        return mask
+
+    def _top_rows(self, scores: np.ndarray, mask: np.ndarray, limit: int) -> list[int]:
+        candidates = np.flatnonzero(mask)
+        if not len(candidates) or limit <= 0:
+            return []
+        order = np.argsort(-scores[candidates], kind="stable")[:limit]
+        return candidates[order].tolist()
+
+    def _fuse(
+        self, rankings: list[list[int]], limit: int, payload: PayloadFields
+    ) -> list[qdrant_models.ScoredPoint]:
+        scores: dict[int, float] = {}
+        for ranking in rankings:
+            for rank, row in enumerate(ranking):
+                scores[row] = scores.get(row, 0.0) + 1 / (rank + RRF_RANKING_CONSTANT)
+        fused = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            qdrant_models.ScoredPoint(
+                id=self._point_ids[row],
+                version=0,
+                score=score,
+                payload=payload.project(self._payloads[row]),
+            )
+            for row, score in fused
+        ]
+
+
+class SchemeSearchRouter:
+    def __init__(
+        self,
+        qdrant: AsyncQdrantService,
+        catalog: CatalogWatcher | None = None,
+        mode: str = "primary",
+        qdrant_timeout_seconds: float | None = None,
+        projections: PayloadProjections | None = None,
+    ) -> None:
+        if mode not in REPLICA_MODES:
+            raise ValueError(f"Unsupported scheme replica mode: {mode}")
+        self._qdrant = qdrant
+        # Must match the projections the Qdrant service applies, so replica hits carry the same fields.
+        self._payload = (projections or PayloadProjections()).schemes
+        self._catalog = catalog if mode != "off" else None
+        self._mode = mode
+        self._timeout = qdrant_timeout_seconds
+        self._replica_version: str | None = None
+        self._replica_points = 0
+        self._replica_queries = 0
+        self._qdrant_queries = 0
+        self._fallbacks = 0
+
+    async def warm_up(self) -> None:
+        await self._replica()
+
+    async def search(self, query: SchemeQuery) -> list[qdrant_models.ScoredPoint]:
+        return (await self.search_batch([query]))[0]
+
+    @instrumented("scheme_search")
+    async def search_batch(self, queries: list[SchemeQuery]) -> list[list[qdrant_models.ScoredPoint]]:
+        if not queries:
+            return []
+        if self._mode == "primary":
+            replica = await self._replica()
+            if replica is not None:
+                self._replica_queries += len(queries)
+                return replica.search_batch(queries, self._payload)
+            return await self._search_qdrant(queries)
+        if self._mode == "fallback":
+            try:
+                return await asyncio.wait_for(self._search_qdrant(queries), self._timeout)
+            except Exception as exc:
+                replica = await self._replica()
+                if replica is None:
+                    raise
+                logger.warning("Serving %d scheme queries from the replica: %r", len(queries), exc)
+                self._fallbacks += len(queries)
+                self._replica_queries += len(queries)
+                return replica.search_batch(queries, self._payload)
+        return await self._search_qdrant(queries)
+
+    def stats(self) -> SchemeSearchStats:
+        return SchemeSearchStats(
+            mode=self._mode,
+            replica_version=self._replica_version,
+            replica_points=self._replica_points,
+            replica_queries=self._replica_queries,
+            qdrant_queries=self._qdrant_queries,
+            fallbacks=self._fallbacks,
+        )
+
+    async def _search_qdrant(self, queries: list[SchemeQuery]) -> list[list[qdrant_models.ScoredPoint]]:
+        self._qdrant_queries += len(queries)
+        if len(queries) == 1:
+            query = queries[0]
+            return [
+                await self._qdrant.search_schemes(
+                    query_vector=query.query_vector,
+                    sparse_vector=query.sparse_vector,
+                    state=query.state,
+                    housing=query.housing,
+                    caste=query.caste,
+                    land_acres=query.land_acres,
+                    limit=query.limit,
+                    point_ids=query.point_ids,
+                    payload=query.payload,
+                )
+            ]
+        return await self._qdrant.search_schemes_batch(queries)
+
+    async def _replica(self) -> SchemeReplica | None:
+        if self._catalog is None:
+            return None
+        try:
+            replica = await self._catalog.derived(SchemeReplica.from_snapshot)
+        except Exception:
+            logger.exception("Scheme replica is unavailable")
+            return None
+        self._replica_version = replica.version
+        self._replica_points = len(replica)
+        return replica if len(replica) else None
+
+
+def _idf(document_frequency: int, documents: int) -> float:
+    return math.log((documents - document_frequency + 0.5) / (document_frequency + 0.5) + 1)
+
+
+def _as_values(value: Any) -> set[Any]:
+    if value is None:
+        return set()
+    return set(value) if isinstance(value, list) else {value}
+
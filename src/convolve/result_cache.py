@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+import hashlib
+import json
+import math
+from typing import Any, Protocol, Sequence
+
+from pydantic import TypeAdapter
+from qdrant_client.http import models as qdrant_models
+
+from convolve.cache import CacheStats, LRUCache
+from convolve.catalog import CatalogSnapshot
+from convolve.config import Settings
+from convolve.embeddings import normalize_query
+from convolve.schemas import EligibilitySignals, parse_limit
+
+
+SCHEME_HITS = TypeAdapter(list[qdrant_models.ScoredPoint])
+
+
+class ResultCacheBackend(Protocol):
+    async def get(self, key: str) -> list[qdrant_models.ScoredPoint] | None:
+        ...
+
+    async def put(self, key: str, hits: list[qdrant_models.ScoredPoint]) -> None:
+        ...
+
+    async def clear(self) -> None:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+    def stats(self) -> CacheStats:
+        ...
+
+
+class InMemoryResultCache:
+    def __init__(self, capacity: int, ttl_seconds: float | None = None) -> None:
+        self._cache: LRUCache[str, list[qdrant_models.ScoredPoint]] = LRUCache(capacity, ttl_seconds)
+
+    async def get(self, key: str) -> list[qdrant_models.ScoredPoint] | None:
+        hits = self._cache.get(key)
+        return list(hits) if hits is not None else None
+
+    async def put(self, key: str, hits: list[qdrant_models.ScoredPoint]) -> None:
+        self._cache.put(key, list(hits))
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats()
+
+
+class RedisResultCache:
+    def __init__(self, url: str, ttl_seconds: float | None = None, prefix: str = "convolve:results:") -> None:
+        try:
+            from redis import asyncio as redis
+        except ImportError as exc:
+            raise ImportError(
+                "RESULT_CACHE_BACKEND=redis needs the redis package: pip install -r requirements-redis.txt"
+            ) from exc
+
+        self._client = redis.from_url(url)
+        self._ttl = int(ttl_seconds) if ttl_seconds and ttl_seconds > 0 else None
+        self._prefix = prefix
+        self._hits = 0
+        self._misses = 0
+
+    async def get(self, key: str) -> list[qdrant_models.ScoredPoint] | None:
+        raw = await self._client.get(self._prefix + key)
+        if raw is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return SCHEME_HITS.validate_json(raw)
+
+    async def put(self, key: str, hits: list[qdrant_models.ScoredPoint]) -> None:
+        await self._client.set(self._prefix + key, SCHEME_HITS.dump_json(hits), ex=self._ttl)
+
+    async def clear(self) -> None:
+        # Other API processes may still be serving the previous catalog version; its keys
+        # simply age out through the TTL.
+        return None
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(size=0, capacity=0, hits=self._hits, misses=self._misses, evictions=0, expirations=0)
+
+
+class ResultCache:
+    def __init__(self, backend: ResultCacheBackend) -> None:
+        self._backend = backend
+        self._version: str | None = None
+
+    async def get(self, version: str, key: str) -> list[qdrant_models.ScoredPoint] | None:
+        if version != self._version:
+            # Keys embed the catalog version; dropping the old generation just frees memory early.
+            if self._version is not None:
+                await self._backend.clear()
+            self._version = version
+        return await self._backend.get(key)
+
+    async def put(self, version: str, key: str, hits: list[qdrant_models.ScoredPoint]) -> None:
+        if version == self._version:
+            await self._backend.put(key, hits)
+
+    async def close(self) -> None:
+        await self._backend.close()
+
+    def stats(self) -> CacheStats:
+        return self._backend.stats()
+
+
+def build_result_cache(settings: Settings) -> ResultCache | None:
+    if settings.result_cache_backend == "off" or settings.result_cache_size <= 0:
+        return None
+    if settings.result_cache_backend == "redis":
+        if not settings.result_cache_url:
+            raise ValueError("RESULT_CACHE_URL is required for the redis result cache")
+        return ResultCache(RedisResultCache(settings.result_cache_url, settings.result_cache_ttl_seconds))
+    if settings.result_cache_backend != "memory":
+        raise ValueError(f"Unsupported result cache backend: {settings.result_cache_backend}")
+    return ResultCache(InMemoryResultCache(settings.result_cache_size, settings.result_cache_ttl_seconds))
+
+
+def result_cache_key(
+    version: str,
+    query_text: str,
+    signals: EligibilitySignals,
+    limit: int,
+    eligible_bits: int | None = None,
+    land_limits: Sequence[float] | None = None,
+) -> str:
+    profile: dict[str, Any]
+    if eligible_bits is not None:
+        # The eligible set buckets land, income and the categorical signals exactly at the
+        # catalog's own thresholds, so every household with the same set shares one entry.
+        profile = {"eligible": f"{eligible_bits:x}"}
+    else:
+        profile = {
+            "state": signals.state,
+            "housing": signals.housing_type if signals.housing_type != "unknown" else None,
+            "caste": signals.caste,
+            "land_acres": _land_bucket(signals.land_acres, land_limits),
+        }
+    canonical = json.dumps(
+        {"version": version, "query": normalize_query(query_text), "limit": limit, **profile},
+        sort_keys=True,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def land_thresholds(snapshot: CatalogSnapshot) -> tuple[float, ...]:
+    rules = (payload.get("eligibility_rules") or {} for payload in snapshot.payloads)
+    limits = {parse_limit(rule.get("land_max_acres")) for rule in rules}
+    return tuple(sorted(limit for limit in limits if not math.isnan(limit)))
+
+
+def _land_bucket(land_acres: float | None, land_limits: Sequence[float] | None) -> float | str | None:
+    if land_acres is None or land_limits is None:
+        return land_acres
+    # The scheme filter keeps land_max_acres <= land_acres, so every household between two
+    # consecutive catalog thresholds gets the same schemes.
+    position = bisect_right(land_limits, land_acres)
+    return land_limits[position - 1] if position else "below"
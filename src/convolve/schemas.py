@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+import math
 from typing import Literal
 
 from pydantic import BaseModel, Field
@@ -8,6 +9,8 @@ from typing import Any
 
 
 HousingType = Literal["kutcha", "pucca", "unknown"]
+# Upper-bound eligibility rules; every reader parses them with parse_limit.
+LIMIT_RULES = ("land_max_acres", "income_limit")
 
 
 class EligibilitySignals(BaseModel):
@@ -17,6 +20,7 @@ class EligibilitySignals(BaseModel):
     state: str | None = None
     caste: str | None = None
     land_acres: float | None = None
+    annual_income: float | None = None
     intent: str | None = None
     notes: str | None = None
 
@@ -28,6 +32,8 @@ class EligibilitySignals(BaseModel):
             segments.append(f"caste={self.caste}")
         if self.land_acres is not None:
             segments.append(f"land_acres={self.land_acres}")
+        if self.annual_income is not None:
+            segments.append(f"annual_income={self.annual_income}")
         if self.assets:
             segments.append("assets=" + ", ".join(self.assets))
         if self.demographics:
@@ -49,6 +55,27 @@ class Scheme(BaseModel):
     source_url: str | None = None
 
 
+def parse_limit(value: Any) -> float:
+    # Hand-edited catalogs carry limits such as "150000" or "1,50,000"; anything unparseable is
+    # treated as no limit rather than failing the whole catalog build.
+    if value is None or isinstance(value, bool):
+        return math.nan
+    try:
+        return float(str(value).replace(",", "").replace("_", "").strip())
+    except ValueError:
+        return math.nan
+
+
+def numeric_limits(rules: dict[str, Any]) -> dict[str, Any]:
+    # Qdrant's range filter only matches numeric payload values, so parseable limits are stored as numbers.
+    normalized = dict(rules)
+    for key in LIMIT_RULES:
+        limit = parse_limit(rules.get(key))
+        if not math.isnan(limit):
+            normalized[key] = limit
+    return normalized
+
+
 class CaseMemory(BaseModel):
     case_id: str | None = None
     signals: EligibilitySignals
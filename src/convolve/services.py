@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from convolve.catalog import CatalogWatcher
+from convolve.collection_profiles import CollectionProfiles, collection_profile
+from convolve.compaction import CaseMemoryCompactor, CompactionPolicy, CompactionScheduler
+from convolve.config import Settings, require_qdrant_settings
+from convolve.embedding_store import DocumentEmbeddingCache
+from convolve.embeddings import EmbeddingService
+from convolve.memory import AsyncMemoryService, MemoryService, RecallPolicy
+from convolve.memory_writer import CaseMemoryWriter
+from convolve.qdrant_client import AsyncQdrantService, PayloadFields, PayloadProjections, QdrantService
+from convolve.readiness import Readiness, ReadinessCheck
+from convolve.replica import SchemeSearchRouter
+from convolve.result_cache import ResultCache, build_result_cache
+from convolve.sparse import SparseEncoder
+from convolve.vision import VisionService
+
+
+@dataclass(frozen=True)
+class ServiceContainer:
+    settings: Settings
+    client: QdrantClient
+    embedder: EmbeddingService
+    sparse_encoder: SparseEncoder
+    qdrant: QdrantService
+    memory: MemoryService
+    async_client: AsyncQdrantClient
+    async_qdrant: AsyncQdrantService
+    async_memory: AsyncMemoryService
+    vision: VisionService | None = None
+    memory_writer: CaseMemoryWriter | None = None
+    catalog: CatalogWatcher | None = None
+    scheme_search: SchemeSearchRouter | None = None
+    result_cache: ResultCache | None = None
+    compaction: CompactionScheduler | None = None
+    readiness: Readiness | None = None
+
+    async def start(self) -> None:
+        if self.memory_writer is not None:
+            await self.memory_writer.start()
+        if self.readiness is not None:
+            # The readiness checks load the replica themselves, in the background.
+            await self.readiness.start()
+        elif self.scheme_search is not None:
+            await self.scheme_search.warm_up()
+        if self.compaction is not None:
+            await self.compaction.start()
+
+    def close(self) -> None:
+        self.client.close()
+        self.embedder.close()
+
+    async def aclose(self) -> None:
+        if self.readiness is not None:
+            await self.readiness.stop()
+        if self.compaction is not None:
+            await self.compaction.stop()
+        if self.memory_writer is not None:
+            await self.memory_writer.stop()
+        if self.result_cache is not None:
+            await self.result_cache.close()
+        await self.async_client.close()
+        await self.embedder.aclose()
+        self.close()
+
+
+def build_services(
+    settings: Settings,
+    timeout: int | None = None,
+    document_cache: bool = False,
+    write_behind: bool = False,
+    compaction: bool = False,
+    readiness: bool = False,
+    client: QdrantClient | None = None,
+    async_client: AsyncQdrantClient | None = None,
+    embedder: EmbeddingService | None = None,
+    vision: VisionService | None = None,
+) -> ServiceContainer:
+    require_qdrant_settings(settings)
+    client = client or QdrantClient(
+        url=settings.qdrant_url,
+        api_key=settings.qdrant_api_key,
+        timeout=timeout,
+        prefer_grpc=settings.qdrant_prefer_grpc,
+        grpc_port=settings.qdrant_grpc_port,
+    )
+    embedder = embedder or EmbeddingService(
+        settings,
+        document_cache=build_document_cache(settings) if document_cache else None,
+    )
+    sparse_encoder = SparseEncoder()
+    profiles = build_collection_profiles(settings)
+    projections = build_payload_projections(settings)
+    qdrant = QdrantService(client, sparse_encoder=sparse_encoder, profiles=profiles, projections=projections)
+    recall = build_recall_policy(settings)
+    memory = MemoryService(qdrant, embedder, recall=recall)
+    async_client = async_client or AsyncQdrantClient(
+        url=settings.qdrant_url,
+        api_key=settings.qdrant_api_key,
+        timeout=timeout,
+        prefer_grpc=settings.qdrant_prefer_grpc,
+        grpc_port=settings.qdrant_grpc_port,
+    )
+    async_qdrant = AsyncQdrantService(
+        async_client, sparse_encoder=sparse_encoder, profiles=profiles, projections=projections
+    )
+    if vision is None and settings.vision_enabled and settings.openai_api_key:
+        vision = VisionService(settings)
+    memory_writer = None
+    if write_behind and settings.memory_write_behind:
+        memory_writer = CaseMemoryWriter(
+            async_qdrant,
+            batch_size=settings.memory_flush_batch_size,
+            flush_interval_seconds=settings.memory_flush_interval_ms / 1000,
+        )
+    result_cache = build_result_cache(settings)
+    catalog = None
+    if settings.eligibility_index or settings.scheme_replica != "off" or result_cache is not None:
+        catalog = CatalogWatcher(
+            async_qdrant,
+            refresh_interval_seconds=settings.catalog_refresh_seconds,
+            with_vectors=settings.scheme_replica != "off",
+        )
+    scheme_search = SchemeSearchRouter(
+        async_qdrant,
+        catalog=catalog,
+        mode=settings.scheme_replica,
+        qdrant_timeout_seconds=settings.scheme_search_timeout_ms / 1000,
+        projections=projections,
+    )
+    compaction_scheduler = None
+    if compaction and settings.memory_compaction_interval_seconds > 0:
+        compaction_scheduler = CompactionScheduler(
+            CaseMemoryCompactor(async_qdrant, build_compaction_policy(settings)),
+            interval_seconds=settings.memory_compaction_interval_seconds,
+        )
+    return ServiceContainer(
+        settings=settings,
+        client=client,
+        embedder=embedder,
+        sparse_encoder=sparse_encoder,
+        qdrant=qdrant,
+        memory=memory,
+        async_client=async_client,
+        async_qdrant=async_qdrant,
+        async_memory=AsyncMemoryService(async_qdrant, embedder, writer=memory_writer, recall=recall),
+        vision=vision,
+        memory_writer=memory_writer,
+        catalog=catalog,
+        scheme_search=scheme_search,
+        result_cache=result_cache,
+        compaction=compaction_scheduler,
+        readiness=build_readiness(settings, embedder, async_qdrant, scheme_search) if readiness else None,
+    )
+
+
+def build_readiness(
+    settings: Settings,
+    embedder: EmbeddingService,
+    qdrant: AsyncQdrantService,
+    scheme_search: SchemeSearchRouter | None,
+) -> Readiness:
+    async def catalog() -> str:
+        missing = await qdrant.missing_collections()
+        if missing:
+            raise RuntimeError(f"missing collections: {', '.join(missing)}; run the ingest first")
+        if scheme_search is not None:
+            await scheme_search.warm_up()
+        return "collections present"
+
+    async def model() -> str:
+        return f"{embedder.model_name()} ({await embedder.awarm_up()} dims)"
+
+    checks: dict[str, ReadinessCheck] = {"catalog": catalog}
+    # Without warm-up the model loads on the first request and /ready only checks Qdrant.
+    if settings.startup_warm_up:
+        checks["embedder"] = model
+    return Readiness(checks)
+
+
+def build_collection_profiles(settings: Settings) -> CollectionProfiles:
+    return CollectionProfiles(
+        schemes=collection_profile(settings.scheme_collection_profile),
+        memories=collection_profile(settings.memory_collection_profile),
+    )
+
+
+def build_payload_projections(settings: Settings) -> PayloadProjections:
+    # "*" restores full payloads on the scheme search path.
+    scheme_fields = () if "*" in settings.scheme_payload_fields else settings.scheme_payload_fields
+    return PayloadProjections(
+        schemes=PayloadFields(include=scheme_fields),
+        memories=PayloadFields(exclude=settings.memory_payload_exclude),
+    )
+
+
+def build_recall_policy(settings: Settings) -> RecallPolicy:
+    if settings.memory_recall_scoring not in {"server", "client"}:
+        raise ValueError(f"Unsupported memory recall scoring: {settings.memory_recall_scoring}")
+    if settings.memory_recency_half_life_days <= 0:
+        raise ValueError("MEMORY_RECENCY_HALF_LIFE_DAYS must be positive")
+    return RecallPolicy(
+        candidates=settings.memory_recall_candidates,
+        half_life_days=settings.memory_recency_half_life_days,
+        recency_weight=settings.memory_recency_weight,
+        scoring=settings.memory_recall_scoring,
+        statuses=settings.memory_recall_statuses,
+    )
+
+
+def build_compaction_policy(settings: Settings) -> CompactionPolicy:
+    if settings.memory_stale_draft_action not in {"archive", "delete", "keep"}:
+        raise ValueError(f"Unsupported stale draft action: {settings.memory_stale_draft_action}")
+    return CompactionPolicy(
+        similarity_threshold=settings.memory_dedup_threshold,
+        draft_ttl=timedelta(days=settings.memory_draft_ttl_days) if settings.memory_draft_ttl_days > 0 else None,
+        stale_draft_action=settings.memory_stale_draft_action,
+    )
+
+
+def build_document_cache(settings: Settings) -> DocumentEmbeddingCache | None:
+    if not settings.document_cache_path:
+        return None
+    return DocumentEmbeddingCache(
+        settings.document_cache_path,
+        max_entries=settings.document_cache_max_entries,
+    )
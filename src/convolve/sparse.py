@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 import hashlib
 import re
 from typing import Iterable
 
+import numpy as np
 from qdrant_client.http import models as qdrant_models
 
+from convolve.metrics import instrumented
+
 
 TOKEN_RE = re.compile(r"[a-z0-9]+")
+PARALLEL_MIN_TEXTS = 5_000
 
 
 def tokenize(text: str) -> list[str]:
@@ -21,6 +26,30 @@ def stable_hash(token: str) -> int:
     return int(digest, 16)
 
 
+class TokenIndexTable(dict[str, int]):
+    def __init__(self, vocab_size: int, max_tokens: int = 262_144) -> None:
+        super().__init__()
+        self.vocab_size = vocab_size
+        self.max_tokens = max_tokens
+
+    def __missing__(self, token: str) -> int:
+        if len(self) >= self.max_tokens:
+            self.clear()
+        index = stable_hash(token) % self.vocab_size
+        self[token] = index
+        return index
+
+
+_TOKEN_TABLES: dict[int, TokenIndexTable] = {}
+
+
+def token_table(vocab_size: int) -> TokenIndexTable:
+    table = _TOKEN_TABLES.get(vocab_size)
+    if table is None:
+        table = _TOKEN_TABLES.setdefault(vocab_size, TokenIndexTable(vocab_size))
+    return table
+
+
 def combine_texts(parts: Iterable[str]) -> str:
     return " ".join(part for part in parts if part)
 
@@ -30,15 +59,13 @@ class SparseEncoder:
     vocab_size: int = 20000
     max_terms: int = 128
 
+    @instrumented("sparse")
     def encode(self, text: str) -> qdrant_models.SparseVector:
         tokens = tokenize(text)
         if not tokens:
             return qdrant_models.SparseVector(indices=[], values=[])
 
-        hashed_counts: Counter[int] = Counter()
-        for token in tokens:
-            index = stable_hash(token) % self.vocab_size
-            hashed_counts[index] += 1
+        hashed_counts: Counter[int] = Counter(map(token_table(self.vocab_size).__getitem__, tokens))
 
         most_common = hashed_counts.most_common(self.max_terms)
         max_count = most_common[0][1]
@@ -51,5 +78,58 @@ class SparseEncoder:
 
         return qdrant_models.SparseVector(indices=indices, values=values)
 
-    def encode_batch(self, texts: Iterable[str]) -> list[qdrant_models.SparseVector]:
-        return [self.encode(text) for text in texts]
\ No newline at end of file
+    @instrumented("sparse")
+    def encode_batch(
+        self,
+        texts: Iterable[str],
+        processes: int | None = None,
+    ) -> list[qdrant_models.SparseVector]:
+        texts = list(texts)
+        if processes and processes > 1 and len(texts) >= PARALLEL_MIN_TEXTS:
+            chunk_size = -(-len(texts) // processes)
+            chunks = [texts[start : start + chunk_size] for start in range(0, len(texts), chunk_size)]
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                encoded = [pair for part in pool.map(self._encode_arrays, chunks) for pair in part]
+        else:
+            encoded = self._encode_arrays(texts)
+        return [
+            qdrant_models.SparseVector(indices=indices, values=values)
+            for indices, values in encoded
+        ]
+
+    def _encode_arrays(self, texts: list[str]) -> list[tuple[list[int], list[float]]]:
+        lookup = token_table(self.vocab_size).__getitem__
+        token_indices: list[int] = []
+        lengths: list[int] = []
+        for text in texts:
+            tokens = tokenize(text)
+            token_indices.extend(map(lookup, tokens))
+            lengths.append(len(tokens))
+
+        encoded: list[tuple[list[int], list[float]]] = [([], []) for _ in texts]
+        if not token_indices:
+            return encoded
+
+        doc_ids = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        keys = doc_ids * self.vocab_size + np.asarray(token_indices, dtype=np.int64)
+        unique_keys, first_seen, counts = np.unique(keys, return_index=True, return_counts=True)
+        unique_docs = unique_keys // self.vocab_size
+
+        # Counter.most_common orders ties by first occurrence, so sort on that too.
+        order = np.lexsort((first_seen, -counts, unique_docs))
+        sorted_docs = unique_docs[order]
+        sorted_indices = (unique_keys % self.vocab_size)[order]
+        sorted_counts = counts[order]
+        starts = np.searchsorted(sorted_docs, np.arange(len(texts)), side="left")
+        ends = np.searchsorted(sorted_docs, np.arange(len(texts)), side="right")
+
+        for doc, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+            if start == end:
+                continue
+            end = min(end, start + self.max_terms)
+            doc_counts = sorted_counts[start:end]
+            encoded[doc] = (
+                sorted_indices[start:end].tolist(),
+                (doc_counts / doc_counts[0]).tolist(),
+            )
+        return encoded
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import random
+from typing import Iterator, Sequence, TypeVar
+
+import numpy as np
+
+from convolve.schemas import CaseMemory, EligibilitySignals, HousingType, Scheme
+
+
+T = TypeVar("T")
+
+# Rough population shares, so state filters hit realistic fractions of the catalog.
+STATE_WEIGHTS = {
+    "Uttar Pradesh": 16.5,
+    "Maharashtra": 9.3,
+    "Bihar": 8.6,
+    "West Bengal": 7.5,
+    "Madhya Pradesh": 6.0,
+    "Tamil Nadu": 6.0,
+    "Rajasthan": 5.7,
+    "Karnataka": 5.0,
+    "Gujarat": 5.0,
+    "Andhra Pradesh": 4.1,
+    "Odisha": 3.5,
+    "Telangana": 2.9,
+    "Kerala": 2.8,
+    "Jharkhand": 2.7,
+    "Assam": 2.6,
+    "Punjab": 2.3,
+    "Chhattisgarh": 2.1,
+    "Haryana": 2.1,
+}
+CASTE_WEIGHTS = {"General": 30.0, "OBC": 41.0, "SC": 19.0, "ST": 9.0, "Other": 1.0}
+HOUSING_WEIGHTS: dict[HousingType, float] = {"kutcha": 30.0, "pucca": 60.0, "unknown": 10.0}
+ASSETS = ["car", "tractor", "motorcycle", "refrigerator", "television", "smartphone", "livestock"]
+DEMOGRAPHICS = ["elderly female present", "school-age children", "person with disability", "widow"]
+INTENTS = [
+    "housing assistance",
+    "support for distressed farmers",
+    "pension for elderly parents",
+    "cooking gas connection",
+    "scholarship for children",
+    "crop insurance",
+    "bank account and credit",
+    "health insurance for family",
+]
+TOPICS = {
+    "housing": "Housing assistance for rural households without permanent pucca houses.",
+    "farming": "Income support and crop insurance for small and marginal farmers.",
+    "pension": "Monthly pension support for elderly, widowed and disabled citizens.",
+    "energy": "Subsidized LPG and electricity connections for low-income households.",
+    "education": "Scholarships and school supplies for children from vulnerable families.",
+    "credit": "Bank accounts, micro-credit and financial inclusion for the unbanked.",
+    "health": "Cashless hospital treatment and health insurance for poor families.",
+    "skills": "Vocational training and placement support for rural youth.",
+}
+STATUSES = ["draft", "submitted", "approved", "rejected"]
+
+
+def weighted_choice(rng: random.Random, weights: dict[T, float]) -> T:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def synthetic_land_acres(rng: random.Random) -> float:
+    # Most holdings are marginal; a lognormal with a long tail matches the census shape.
+    return round(min(rng.lognormvariate(0.3, 0.9), 60.0), 2)
+
+
+def synthetic_income(rng: random.Random) -> float:
+    return round(min(rng.lognormvariate(11.4, 0.7), 5_000_000.0), -2)
+
+
+def synthetic_schemes(count: int, seed: int = 7) -> Iterator[Scheme]:
+    rng = random.Random(seed)
+    topics = list(TOPICS)
+    for number in range(count):
+        topic = rng.choice(topics)
+        central = rng.random() < 0.35
+        states = ["All"] if central else [weighted_choice(rng, STATE_WEIGHTS)]
+        rules: dict[str, object] = {}
+        if rng.random() < 0.3:
+            rules["housing"] = "kutcha"
+        if rng.random() < 0.2:
+            rules["caste"] = weighted_choice(rng, {"SC": 2.0, "ST": 1.0, "OBC": 1.0})
+        if rng.random() < 0.35:
+            rules["land_max_acres"] = rng.choice([1, 2, 2.5, 5, 10])
+        if rng.random() < 0.5:
+            rules["income_limit"] = rng.choice([100_000, 120_000, 150_000, 200_000, 300_000, 800_000])
+        if rng.random() < 0.2:
+            rules["assets_excluded"] = rng.sample(["car", "tractor", "refrigerator"], k=rng.randint(1, 2))
+        if rng.random() < 0.15:
+            rules["demographics_required"] = [rng.choice(DEMOGRAPHICS)]
+        region = states[0] if not central else "India"
+        yield Scheme(
+            scheme_id=f"synthetic-{seed}-{number}",
+            scheme_name=f"{region} {topic.title()} Scheme {number}",
+            description=f"{TOPICS[topic]} Variant {number} for {region}.",
+            states=states,
+            eligibility_rules=rules,
+            benefits=f"Benefit package {rng.randint(1, 50)} for {topic} needs",
+        )
+
+
+def synthetic_signals(rng: random.Random) -> EligibilitySignals:
+    return EligibilitySignals(
+        housing_type=weighted_choice(rng, HOUSING_WEIGHTS),
+        assets=rng.sample(ASSETS, k=rng.randint(0, 3)),
+        demographics=rng.sample(DEMOGRAPHICS, k=rng.randint(0, 2)),
+        state=weighted_choice(rng, STATE_WEIGHTS),
+        caste=weighted_choice(rng, CASTE_WEIGHTS),
+        land_acres=synthetic_land_acres(rng) if rng.random() < 0.7 else None,
+        annual_income=synthetic_income(rng) if rng.random() < 0.6 else None,
+        intent=rng.choice(INTENTS),
+    )
+
+
+def synthetic_households(count: int, seed: int = 11) -> Iterator[EligibilitySignals]:
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield synthetic_signals(rng)
+
+
+def synthetic_case_memories(
+    count: int,
+    seed: int = 13,
+    scheme_ids: Sequence[str] = (),
+) -> Iterator[CaseMemory]:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    for _ in range(count):
+        signals = synthetic_signals(rng)
+        created_at = now - timedelta(days=rng.expovariate(1 / 45))
+        retrieved = rng.sample(list(scheme_ids), k=min(3, len(scheme_ids))) if scheme_ids else []
+        status = rng.choice(STATUSES)
+        yield CaseMemory(
+            signals=signals,
+            query_intent=signals.intent or "",
+            retrieved_scheme_ids=retrieved,
+            chosen_scheme_id=retrieved[0] if retrieved and status != "draft" else None,
+            status=status,
+            feedback_score=round(rng.random(), 2) if status in ("approved", "rejected") else None,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+
+def random_unit_vectors(count: int, dimension: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((count, dimension), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
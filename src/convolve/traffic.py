@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+import json
+from pathlib import Path
+import random
+import re
+import threading
+from time import monotonic
+from typing import Any, Awaitable, Callable, Iterator, MutableMapping
+
+from convolve.synthetic import STATUSES, synthetic_households
+
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+ANALYZE_PATH = "/analyze"
+MEMORY_PATH = re.compile(r"^/memory/(?P<case_id>[^/]+)$")
+
+
+@dataclass(frozen=True)
+class RecordedRequest:
+    offset_ms: float
+    method: str
+    path: str
+    body: dict[str, Any] | None
+    case_ref: int | None = None
+    memory_id: str | None = None
+    status: int | None = None
+    latency_ms: float | None = None
+
+    @property
+    def endpoint(self) -> str:
+        if MEMORY_PATH.match(self.path):
+            return f"{self.method} /memory/{{case_id}}"
+        return f"{self.method} {self.path}"
+
+
+class TrafficRecorder:
+    def __init__(self, app: ASGIApp, path: str | Path, record_images: bool = False) -> None:
+        self._app = app
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._record_images = record_images
+        self._lock = threading.Lock()
+        self._started = monotonic()
+        self._count = 0
+        self._refs: dict[str, int] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] != "http" or scope.get("method") != "POST" or not _recordable(path):
+            await self._app(scope, receive, send)
+            return
+
+        started = monotonic()
+        chunks: list[bytes] = []
+        response_chunks: list[bytes] = []
+        status: int | None = None
+
+        async def recording_receive() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                chunks.append(message.get("body", b""))
+            return message
+
+        async def recording_send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and path == ANALYZE_PATH:
+                response_chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self._app(scope, recording_receive, recording_send)
+        finally:
+            self._write(path, started, b"".join(chunks), b"".join(response_chunks), status)
+
+    def _write(self, path: str, started: float, body: bytes, response: bytes, status: int | None) -> None:
+        payload = _json_or_none(body)
+        if isinstance(payload, dict) and payload.get("image_base64") and not self._record_images:
+            # Household photos are personal data; replays substitute a placeholder image.
+            payload = {**payload, "image_base64": None, "image_redacted": True}
+        memory_id = None
+        case_ref = None
+        if path == ANALYZE_PATH:
+            response_payload = _json_or_none(response)
+            if isinstance(response_payload, dict):
+                memory_id = response_payload.get("memory_id")
+        else:
+            match = MEMORY_PATH.match(path)
+            if match is not None:
+                case_ref = self._refs.get(match.group("case_id"))
+        with self._lock:
+            record = RecordedRequest(
+                offset_ms=round((started - self._started) * 1000, 3),
+                method="POST",
+                path=path,
+                body=payload,
+                case_ref=case_ref,
+                memory_id=memory_id,
+                status=status,
+                latency_ms=round((monotonic() - started) * 1000, 3),
+            )
+            if memory_id is not None:
+                self._refs[memory_id] = self._count
+            self._count += 1
+            with self._path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(asdict(record)) + "\n")
+
+
+def read_traffic(path: Path) -> list[RecordedRequest]:
+    with path.open("r", encoding="utf-8") as handle:
+        return [RecordedRequest(**json.loads(line)) for line in handle if line.strip()]
+
+
+def write_traffic(path: Path, records: list[RecordedRequest]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as handle:
+        for record in records:
+            handle.write(json.dumps(asdict(record)) + "\n")
+
+
+def synthesize_traffic(
+    count: int,
+    seed: int = 17,
+    memory_update_ratio: float = 0.2,
+    vision_ratio: float = 0.1,
+    rate: float = 10.0,
+) -> list[RecordedRequest]:
+    rng = random.Random(seed)
+    households: Iterator[Any] = synthetic_households(count, seed=seed)
+    records: list[RecordedRequest] = []
+    analyzed: list[int] = []
+    offset = 0.0
+    for _ in range(count):
+        offset += rng.expovariate(rate) * 1000
+        if analyzed and rng.random() < memory_update_ratio:
+            status = rng.choice(STATUSES[1:])
+            records.append(
+                RecordedRequest(
+                    offset_ms=round(offset, 3),
+                    method="POST",
+                    path="/memory/{case_id}",
+                    body={"status": status, "feedback_score": round(rng.random(), 2)},
+                    case_ref=rng.choice(analyzed[-50:]),
+                )
+            )
+            continue
+        signals = next(households)
+        body: dict[str, Any] = {
+            "state": signals.state,
+            "caste": signals.caste,
+            "land_acres": signals.land_acres,
+            "annual_income": signals.annual_income,
+            "housing_type": signals.housing_type,
+            "assets": signals.assets,
+            "demographics": signals.demographics,
+            "intent": signals.intent,
+        }
+        if rng.random() < vision_ratio:
+            body.update(use_vision=True, image_base64=None, image_redacted=True)
+        analyzed.append(len(records))
+        records.append(RecordedRequest(offset_ms=round(offset, 3), method="POST", path=ANALYZE_PATH, body=body))
+    return records
+
+
+def _recordable(path: str) -> bool:
+    return path == ANALYZE_PATH or MEMORY_PATH.match(path) is not None
+
+
+def _json_or_none(raw: bytes) -> Any:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
@@ -1,22 +1,84 @@
 from __future__ import annotations
 
+import asyncio
 import base64
-from typing import Any
-
-from openai import OpenAI
+from typing import TYPE_CHECKING, Any
 
+from convolve.cache import CacheStats, LRUCache
 from convolve.config import Settings
+from convolve.imaging import PreparedImage, prepare_image
+from convolve.metrics import instrumented
 from convolve.schemas import EligibilitySignals
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
 
 class VisionService:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        client: OpenAI | None = None,
+        async_client: AsyncOpenAI | None = None,
+    ) -> None:
         self._settings = settings
-        if not settings.openai_api_key:
+        if client is None and not settings.openai_api_key:
             raise ValueError("OPENAI_API_KEY is required for vision extraction")
-        self._client = OpenAI(api_key=settings.openai_api_key)
+        # The OpenAI SDK is imported on first use; most API requests never call vision.
+        self._client = client
+        self._async_client = async_client
+        self._cache: LRUCache[tuple[str, str], EligibilitySignals] = LRUCache(
+            settings.vision_cache_size,
+            ttl_seconds=settings.vision_cache_ttl_seconds,
+        )
 
+    @instrumented("vision")
     def extract_signals(self, image_bytes: bytes, hints: dict[str, Any] | None = None) -> EligibilitySignals:
+        image = self.prepare(image_bytes)
+        key = (image.perceptual_hash, _hints_key(hints))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached.model_copy(deep=True)
+        if self._client is None:
+            from openai import OpenAI
+
+            self._client = OpenAI(api_key=self._settings.openai_api_key)
+        response = self._client.responses.create(**self._build_request(image, hints))
+        signals = EligibilitySignals.model_validate_json(response.output_text)
+        self._cache.put(key, signals.model_copy(deep=True))
+        return signals
+
+    @instrumented("vision")
+    async def aextract_signals(
+        self, image_bytes: bytes, hints: dict[str, Any] | None = None
+    ) -> EligibilitySignals:
+        image = await asyncio.to_thread(self.prepare, image_bytes)
+        key = (image.perceptual_hash, _hints_key(hints))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached.model_copy(deep=True)
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+
+            self._async_client = AsyncOpenAI(api_key=self._settings.openai_api_key)
+        response = await self._async_client.responses.create(**self._build_request(image, hints))
+        signals = EligibilitySignals.model_validate_json(response.output_text)
+        self._cache.put(key, signals.model_copy(deep=True))
+        return signals
+
+    @instrumented("vision")
+    def prepare(self, image_bytes: bytes) -> PreparedImage:
+        return prepare_image(
+            image_bytes,
+            max_edge=self._settings.vision_max_edge,
+            quality=self._settings.vision_image_quality,
+            image_format=self._settings.vision_image_format,
+        )
+
+    def cache_stats(self) -> CacheStats:
+        return self._cache.stats()
+
+    def _build_request(self, image: PreparedImage, hints: dict[str, Any] | None) -> dict[str, Any]:
         prompt = (
             "Analyze this image for Indian government welfare eligibility. "
             "Return JSON with keys: housing_type (kutcha/pucca/unknown), assets (list), "
@@ -25,9 +87,9 @@ class VisionService:
         if hints:
             prompt += f"\nHints: {hints}"
 
-        response = self._client.responses.create(
-            model="gpt-4o-mini",
-            input=[
+        return {
+            "model": "gpt-4o-mini",
+            "input": [
                 {
                     "role": "user",
                     "content": [
@@ -35,16 +97,13 @@ class VisionService:
                         {
                             "type": "input_image",
                             "image_url": {
-                                "url": "data:image/jpeg;base64," + base64.b64encode(image_bytes).decode("utf-8")
+                                "url": f"data:{image.mime_type};base64," + base64.b64encode(image.data).decode("utf-8")
                             },
                         },
                     ],
                 }
             ],
-        )
-
-        content = response.output_text
-        return EligibilitySignals.model_validate_json(content)
+        }
 
 
 def fallback_signals() -> EligibilitySignals:
@@ -53,4 +112,10 @@ def fallback_signals() -> EligibilitySignals:
         assets=[],
         demographics=[],
         notes="Fallback signals (no vision API).",
-    )
\ No newline at end of file
+    )
+
+
+def _hints_key(hints: dict[str, Any] | None) -> str:
+    if not hints:
+        return ""
+    return repr(sorted((key, value) for key, value in hints.items() if value is not None))
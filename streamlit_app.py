@@ -7,7 +7,8 @@ import streamlit as st
 from gtts import gTTS
 
 from convolve.chains import run_retrieval_pipeline
-from convolve.config import load_settings, require_qdrant_settings
+from convolve.config import Settings, load_settings, require_qdrant_settings
+from convolve.services import ServiceContainer, build_services
 from convolve.vision import VisionService, fallback_signals
 
 
@@ -19,6 +20,12 @@ st.caption("AI assistant for welfare scheme eligibility using Qdrant + multimoda
 settings = load_settings()
 require_qdrant_settings(settings)
 
+
+@st.cache_resource
+def get_services(_settings: Settings) -> ServiceContainer:
+    return build_services(_settings)
+
+
 st.sidebar.header("Inputs")
 state = st.sidebar.text_input("State", value="Rajasthan")
 caste = st.sidebar.text_input("Caste", value="SC")
@@ -58,7 +65,7 @@ if st.button("Analyze and Match"):
     signals.demographics = [item.strip() for item in demographics.split(",") if item.strip()]
     signals.intent = query_intent
 
-    result = run_retrieval_pipeline(settings, signals, query_intent=query_intent)
+    result = run_retrieval_pipeline(get_services(settings), signals, query_intent=query_intent)
 
     st.subheader("Extracted Signals")
     st.json(json.loads(signals.model_dump_json()))
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# Same layout scripts/run_api.py sets up: the package lives in src/ and the stub backends in scripts/.
+for path in (PROJECT_ROOT / "src", PROJECT_ROOT / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models as qdrant_models
+
+from convolve.compaction import CaseMemoryCompactor, CompactionPolicy
+from convolve.qdrant_client import AsyncQdrantService, QdrantCollections
+from convolve.schemas import CaseMemory, EligibilitySignals
+
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+COLLECTIONS = QdrantCollections()
+FARMER = EligibilitySignals(state="Bihar", caste="SC", land_acres=1.0, annual_income=90_000, housing_type="kutcha")
+
+
+def case_id(number: int) -> str:
+    return f"00000000-0000-0000-0000-{number:012d}"
+
+
+def memory(
+    number: int,
+    age: timedelta,
+    status: str = "draft",
+    signals: EligibilitySignals = FARMER,
+    intent: str = "housing support",
+) -> CaseMemory:
+    return CaseMemory(
+        case_id=case_id(number),
+        signals=signals,
+        query_intent=intent,
+        retrieved_scheme_ids=[f"scheme-{number}"],
+        status=status,
+        created_at=NOW - age,
+        updated_at=NOW - age,
+    )
+
+
+CASES = [
+    # Three near-identical drafts of one household; the oldest survives.
+    (memory(1, timedelta(days=10)), [1.0, 0.0, 0.0, 0.0]),
+    (memory(2, timedelta(days=5)), [1.0, 0.01, 0.0, 0.0]),
+    (memory(3, timedelta(days=3)), [1.0, 0.0, 0.01, 0.0]),
+    # Same vector but a different state, and a draft too young to compact.
+    (memory(4, timedelta(days=4), signals=FARMER.model_copy(update={"state": "Kerala"})), [1.0, 0.0, 0.0, 0.01]),
+    (memory(5, timedelta(hours=2)), [1.0, 0.005, 0.0, 0.0]),
+    # Stale drafts expire; a stale submitted case carries an outcome and stays.
+    (memory(6, timedelta(days=200), intent="pension"), [0.0, 1.0, 0.0, 0.0]),
+    (memory(7, timedelta(days=150), intent="scholarship"), [0.0, 0.0, 1.0, 0.0]),
+    (memory(8, timedelta(days=300), status="submitted", intent="gas"), [0.0, 0.0, 0.0, 1.0]),
+]
+
+
+async def seeded_service() -> AsyncQdrantService:
+    client = AsyncQdrantClient(":memory:")
+    await client.create_collection(
+        COLLECTIONS.memories,
+        vectors_config=qdrant_models.VectorParams(size=4, distance=qdrant_models.Distance.COSINE),
+    )
+    service = AsyncQdrantService(client)
+    await service.upsert_case_memories([case for case, _ in CASES], [vector for _, vector in CASES])
+    return service
+
+
+async def stored(service: AsyncQdrantService, collection: str) -> dict[str, dict]:
+    records, _ = await service._client.scroll(collection, limit=100)
+    return {str(record.id): record.payload or {} for record in records}
+
+
+def compactor(service: AsyncQdrantService, tmp_path: Path, page_size: int = 256) -> CaseMemoryCompactor:
+    policy = CompactionPolicy(draft_ttl=timedelta(days=90), stale_draft_action="archive", page_size=page_size)
+    return CaseMemoryCompactor(service, policy, checkpoint_path=tmp_path / "checkpoint.json")
+
+
+def test_merges_duplicates_and_archives_stale_drafts(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        service = await seeded_service()
+        preview = await compactor(service, tmp_path).run(dry_run=True, now=NOW)
+        assert (preview.expired, preview.merged) == (2, 2)
+        assert len(await stored(service, COLLECTIONS.memories)) == len(CASES)
+
+        report = await compactor(service, tmp_path).run(now=NOW)
+
+        assert report.expired == 2
+        assert sorted(report.merges) == [(case_id(2), case_id(1)), (case_id(3), case_id(1))]
+        assert report.survivors == 1
+        assert report.watermark == (NOW - timedelta(days=1)).isoformat()
+        remaining = await stored(service, COLLECTIONS.memories)
+        assert sorted(remaining) == [case_id(1), case_id(4), case_id(5), case_id(8)]
+        survivor = remaining[case_id(1)]
+        assert sorted(survivor["merged_case_ids"]) == [case_id(2), case_id(3)]
+        assert survivor["duplicate_count"] == 3
+        assert survivor["retrieved_scheme_ids"] == ["scheme-1", "scheme-2", "scheme-3"]
+        assert survivor["created_at"] == (NOW - timedelta(days=10)).isoformat()
+        assert survivor["updated_at"] == (NOW - timedelta(days=3)).isoformat()
+        assert sorted(await stored(service, COLLECTIONS.memory_archive)) == [case_id(6), case_id(7)]
+        assert await service.find_merged_case(case_id(3)) == case_id(1)
+
+        # The watermark makes the next run skip drafts it has already compared.
+        again = await compactor(service, tmp_path).run(now=NOW)
+        assert (again.scanned, again.merged, again.expired) == (0, 0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_page_budget_applies_to_each_phase(tmp_path: Path) -> None:
+    async def scenario() -> None:
+        service = await seeded_service()
+
+        report = await compactor(service, tmp_path, page_size=1).run(max_pages=1, now=NOW)
+
+        # Expiry used its whole budget, yet merging still scanned a page of its own.
+        assert report.expired == 1
+        assert report.scanned == 1
+        assert report.pages == 2
+        assert report.watermark is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Any
+
+from convolve.eligibility_index import EligibilityIndex
+from convolve.eligibility_rules import RuleBook
+from convolve.schemas import EligibilitySignals
+
+
+def scheme(**rules: Any) -> dict[str, Any]:
+    return {"states": ["All"], "eligibility_rules": rules}
+
+
+PAYLOADS = {
+    "formatted": scheme(income_limit="1,50,000"),
+    "numeric": scheme(income_limit=150_000),
+    "plain_string": scheme(income_limit="200000", land_max_acres="2.5"),
+    "unparseable": scheme(income_limit="means tested"),
+    "none": scheme(),
+}
+
+
+def build() -> tuple[EligibilityIndex, RuleBook]:
+    point_ids, payloads = list(PAYLOADS), list(PAYLOADS.values())
+    return EligibilityIndex("v", point_ids, payloads), RuleBook("v", point_ids, payloads)
+
+
+def test_index_builds_from_string_limits() -> None:
+    index, _ = build()
+
+    assert set(index.eligible_point_ids(EligibilitySignals(annual_income=150_000))) == set(PAYLOADS)
+    assert set(index.eligible_point_ids(EligibilitySignals(annual_income=160_000))) == {
+        "plain_string",
+        "unparseable",
+        "none",
+    }
+    assert set(index.eligible_point_ids(EligibilitySignals(land_acres=3))) == set(PAYLOADS) - {"plain_string"}
+
+
+def test_index_agrees_with_rule_book_on_limits() -> None:
+    index, book = build()
+    for signals in (
+        EligibilitySignals(annual_income=150_000),
+        EligibilitySignals(annual_income=175_000, land_acres=2.5),
+        EligibilitySignals(annual_income=250_000, land_acres=1),
+    ):
+        evaluations = book.evaluate(signals, list(PAYLOADS))
+        not_failed = {evaluation.point_id for evaluation in evaluations if evaluation and not evaluation.failed}
+        assert set(index.eligible_point_ids(signals)) == not_failed
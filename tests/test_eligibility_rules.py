@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from convolve.eligibility_rules import RuleBook, evaluate_payload
+from convolve.schemas import EligibilitySignals
+
+
+def scheme(states: list[str], **rules: Any) -> dict[str, Any]:
+    return {"scheme_id": "", "scheme_name": "", "states": states, "eligibility_rules": rules}
+
+
+PAYLOADS = {
+    "national": scheme(["All"], income_limit="1,50,000"),
+    "bihar_housing": scheme(["Bihar"], housing=["kutcha"], land_max_acres=2),
+    "kerala_only": scheme(["Kerala"], income_limit=500_000),
+    "income_just_over": scheme(["All"], income_limit=190_000),
+    "income_far_over": scheme(["All"], income_limit=50_000),
+    "land_over": scheme(["Bihar"], land_max_acres=1),
+    "two_failures": scheme(["All"], income_limit=100_000, land_max_acres=1),
+    "no_tractor": scheme(["All"], assets_excluded=["Tractor"]),
+    "widows": scheme(["All"], demographics_required=["widow"], caste=["SC", "ST"]),
+}
+
+
+@pytest.fixture
+def book() -> RuleBook:
+    return RuleBook.from_payloads(list(PAYLOADS), list(PAYLOADS.values()))
+
+
+def evaluate(book: RuleBook, signals: EligibilitySignals, point_id: str):
+    evaluation = book.evaluate(signals, [point_id])[0]
+    assert evaluation is not None
+    return evaluation
+
+
+def test_all_states_scheme_matches_any_state_and_string_income_limit_is_numeric(book: RuleBook) -> None:
+    within = evaluate(book, EligibilitySignals(state="Goa", annual_income=120_000), "national")
+    over = evaluate(book, EligibilitySignals(state="Goa", annual_income=160_000), "national")
+
+    assert within.rules["state"].status == "pass"
+    assert evaluate(book, EligibilitySignals(state="Goa"), "kerala_only").failed == ["state"]
+    assert within.rules["annual_income"].status == "pass"
+    assert within.rules["annual_income"].rule == "1,50,000"
+    assert within.eligible is True
+    assert over.failed == ["annual_income"]
+    assert over.eligible is False
+
+
+def test_unknown_signals_leave_eligibility_undecided(book: RuleBook) -> None:
+    evaluation = evaluate(book, EligibilitySignals(state="Bihar"), "bihar_housing")
+
+    assert evaluation.rules["state"].status == "pass"
+    assert evaluation.unknown == ["housing", "land_acres"]
+    assert evaluation.failed == []
+    assert evaluation.eligible is None
+
+
+def test_set_rules_normalize_values(book: RuleBook) -> None:
+    signals = EligibilitySignals(assets=[" tractor "], demographics=["Widow"], caste="sc")
+
+    assert evaluate(book, signals, "no_tractor").failed == ["assets"]
+    assert evaluate(book, signals, "widows").eligible is True
+    assert evaluate(book, EligibilitySignals(caste="sc"), "widows").unknown == ["demographics"]
+
+
+def test_evaluate_preserves_order_and_skips_unknown_points(book: RuleBook) -> None:
+    results = book.evaluate(EligibilitySignals(), ["widows", "missing", "national"])
+
+    assert [result.point_id if result else None for result in results] == ["widows", None, "national"]
+
+
+def test_near_misses_rank_single_failed_limit_by_relative_gap(book: RuleBook) -> None:
+    signals = EligibilitySignals(state="Bihar", annual_income=200_000, land_acres=1.5, housing_type="kutcha")
+
+    misses = book.near_misses(signals, limit=10)
+
+    # kerala_only fails only on state, which a household cannot change; two_failures misses twice.
+    assert [miss.point_id for miss in misses] == ["income_just_over", "national", "land_over", "income_far_over"]
+    assert [miss.failed for miss in misses] == [["annual_income"], ["annual_income"], ["land_acres"], ["annual_income"]]
+    assert misses[0].gap == pytest.approx(10_000 / 190_000)
+    assert misses[2].gap == pytest.approx(0.5)
+    assert misses[3].gap == pytest.approx(3.0)
+
+
+def test_near_misses_honour_exclude_and_limit(book: RuleBook) -> None:
+    signals = EligibilitySignals(state="Bihar", annual_income=200_000, land_acres=1.5, housing_type="kutcha")
+
+    misses = book.near_misses(signals, exclude={"income_just_over", "unknown-id"}, limit=2)
+
+    assert [miss.point_id for miss in misses] == ["national", "land_over"]
+    assert book.near_misses(signals, limit=0) == []
+
+
+def test_state_only_failures_are_not_near_misses() -> None:
+    book = RuleBook.from_payloads(["kerala"], [scheme(["Kerala"], income_limit=500_000)])
+
+    assert book.near_misses(EligibilitySignals(state="Bihar", annual_income=100_000)) == []
+    assert evaluate(book, EligibilitySignals(state="Bihar"), "kerala").failed == ["state"]
+
+
+def test_evaluate_payload_matches_the_catalog_book(book: RuleBook) -> None:
+    signals = EligibilitySignals(state="Bihar", annual_income=160_000, land_acres=1.5)
+
+    for point_id, payload in PAYLOADS.items():
+        assert evaluate_payload(signals, point_id, payload) == evaluate(book, signals, point_id)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from convolve.config import Settings
+from convolve.embedding_batcher import BatchRunner, EmbeddingBatcher
+from convolve.embeddings import EmbeddingService
+
+
+SETTINGS = Settings(
+    openai_api_key=None,
+    qdrant_url=":memory:",
+    qdrant_api_key="test",
+    embedding_backend="stub",
+    embedding_batch_window_ms=20.0,
+)
+
+
+def vector(text: str) -> list[float]:
+    return [float(len(text)), float(text.rsplit(" ", 1)[-1])]
+
+
+class RecordingBackend:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return [vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class RecordingEmbeddingService(EmbeddingService):
+    def __init__(self, settings: Settings) -> None:
+        super().__init__(settings)
+        self.backend = RecordingBackend()
+
+    def model_name(self) -> str:
+        return "recording"
+
+    def _get_backend(self) -> RecordingBackend:
+        return self.backend
+
+
+def blocked_runner() -> tuple[asyncio.Event, list[list[str]], BatchRunner]:
+    release = asyncio.Event()
+    batches: list[list[str]] = []
+
+    async def run(texts: list[str]) -> list[list[float]]:
+        batches.append(list(texts))
+        await release.wait()
+        return [vector(text) for text in texts]
+
+    return release, batches, run
+
+
+@pytest.fixture
+def api(monkeypatch: pytest.MonkeyPatch):
+    # convolve.api validates Qdrant settings at import time; these tests never dial out.
+    monkeypatch.setenv("QDRANT_URL", ":memory:")
+    monkeypatch.setenv("QDRANT_API_KEY", "test")
+    from convolve import api
+
+    yield api
+    api.app.dependency_overrides.clear()
+
+
+def test_concurrent_queries_share_one_backend_call() -> None:
+    async def scenario() -> None:
+        service = RecordingEmbeddingService(SETTINGS)
+        texts = [f"household {number}" for number in range(8)] + ["household 3"]
+        try:
+            vectors = await asyncio.gather(*(service.aembed_query(text) for text in texts))
+        finally:
+            await service.aclose()
+
+        assert vectors == [vector(text) for text in texts]
+        # The duplicate rides along in the same row as its first occurrence.
+        assert service.backend.calls == [texts[:8]]
+        stats = service.batcher_stats()
+        assert (stats.batches, stats.texts, stats.max_batch) == (1, 8, 8)
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_returns_503(api) -> None:
+    async def scenario() -> None:
+        release, _, run = blocked_runner()
+        batcher = EmbeddingBatcher(run, window_seconds=0, max_batch_size=1, max_queue_size=1)
+        # One text holds the only slot, one waits for it in the collector and one sits in the queue.
+        waiting = []
+        for number in range(3):
+            waiting.append(asyncio.create_task(batcher.embed(f"household {number}")))
+            await asyncio.sleep(0.01)
+        assert batcher.stats().queue_depth == 1
+
+        services = SimpleNamespace(async_qdrant=None, embedder=SimpleNamespace(aembed_query=batcher.embed))
+        api.app.dependency_overrides[api.get_services] = lambda: services
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/demo/filter-stress", json={"query_text": "housing 9"})
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+        assert "embedding queue is full" in response.json()["detail"]
+        assert batcher.stats().rejected == 1
+        release.set()
+        assert await asyncio.gather(*waiting) == [vector(f"household {number}") for number in range(3)]
+        await batcher.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_waits_for_in_flight_batches() -> None:
+    async def scenario() -> None:
+        release, batches, run = blocked_runner()
+        batcher = EmbeddingBatcher(run, window_seconds=0, max_batch_size=2)
+        in_flight = [asyncio.create_task(batcher.embed(f"household {number}")) for number in range(2)]
+        await asyncio.sleep(0.01)
+        assert batches == [["household 0", "household 1"]]
+
+        # The collector is idle on the empty queue when it is cancelled.
+        stopping = asyncio.create_task(batcher.stop())
+        await asyncio.sleep(0.01)
+        assert not stopping.done()
+        release.set()
+        await stopping
+
+        assert await asyncio.gather(*in_flight) == [vector("household 0"), vector("household 1")]
+        assert batcher.stats().in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_stop_fails_undispatched_texts() -> None:
+    async def scenario() -> None:
+        release, batches, run = blocked_runner()
+        batcher = EmbeddingBatcher(run, window_seconds=0, max_batch_size=1)
+        in_flight = asyncio.create_task(batcher.embed("household 0"))
+        await asyncio.sleep(0.01)
+        waiting = asyncio.create_task(batcher.embed("household 1"))
+        await asyncio.sleep(0.01)
+
+        stopping = asyncio.create_task(batcher.stop())
+        await asyncio.sleep(0.01)
+        release.set()
+        await stopping
+
+        assert await in_flight == vector("household 0")
+        with pytest.raises(RuntimeError, match="stopped"):
+            await waiting
+        assert batches == [["household 0"]]
+
+    asyncio.run(scenario())
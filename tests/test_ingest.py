@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from qdrant_client import AsyncQdrantClient, QdrantClient
+
+from convolve.config import Settings
+from convolve.ingest import IngestReport, _ingest
+from convolve.qdrant_client import CATALOG_VERSION_POINT_ID, QdrantCollections
+from convolve.schemas import Scheme
+from convolve.services import ServiceContainer, build_services
+from loadgen import StubEmbeddingService
+
+
+pytestmark = pytest.mark.filterwarnings("ignore:Payload indexes have no effect")
+COLLECTIONS = QdrantCollections()
+SETTINGS = Settings(
+    openai_api_key=None,
+    qdrant_url=":memory:",
+    qdrant_api_key="test",
+    embedding_backend="stub",
+    embedding_batching=False,
+)
+
+
+def scheme(number: int, benefits: str = "cash support") -> Scheme:
+    return Scheme(
+        scheme_id=f"scheme-{number}",
+        scheme_name=f"Scheme {number}",
+        description=f"support for households, variant {number}",
+        states=["All"],
+        eligibility_rules={"land_max_acres": number},
+        benefits=benefits,
+    )
+
+
+@pytest.fixture
+def services() -> Iterator[ServiceContainer]:
+    services = build_services(
+        SETTINGS,
+        client=QdrantClient(":memory:"),
+        async_client=AsyncQdrantClient(":memory:"),
+        embedder=StubEmbeddingService(SETTINGS, dimension=8, latency_ms=0),
+    )
+    yield services
+    services.close()
+
+
+def ingest(services: ServiceContainer, tmp_path: Path, schemes: list[Scheme], mode: str = "delta") -> IngestReport:
+    source = tmp_path / "schemes.json"
+    source.write_text(json.dumps([item.model_dump() for item in schemes]), encoding="utf-8")
+    return _ingest(
+        services,
+        source=source,
+        batch_size=2,
+        upload_parallel=1,
+        checkpoint_path=tmp_path / "checkpoint.json",
+        mode=mode,
+    )
+
+
+def stored(services: ServiceContainer) -> dict[str, dict]:
+    points, _ = services.client.scroll(COLLECTIONS.schemes, limit=100)
+    return {point.payload["scheme_id"]: point.payload for point in points}
+
+
+def catalog_version(services: ServiceContainer) -> str:
+    records = services.client.retrieve(COLLECTIONS.metadata, [CATALOG_VERSION_POINT_ID], with_payload=True)
+    return records[0].payload["version"]
+
+
+def test_delta_sync_uploads_only_changes(services: ServiceContainer, tmp_path: Path) -> None:
+    catalog = [scheme(number) for number in range(4)]
+    first = ingest(services, tmp_path, catalog)
+    # Without a schemes collection the first delta run falls back to a rebuild.
+    assert (first.mode, first.points) == ("rebuild", 4)
+    version = catalog_version(services)
+
+    again = ingest(services, tmp_path, catalog)
+    assert (again.mode, again.points, again.unchanged, again.deleted) == ("delta", 0, 4, 0)
+    assert catalog_version(services) == version
+
+    changed = [scheme(0, benefits="cash and seeds"), scheme(1), scheme(2), scheme(5)]
+    delta = ingest(services, tmp_path, changed)
+    assert (delta.points, delta.unchanged, delta.deleted) == (2, 2, 1)
+    payloads = stored(services)
+    assert sorted(payloads) == ["scheme-0", "scheme-1", "scheme-2", "scheme-5"]
+    assert payloads["scheme-0"]["benefits"] == "cash and seeds"
+    assert catalog_version(services) != version
+
+
+def test_rebuild_swaps_the_alias_and_drops_the_previous_collection(
+    services: ServiceContainer, tmp_path: Path
+) -> None:
+    catalog = [scheme(number) for number in range(3)]
+    ingest(services, tmp_path, catalog, mode="rebuild")
+    previous = services.qdrant.schemes_alias_target()
+    version = catalog_version(services)
+    assert previous is not None and previous.startswith(f"{COLLECTIONS.schemes}_")
+
+    report = ingest(services, tmp_path, catalog, mode="rebuild")
+
+    current = services.qdrant.schemes_alias_target()
+    assert report.points == 3
+    assert current not in (None, previous)
+    assert not services.client.collection_exists(previous)
+    assert sorted(stored(services)) == ["scheme-0", "scheme-1", "scheme-2"]
+    # Same content, so readers keep their cached catalog across the rebuild.
+    assert catalog_version(services) == version
+    assert not (tmp_path / "checkpoint.json").exists()
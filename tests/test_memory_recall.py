@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+
+from convolve.memory import MemoryService, RecallPolicy
+from convolve.qdrant_client import FORMULA_QUERIES, QdrantService, VectorConfig
+from convolve.schemas import CaseMemory, EligibilitySignals
+
+
+pytestmark = pytest.mark.filterwarnings("ignore:Payload indexes have no effect")
+QUERY = [1.0, 0.0, 0.0]
+
+
+def case_id(number: int) -> str:
+    return f"00000000-0000-0000-0000-{number:012d}"
+
+
+def unit(angle_degrees: float, axis: int = 1) -> list[float]:
+    vector = [float(np.cos(np.radians(angle_degrees))), 0.0, 0.0]
+    vector[axis] = float(np.sin(np.radians(angle_degrees)))
+    return vector
+
+
+# (case, vector, age): the old case is the closest match, the recent one is slightly less similar.
+CASES = [
+    (1, unit(0), timedelta(days=30)),
+    (2, unit(18), timedelta(hours=1)),
+    (3, unit(60), timedelta(days=2)),
+    (4, unit(80, axis=2), timedelta(days=90)),
+]
+
+
+@pytest.fixture(scope="module")
+def qdrant() -> QdrantService:
+    service = QdrantService(QdrantClient(":memory:"))
+    vector = VectorConfig(size=3)
+    service.create_collections(scheme_vector=vector, memory_vector=vector)
+    now = datetime.now(timezone.utc)
+    for number, vector, age in CASES:
+        service.upsert_case_memory(
+            CaseMemory(
+                case_id=case_id(number),
+                signals=EligibilitySignals(state="Bihar"),
+                query_intent="housing support",
+                retrieved_scheme_ids=[],
+                created_at=now - age,
+                updated_at=now - age,
+            ),
+            vector,
+        )
+    return service
+
+
+def recall(qdrant: QdrantService, scoring: str, recency_weight: float = 1.0) -> list[tuple[str, float]]:
+    policy = RecallPolicy(candidates=10, half_life_days=1.0, recency_weight=recency_weight, scoring=scoring)
+    memory = MemoryService(qdrant, embedder=None, recall=policy)
+    return [(str(point.id), point.score) for point in memory.recall_cases("", limit=3, query_vector=QUERY)]
+
+
+def test_similarity_alone_ranks_the_old_case_first(qdrant: QdrantService) -> None:
+    assert [point_id for point_id, _ in recall(qdrant, "client", recency_weight=0.0)][:2] == [case_id(1), case_id(2)]
+
+
+@pytest.mark.parametrize(
+    "scoring",
+    [
+        "client",
+        pytest.param(
+            "server", marks=pytest.mark.skipif(not FORMULA_QUERIES, reason="qdrant-client predates formula queries")
+        ),
+    ],
+)
+def test_recent_case_outranks_a_closer_old_one(qdrant: QdrantService, scoring: str) -> None:
+    ranked = recall(qdrant, scoring)
+
+    assert [point_id for point_id, _ in ranked] == [case_id(2), case_id(1), case_id(3)]
+    # The boost halves every day: one hour keeps about 97% of it, thirty days none of it.
+    assert ranked[0][1] == pytest.approx(float(np.cos(np.radians(18))) + 2 ** (-1 / 24), abs=1e-3)
+    assert ranked[1][1] == pytest.approx(1.0, abs=1e-3)
+    assert ranked[2][1] == pytest.approx(0.5 + 2**-2, abs=1e-3)
+
+
+@pytest.mark.skipif(not FORMULA_QUERIES, reason="qdrant-client predates formula queries")
+def test_server_formula_and_client_rerank_agree(qdrant: QdrantService) -> None:
+    client, server = recall(qdrant, "client"), recall(qdrant, "server")
+
+    assert [point_id for point_id, _ in client] == [point_id for point_id, _ in server]
+    assert [score for _, score in client] == pytest.approx([score for _, score in server], abs=1e-4)
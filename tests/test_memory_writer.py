@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models as qdrant_models
+
+from convolve.memory import AsyncMemoryService
+from convolve.memory_writer import CaseMemoryWriter
+from convolve.qdrant_client import AsyncQdrantService, QdrantCollections
+from convolve.schemas import CaseMemory, EligibilitySignals
+
+
+COLLECTIONS = QdrantCollections()
+
+
+def case_id(number: int) -> str:
+    return f"00000000-0000-0000-0000-{number:012d}"
+
+
+def memory(number: int) -> CaseMemory:
+    return CaseMemory(
+        case_id=case_id(number),
+        signals=EligibilitySignals(state="Bihar"),
+        query_intent="housing support",
+        retrieved_scheme_ids=[],
+        status="draft",
+    )
+
+
+def vector(number: int) -> list[float]:
+    return [1.0, float(number), 0.0]
+
+
+async def recorded_service(failures: int = 0) -> tuple[AsyncQdrantService, list[tuple[float, int]]]:
+    client = AsyncQdrantClient(":memory:")
+    await client.create_collection(
+        COLLECTIONS.memories,
+        vectors_config=qdrant_models.VectorParams(size=3, distance=qdrant_models.Distance.COSINE),
+    )
+    service = AsyncQdrantService(client)
+    # Every upsert attempt as (loop time, batch size); the first `failures` attempts raise.
+    attempts: list[tuple[float, int]] = []
+    upsert_case_memories = service.upsert_case_memories
+
+    async def recording(memories: list[CaseMemory], vectors: list[list[float]], wait: bool = True) -> list[str]:
+        attempts.append((asyncio.get_running_loop().time(), len(memories)))
+        if len(attempts) <= failures:
+            raise ConnectionError("qdrant unavailable")
+        return await upsert_case_memories(memories, vectors, wait=wait)
+
+    service.upsert_case_memories = recording
+    return service, attempts
+
+
+async def stored(service: AsyncQdrantService) -> dict[str, dict]:
+    records, _ = await service._client.scroll(COLLECTIONS.memories, limit=100)
+    return {str(record.id): record.payload or {} for record in records}
+
+
+def test_full_batch_flushes_without_waiting_for_the_window() -> None:
+    async def scenario() -> None:
+        service, attempts = await recorded_service()
+        writer = CaseMemoryWriter(service, batch_size=3, flush_interval_seconds=10.0)
+        await writer.start()
+        ids = await writer.enqueue_many([memory(number) for number in range(3)], [vector(n) for n in range(3)])
+        await asyncio.wait_for(asyncio.gather(*(writer.wait_for(item) for item in ids)), 1.0)
+
+        assert [size for _, size in attempts] == [3]
+        assert sorted(await stored(service)) == sorted(ids)
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_partial_batch_flushes_after_the_window() -> None:
+    async def scenario() -> None:
+        service, attempts = await recorded_service()
+        writer = CaseMemoryWriter(service, batch_size=64, flush_interval_seconds=0.05)
+        await writer.start()
+        started = asyncio.get_running_loop().time()
+        ids = await writer.enqueue_many([memory(1), memory(2)], [vector(1), vector(2)])
+        await writer.wait_for(ids[1])
+
+        assert [size for _, size in attempts] == [2]
+        assert attempts[0][0] - started >= 0.04
+        assert writer.stats().pending == 0
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_update_waits_for_the_queued_write() -> None:
+    async def scenario() -> None:
+        service, attempts = await recorded_service()
+        writer = CaseMemoryWriter(service, batch_size=64, flush_interval_seconds=0.05)
+        await writer.start()
+        memories = AsyncMemoryService(service, embedder=None, writer=writer)
+
+        saved = await memories.save_case(memory(1), vector(1))
+        assert attempts == []
+        await memories.update_case(saved, {"status": "submitted"})
+
+        # Had the update run first, the later upsert would have put the draft status back.
+        assert (await stored(service))[saved]["status"] == "submitted"
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failed_upserts_retry_with_backoff() -> None:
+    async def scenario() -> None:
+        service, attempts = await recorded_service(failures=2)
+        writer = CaseMemoryWriter(service, flush_interval_seconds=0.0, retry_backoff_seconds=0.02)
+        await writer.start()
+        saved = await writer.enqueue(memory(1), vector(1))
+        await writer.wait_for(saved)
+
+        times = [time for time, _ in attempts]
+        assert len(times) == 3
+        assert times[1] - times[0] >= 0.02
+        assert times[2] - times[1] >= 0.04
+        stats = writer.stats()
+        assert (stats.retries, stats.written, stats.dropped, stats.batches) == (2, 1, 0, 1)
+        assert saved in await stored(service)
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_batch_is_dropped_after_the_last_retry() -> None:
+    async def scenario() -> None:
+        service, attempts = await recorded_service(failures=10)
+        writer = CaseMemoryWriter(service, flush_interval_seconds=0.0, max_retries=1, retry_backoff_seconds=0.0)
+        await writer.start()
+        saved = await writer.enqueue(memory(1), vector(1))
+        # Waiters are released even when the write is given up on.
+        await asyncio.wait_for(writer.wait_for(saved), 1.0)
+
+        assert len(attempts) == 2
+        assert (writer.stats().dropped, writer.stats().written) == (1, 0)
+        assert await stored(service) == {}
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_drains_pending_writes() -> None:
+    async def scenario() -> None:
+        service, attempts = await recorded_service()
+        writer = CaseMemoryWriter(service, batch_size=2, flush_interval_seconds=10.0)
+        await writer.start()
+        ids = await writer.enqueue_many([memory(number) for number in range(5)], [vector(n) for n in range(5)])
+        await writer.stop()
+
+        assert sorted(await stored(service)) == sorted(ids)
+        assert sum(size for _, size in attempts) == 5
+        assert max(size for _, size in attempts) <= 2
+        assert writer.stats().pending == 0
+        with pytest.raises(RuntimeError, match="not running"):
+            await writer.enqueue(memory(9), vector(9))
+
+    asyncio.run(scenario())
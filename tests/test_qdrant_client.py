@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models as qdrant_models
+
+from convolve.collection_profiles import COLLECTION_PROFILES, CollectionProfiles
+from convolve.qdrant_client import AsyncQdrantService, QdrantCollections, RecencyDecay
+from convolve.schemas import CaseMemory, EligibilitySignals
+
+
+COLLECTIONS = QdrantCollections()
+# Every search-time setting a profile can carry, so the batch requests must pass them all through.
+TUNED = replace(COLLECTION_PROFILES["default"], quantization="scalar", oversampling=2.0, search_hnsw_ef=128)
+VECTORS = [[1.0, 0.0, 0.0], [0.9, 0.1, 0.0], [0.0, 1.0, 0.0], [0.0, 0.2, 1.0]]
+
+
+async def seeded_service() -> tuple[AsyncQdrantService, list[qdrant_models.QueryRequest]]:
+    client = AsyncQdrantClient(":memory:")
+    await client.create_collection(
+        COLLECTIONS.memories,
+        vectors_config=qdrant_models.VectorParams(size=3, distance=qdrant_models.Distance.COSINE),
+    )
+    service = AsyncQdrantService(client, profiles=CollectionProfiles(memories=TUNED))
+    now = datetime.now(timezone.utc)
+    memories = [
+        CaseMemory(
+            case_id=f"00000000-0000-0000-0000-{number:012d}",
+            signals=EligibilitySignals(state="Bihar"),
+            query_intent="housing support",
+            retrieved_scheme_ids=[],
+            updated_at=now - timedelta(days=number),
+        )
+        for number in range(len(VECTORS))
+    ]
+    await service.upsert_case_memories(memories, VECTORS)
+
+    sent: list[qdrant_models.QueryRequest] = []
+    query_batch_points = client.query_batch_points
+
+    async def recording(collection_name: str, requests: list[qdrant_models.QueryRequest], **kwargs):
+        sent.extend(requests)
+        return await query_batch_points(collection_name, requests, **kwargs)
+
+    client.query_batch_points = recording
+    return service, sent
+
+
+@pytest.mark.filterwarnings("ignore:Local mode performs exact")
+@pytest.mark.parametrize("recency", [None, RecencyDecay(half_life_seconds=86_400.0)])
+def test_memory_batch_sends_profile_search_params(recency: RecencyDecay | None) -> None:
+    async def scenario() -> None:
+        service, requests = await seeded_service()
+        queries = [[1.0, 0.05, 0.0], [0.0, 0.3, 1.0]]
+
+        batch = await service.search_case_memory_batch(queries, limit=2, candidates=3, recency=recency)
+        single = [
+            await service.search_case_memory(query, limit=2, candidates=3, recency=recency) for query in queries
+        ]
+
+        assert [[point.id for point in points] for points in batch] == [
+            [point.id for point in points] for points in single
+        ]
+        assert len(requests) == len(queries)
+        for request in requests:
+            params = request.params if recency is None else request.prefetch.params
+            assert params == TUNED.search_params()
+            assert params.hnsw_ef == 128 and params.quantization.oversampling == 2.0
+
+    asyncio.run(scenario())
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qdrant_models
+
+from convolve.catalog import CatalogSnapshot
+from convolve.config import DEFAULT_SCHEME_PAYLOAD_FIELDS
+from convolve.ingest import build_sparse_text, load_seed_schemes
+from convolve.qdrant_client import (
+    DENSE_VECTOR_NAME,
+    FULL_PAYLOAD,
+    SPARSE_VECTOR_NAME,
+    PayloadFields,
+    PayloadProjections,
+    QdrantService,
+    SchemeQuery,
+    VectorConfig,
+    scheme_point_id,
+)
+from convolve.replica import SchemeReplica, SchemeSearchRouter
+from convolve.schemas import Scheme, parse_limit
+from convolve.sparse import SparseEncoder
+from convolve.synthetic import synthetic_schemes
+from loadgen import HashingEmbeddings
+
+
+STATES = [None, "Bihar", "Rajasthan", "Kerala"]
+HOUSING = [None, "kutcha", "pucca"]
+CASTES = [None, "SC"]
+LAND = [None, 2.0, 10.0]
+QUERIES = [
+    "help for poor farmers",
+    "housing support for a kutcha house",
+    "pension for elderly widows",
+    "scholarship for scheduled caste students",
+    "crop insurance after drought",
+    "cooking gas connection",
+]
+LIMIT = 5
+# Wide enough to hold a whole group of equal BM25 scores around the prefetch cutoff.
+TIE_WINDOW = 200
+PROJECTIONS = [
+    PayloadFields(include=DEFAULT_SCHEME_PAYLOAD_FIELDS),
+    PayloadFields(include=("scheme_id", "eligibility_rules.caste", "eligibility_rules.land_max_acres")),
+    PayloadFields(exclude=("description", "source_url", "content_hash")),
+    PayloadFields(exclude=("eligibility_rules.housing",)),
+]
+
+
+@pytest.fixture(scope="module")
+def catalog() -> tuple[QdrantService, SchemeReplica, HashingEmbeddings, SparseEncoder]:
+    embedder = HashingEmbeddings(dimension=64, latency_ms=0)
+    encoder = SparseEncoder()
+    schemes = load_seed_schemes() + list(synthetic_schemes(300, seed=7))
+    service = QdrantService(QdrantClient(":memory:"), sparse_encoder=encoder)
+    vector = VectorConfig(size=64)
+    service.create_collections(scheme_vector=vector, memory_vector=vector)
+    service.upload_schemes(
+        schemes,
+        embedder.embed_documents([scheme.description for scheme in schemes]),
+        encoder.encode_batch(build_sparse_text(scheme) for scheme in schemes),
+    )
+    records = service._client.scroll(service._collections.schemes, limit=len(schemes), with_vectors=True)[0]
+    replica = SchemeReplica.from_snapshot(CatalogSnapshot("test", records))
+    return service, replica, embedder, encoder
+
+
+def leg(
+    service: QdrantService, query: list[float] | qdrant_models.SparseVector, using: str, scheme_filter
+) -> list[qdrant_models.ScoredPoint]:
+    return service._client.query_points(
+        service._collections.schemes, query=query, using=using, query_filter=scheme_filter, limit=TIE_WINDOW
+    ).points
+
+
+def tie_at_cutoff(points: list[qdrant_models.ScoredPoint]) -> bool:
+    scores = [round(point.score, 6) for point in points[: LIMIT + 1]]
+    return len(set(scores)) < len(scores)
+
+
+def admissible(points: list[qdrant_models.ScoredPoint]) -> set[str]:
+    # Any point scoring at least the LIMIT-th score may legitimately make the prefetch cut.
+    if len(points) <= LIMIT:
+        return {str(point.id) for point in points}
+    cutoff = round(points[LIMIT - 1].score, 6)
+    return {str(point.id) for point in points if round(point.score, 6) >= cutoff}
+
+
+@pytest.mark.filterwarnings("ignore:Payload indexes have no effect")
+def test_replica_matches_qdrant_across_filters(catalog) -> None:
+    service, replica, embedder, encoder = catalog
+    exact = 0
+    for text in QUERIES:
+        dense = embedder.embed_query(text)
+        sparse = encoder.encode_batch([text])[0]
+        for state, housing, caste, land in itertools.product(STATES, HOUSING, CASTES, LAND):
+            case = (text, state, housing, caste, land)
+            expected = service.search_schemes(
+                query_vector=dense,
+                sparse_vector=sparse,
+                state=state,
+                housing=housing,
+                caste=caste,
+                land_acres=land,
+                limit=LIMIT,
+            )
+            actual = replica.search(SchemeQuery(dense, sparse, state, housing, caste, land, LIMIT))
+            scheme_filter = service._build_scheme_filter(state, housing, caste, land)
+            legs = [
+                leg(service, dense, DENSE_VECTOR_NAME, scheme_filter),
+                leg(service, sparse, SPARSE_VECTOR_NAME, scheme_filter),
+            ]
+            assert len(actual) == len(expected), case
+            if not any(tie_at_cutoff(points) for points in legs):
+                assert [str(point.id) for point in actual] == [str(point.id) for point in expected], case
+                assert [point.score for point in actual] == pytest.approx([point.score for point in expected])
+                exact += 1
+                continue
+            # Equal scores come back in engine-specific order, which shifts RRF ranks; every hit
+            # must still come from one of the legs' top-LIMIT score bands.
+            allowed = admissible(legs[0]) | admissible(legs[1])
+            assert {str(point.id) for point in actual} <= allowed, case
+    # Most combinations have no ties, so the exact comparison carries the test.
+    assert exact >= len(QUERIES) * len(STATES) * len(HOUSING) * len(CASTES) * len(LAND) // 3
+
+
+def test_string_land_limits_filter_like_qdrant() -> None:
+    embedder = HashingEmbeddings(dimension=16, latency_ms=0)
+    encoder = SparseEncoder()
+    limits = [2, "2.5", "10", "1,000", "varies", None]
+    schemes = [
+        Scheme(
+            scheme_id=f"land-{number}",
+            scheme_name=f"Land scheme {number}",
+            description="support for small farmers",
+            states=["All"],
+            eligibility_rules={} if limit is None else {"land_max_acres": limit},
+            benefits="cash",
+        )
+        for number, limit in enumerate(limits)
+    ]
+    service = QdrantService(QdrantClient(":memory:"), sparse_encoder=encoder)
+    vector = VectorConfig(size=16)
+    service.create_collections(scheme_vector=vector, memory_vector=vector)
+    dense = embedder.embed_documents([scheme.description for scheme in schemes])
+    sparse = encoder.encode_batch(build_sparse_text(scheme) for scheme in schemes)
+    service.upload_schemes(schemes, dense, sparse)
+    # A replica over payloads written before limits were normalized must filter the same way.
+    raw = SchemeReplica(
+        "raw",
+        [scheme_point_id(scheme.scheme_id) for scheme in schemes],
+        [scheme.model_dump() for scheme in schemes],
+        np.array(dense),
+        sparse,
+    )
+    query_dense = embedder.embed_query("farmers")
+    query_sparse = encoder.encode_batch(["farmers"])[0]
+    for land in (1.0, 2.0, 2.5, 9.0, 10.0, 5_000.0):
+        expected = service.search_schemes(query_dense, query_sparse, None, None, None, land, len(schemes))
+        actual = raw.search(SchemeQuery(query_dense, query_sparse, None, None, None, land, len(schemes)))
+        within = {scheme_point_id(f"land-{number}") for number in (0, 1, 2, 3) if parse_limit(limits[number]) <= land}
+        assert {str(point.id) for point in expected} == within, land
+        assert {str(point.id) for point in actual} == within, land
+
+
+@pytest.mark.parametrize("projection", PROJECTIONS)
+def test_replica_projects_payloads_like_qdrant(catalog, projection: PayloadFields) -> None:
+    service, replica, embedder, encoder = catalog
+    text = "housing support for a kutcha house"
+    query = SchemeQuery(embedder.embed_query(text), encoder.encode_batch([text])[0], None, None, None, None, LIMIT)
+
+    hits = replica.search(query, projection)
+    expected = service._client.retrieve(
+        service._collections.schemes, [point.id for point in hits], with_payload=projection.selector()
+    )
+
+    assert {str(point.id): point.payload for point in hits} == {str(record.id): record.payload for record in expected}
+    # Projection copies; the replica keeps serving full payloads to other callers.
+    assert all("description" in point.payload for point in replica.search(query))
+
+
+def test_router_applies_the_default_scheme_projection(catalog) -> None:
+    _, replica, embedder, encoder = catalog
+
+    class StaticCatalog:
+        async def derived(self, builder):
+            return replica
+
+    lean = PayloadFields(include=DEFAULT_SCHEME_PAYLOAD_FIELDS)
+    router = SchemeSearchRouter(None, StaticCatalog(), projections=PayloadProjections(schemes=lean))
+    vector, sparse = embedder.embed_query("pension"), encoder.encode_batch(["pension"])[0]
+    default, full = asyncio.run(
+        router.search_batch(
+            [
+                SchemeQuery(vector, sparse, None, None, None, None, LIMIT),
+                SchemeQuery(vector, sparse, None, None, None, None, LIMIT, payload=FULL_PAYLOAD),
+            ]
+        )
+    )
+
+    assert default and all(set(point.payload) <= set(DEFAULT_SCHEME_PAYLOAD_FIELDS) for point in default)
+    assert all("description" in point.payload for point in full)
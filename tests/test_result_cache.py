@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from qdrant_client.http import models as qdrant_models
+
+from convolve.catalog import CatalogSnapshot
+from convolve.result_cache import land_thresholds, result_cache_key
+from convolve.schemas import EligibilitySignals
+
+
+def record(number: int, land_max_acres: object) -> qdrant_models.Record:
+    rules = {} if land_max_acres is None else {"land_max_acres": land_max_acres}
+    return qdrant_models.Record(id=number, payload={"eligibility_rules": rules})
+
+
+def key(land_acres: float | None, limits: tuple[float, ...] | None) -> str:
+    signals = EligibilitySignals(state="Bihar", housing_type="kutcha", land_acres=land_acres)
+    return result_cache_key("v1", "Housing support", signals, 5, land_limits=limits)
+
+
+def test_land_thresholds_are_the_catalogs_distinct_parsed_limits() -> None:
+    records = [record(1, 5), record(2, 2.0), record(3, 5.0), record(4, None), record(5, "10"), record(6, "n/a")]
+
+    assert land_thresholds(CatalogSnapshot("v1", records)) == (2.0, 5.0, 10.0)
+
+
+def test_fallback_key_buckets_land_between_catalog_thresholds() -> None:
+    limits = (2.0, 5.0)
+
+    assert key(2.0, limits) == key(2.1, limits) == key(4.99, limits)
+    assert key(1.9, limits) != key(2.0, limits)
+    assert key(0.5, limits) == key(1.9, limits)
+    assert key(5.0, limits) == key(40.0, limits) != key(4.99, limits)
+    assert key(None, limits) != key(0.5, limits)
+    # Without catalog thresholds the key keeps the exact value.
+    assert key(2.0, None) != key(2.1, None)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+from io import BytesIO
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+from PIL import Image
+import pytest
+
+from convolve.config import Settings
+from convolve.schemas import EligibilitySignals
+from convolve.vision import VisionService
+
+
+EXIF_ORIENTATION = 0x0112
+EXIF_MAKE = 0x010F
+
+
+class FakeResponses:
+    def __init__(self) -> None:
+        self.requests: list[dict[str, Any]] = []
+
+    async def create(self, **request: Any) -> SimpleNamespace:
+        self.requests.append(request)
+        signals = EligibilitySignals(housing_type="kutcha", assets=["bicycle"], notes="thatched roof")
+        return SimpleNamespace(output_text=signals.model_dump_json())
+
+
+class FakeVisionClient:
+    def __init__(self) -> None:
+        self.responses = FakeResponses()
+
+
+def vision_settings(image_format: str) -> Settings:
+    return Settings(
+        openai_api_key=None,
+        qdrant_url=None,
+        qdrant_api_key=None,
+        embedding_backend="stub",
+        vision_max_edge=256,
+        vision_image_format=image_format,
+    )
+
+
+def photo() -> Image.Image:
+    # Brightness rises along both axes, so every neighbouring pair the difference hash compares
+    # differs clearly; JPEG noise cannot flip a bit after the image is rotated.
+    y, x = np.mgrid[0:1200, 0:1600]
+    red = (x * 160 / 1600 + y * 90 / 1200).astype(np.uint8)
+    green = (x * 60 / 1600 + y * 180 / 1200).astype(np.uint8)
+    blue = np.full_like(red, 90)
+    return Image.fromarray(np.dstack([red, green, blue]))
+
+
+def encode(image: Image.Image, image_format: str, exif: Image.Exif | None = None) -> bytes:
+    buffer = BytesIO()
+    options: dict[str, Any] = {"exif": exif} if exif is not None else {}
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def sent_image(request: dict[str, Any]) -> tuple[str, bytes]:
+    content = request["input"][0]["content"]
+    url = next(part["image_url"]["url"] for part in content if part["type"] == "input_image")
+    header, data = url.split(",", 1)
+    return header, base64.b64decode(data)
+
+
+@pytest.mark.parametrize("image_format", ["JPEG", "WEBP"])
+def test_sends_downscaled_exif_free_image_and_caches_by_perceptual_hash(image_format: str) -> None:
+    client = FakeVisionClient()
+    service = VisionService(vision_settings(image_format), client=client, async_client=client)
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6  # rotate 90 degrees clockwise on display
+    exif[EXIF_MAKE] = "TestCam"
+    original = encode(photo(), "JPEG", exif)
+
+    signals = asyncio.run(service.aextract_signals(original))
+
+    assert signals.housing_type == "kutcha"
+    assert len(client.responses.requests) == 1
+    header, data = sent_image(client.responses.requests[0])
+    assert header == f"data:image/{image_format.lower()};base64"
+    with Image.open(BytesIO(data)) as sent:
+        assert sent.format == image_format
+        # Orientation is applied before the metadata is dropped, so portrait stays portrait.
+        assert sent.size == (192, 256)
+        assert not sent.getexif()
+        assert "exif" not in sent.info
+    assert len(data) < len(original)
+
+    # The same photo re-encoded as PNG, without EXIF, is a new byte string but the same picture.
+    rotated = photo().transpose(Image.Transpose.ROTATE_270)
+    resubmitted = asyncio.run(service.aextract_signals(encode(rotated, "PNG")))
+
+    assert resubmitted == signals
+    assert len(client.responses.requests) == 1
+    assert service.cache_stats().hits == 1